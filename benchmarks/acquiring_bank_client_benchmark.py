@@ -0,0 +1,83 @@
+"""Latency of posting a PaymentRequest to the Acquiring Bank.
+
+Compares opening a new connection for every request (the previous requests.post call) with
+the pooled keep-alive session in AcquiringBankClient. The bank is stood in for by a local
+HTTP server, so the numbers isolate connection setup; over TLS to a remote bank the saving
+per request is larger, as each new connection also pays for the TLS handshake.
+
+Usage (from the repository root):
+    python -m benchmarks.acquiring_bank_client_benchmark
+"""
+import os
+import statistics
+import time
+from unittest.mock import patch
+
+from application.clients.AcquiringBankClient import AcquiringBankClient
+from core.commands.SubmitPaymentRequest import SubmitPaymentRequest
+from core.payment_request_aggregate.PaymentRequest import PaymentRequest
+from shared_kernel.lambda_logging.set_up_logger import configure_context_logger
+from tests.stand_in_bank import StandInBank
+
+NUMBER_OF_REQUESTS = 500
+
+
+def set_up_environment(bank_url: str):
+    os.environ["ACQUIRING_BANK_POST_PAYMENT_REQUEST_URL"] = bank_url
+    os.environ["ACQUIRING_BANK_API_KEY_SECRET_NAME"] = "api_key_secret_id"
+    os.environ["LOG_LEVEL"] = "WARNING"
+    configure_context_logger()
+
+
+def make_payment_request() -> PaymentRequest:
+    return PaymentRequest(
+        SubmitPaymentRequest(
+            "0b20e14d-0122-4b60-824a-fcc4c2a3b52a",
+            "1234123412341234",
+            "11-32",
+            "12.94",
+            "POUNDS",
+            "019",
+        )
+    )
+
+
+def request_latencies_ms(payment_request: PaymentRequest, pooled: bool) -> list:
+    latencies = []
+    with patch.object(AcquiringBankClient, "_get_api_key", return_value="api-key"):
+        for _ in range(NUMBER_OF_REQUESTS):
+            if not pooled:
+                AcquiringBankClient.close_session()
+            start = time.perf_counter()
+            AcquiringBankClient().post_payment_request(payment_request)
+            latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def report(label: str, latencies: list):
+    percentiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"  {label:<28} p50 {percentiles[49]:>6.2f} ms   p99 {percentiles[98]:>6.2f} ms"
+        f"   mean {statistics.mean(latencies):>6.2f} ms"
+    )
+
+
+def main():
+    payment_request = make_payment_request()
+    with StandInBank() as bank:
+        set_up_environment(bank.url)
+
+        unpooled = request_latencies_ms(payment_request, pooled=False)
+        unpooled_connections = bank.connection_count
+        AcquiringBankClient.close_session()
+        bank.connection_count = 0
+        pooled = request_latencies_ms(payment_request, pooled=True)
+        pooled_connections = bank.connection_count
+
+    print(f"Posting {NUMBER_OF_REQUESTS} PaymentRequests to a local stand-in bank")
+    report(f"new connection ({unpooled_connections} opened)", unpooled)
+    report(f"pooled session ({pooled_connections} opened)", pooled)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Latency of a warm Lambda invocation that reads a PaymentRequest from DynamoDB.
+
+Each "invocation" constructs a PaymentRequestsRepository and calls get_by_aggregate_root_id,
+as the lambdas do. Compares building new boto3 resources on every invocation with the
+container-scoped cache in AWSClient. DynamoDB is emulated in-process by moto, so the numbers
+isolate client-side overhead: session creation, endpoint resolution and connection pools.
+
+Usage (from the repository root):
+    python -m benchmarks.aws_client_benchmark
+"""
+import os
+import statistics
+import time
+
+import boto3
+from moto import mock_dynamodb
+
+from application.clients.AWSClient import AWSClient
+from application.repositories.PaymentRequestsRepository import PaymentRequestsRepository
+from core.commands.SubmitPaymentRequest import SubmitPaymentRequest
+from core.payment_request_aggregate.PaymentRequest import PaymentRequest
+from shared_kernel.lambda_logging.set_up_logger import configure_context_logger
+
+NUMBER_OF_INVOCATIONS = 300
+TABLE_NAME = "payment_requests"
+
+
+def set_up_environment():
+    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+    os.environ["AWS_DEFAULT_REGION"] = "eu-west-2"
+    os.environ["PAYMENT_REQUESTS_DYNAMODB_TABLE_NAME"] = TABLE_NAME
+    os.environ["LOG_LEVEL"] = "WARNING"
+    configure_context_logger()
+
+
+def create_table_with_payment_request() -> str:
+    boto3.resource("dynamodb").create_table(
+        TableName=TABLE_NAME,
+        KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    payment_request = PaymentRequest(
+        SubmitPaymentRequest(
+            "0b20e14d-0122-4b60-824a-fcc4c2a3b52a",
+            "1234123412341234",
+            "11-32",
+            "12.94",
+            "POUNDS",
+            "019",
+        )
+    )
+    PaymentRequestsRepository().upsert(payment_request)
+    return payment_request.id
+
+
+def invocation_latencies_ms(payment_request_id: str, cache_clients: bool) -> list:
+    latencies = []
+    for _ in range(NUMBER_OF_INVOCATIONS):
+        if not cache_clients:
+            AWSClient.clear_cache()
+        start = time.perf_counter()
+        PaymentRequestsRepository().get_by_aggregate_root_id(payment_request_id)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def report(label: str, latencies: list):
+    percentiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"  {label:<28} p50 {percentiles[49]:>6.2f} ms   p99 {percentiles[98]:>6.2f} ms"
+        f"   mean {statistics.mean(latencies):>6.2f} ms"
+    )
+
+
+def main():
+    set_up_environment()
+    with mock_dynamodb():
+        payment_request_id = create_table_with_payment_request()
+
+        uncached = invocation_latencies_ms(payment_request_id, cache_clients=False)
+        AWSClient.clear_cache()
+        cached = invocation_latencies_ms(payment_request_id, cache_clients=True)
+
+    print(f"Warm invocation latency over {NUMBER_OF_INVOCATIONS} invocations (moto backed)")
+    report("new resource per invocation", uncached)
+    report("cached AWSClient resource", cached)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Rows/second when validating a bulk upload of SubmitPaymentRequests.
+
+Compares constructing a PaymentRequest per row, as submit_payment_requests validated each
+command before it used the batch validator, with PaymentRequestBatchValidator validating the
+upload column by column: given the columns, as a bulk file loader would read them, and given
+the commands, which it first splits into columns. The upload is for one merchant, with random
+card numbers, CVVs, expiry dates, currencies and amounts (as Decimals, as the bulk API parses
+them), and about 2% of rows invalid.
+
+Usage (from the repository root):
+    python -m benchmarks.batch_validation_benchmark
+"""
+import os
+import random
+import time
+import uuid
+from decimal import Decimal
+from operator import attrgetter
+
+from core.commands.SubmitPaymentRequest import SubmitPaymentRequest
+from core.payment_request_aggregate.PaymentRequest import PaymentRequest
+from core.payment_request_aggregate.PaymentRequestBatchValidator import (
+    PaymentRequestBatchValidator,
+)
+from shared_kernel.exceptions.DomainException import DomainException
+
+NUMBER_OF_ROWS = 1_000_000
+INVALID_FRACTION = 0.02
+
+
+def make_commands(number_of_rows: int) -> list:
+    rng = random.Random(0)
+    merchant_id = str(uuid.uuid4())
+    invalid_fields = [
+        ("card_number", "1234"),
+        ("expiry_date", "13-30"),
+        ("cvv", "12a"),
+        ("amount", Decimal("-5.00")),
+        ("currency", "YEN"),
+    ]
+    commands = []
+    for _ in range(number_of_rows):
+        command = SubmitPaymentRequest(
+            merchant_id,
+            str(rng.randrange(10**15, 10**16)),
+            f"{rng.randint(1, 12):02d}-{rng.randint(27, 35)}",
+            Decimal(rng.randint(1, 200_000)) / 100,
+            rng.choice(["POUNDS", "EUROS", "DOLLARS"]),
+            f"{rng.randrange(1000):03d}",
+        )
+        if rng.random() < INVALID_FRACTION:
+            name, value = rng.choice(invalid_fields)
+            setattr(command, name, value)
+        commands.append(command)
+    return commands
+
+
+def validate_by_constructing_payment_requests(commands: list) -> list:
+    errors = []
+    for command in commands:
+        try:
+            PaymentRequest(command)
+            errors.append(None)
+        except DomainException as e:
+            errors.append(e)
+    return errors
+
+
+def rows_per_second(validate, *arguments) -> tuple:
+    start = time.perf_counter()
+    errors = validate(*arguments)
+    return len(errors) / (time.perf_counter() - start), errors
+
+
+def main():
+    os.environ["LOG_LEVEL"] = "WARNING"
+    commands = make_commands(NUMBER_OF_ROWS)
+
+    columns = [
+        list(map(attrgetter(name), commands))
+        for name in ("merchant_id", "card_number", "expiry_date", "amount", "currency", "cvv")
+    ]
+
+    per_row, expected_errors = rows_per_second(validate_by_constructing_payment_requests, commands)
+    from_columns, errors = rows_per_second(PaymentRequestBatchValidator.validate, *columns)
+    from_commands, errors_of_commands = rows_per_second(
+        PaymentRequestBatchValidator.validate_commands, commands
+    )
+
+    expected_messages = [error and error.messages for error in expected_errors]
+    assert [error and error.messages for error in errors] == expected_messages
+    assert [error and error.messages for error in errors_of_commands] == expected_messages
+    number_invalid = sum(error is not None for error in errors)
+    print(f"Validating {NUMBER_OF_ROWS} SubmitPaymentRequests, {number_invalid} invalid")
+    print(f"  PaymentRequest per row:             {per_row:>12,.0f} rows/s")
+    print(
+        f"  batch validator, from columns:      {from_columns:>12,.0f} rows/s"
+        f"   {from_columns / per_row:>5.1f}x"
+    )
+    print(
+        f"  batch validator, from commands:     {from_commands:>12,.0f} rows/s"
+        f"   {from_commands / per_row:>5.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Time taken to forward a batch of PaymentRequests to a slow Acquiring Bank.
+
+Compares forwarding the commands of an SQS batch one after another with
+PaymentRequestService.forward_payment_requests_to_acquiring_bank. The bank is stood in for
+by a local HTTP server that delays each response, and DynamoDB is emulated by moto.
+
+Usage (from the repository root):
+    python -m benchmarks.bulk_forward_benchmark
+"""
+import os
+import time
+import uuid
+from unittest.mock import patch
+
+import boto3
+from moto import mock_dynamodb
+
+from application.clients.AcquiringBankClient import AcquiringBankClient
+from application.repositories.PaymentRequestsRepository import PaymentRequestsRepository
+from application.services.PaymentRequestService import (
+    MAX_FORWARDS_IN_FLIGHT,
+    MAX_FORWARDS_IN_FLIGHT_PER_MERCHANT,
+    PaymentRequestService,
+)
+from core.commands.ForwardPaymentRequestToAcquiringBank import (
+    ForwardPaymentRequestToAcquiringBank,
+)
+from core.commands.SubmitPaymentRequest import SubmitPaymentRequest
+from core.payment_request_aggregate.PaymentRequest import PaymentRequest
+from shared_kernel.lambda_logging.set_up_logger import configure_context_logger
+from tests.stand_in_bank import StandInBank
+
+BANK_DELAY_SECONDS = 0.1
+BATCH_SIZE = 10
+NUMBER_OF_MERCHANTS = 3
+TABLE_NAME = "payment_requests"
+OUTBOX_TABLE_NAME = "payment_requests_outbox"
+STATUSES_TABLE_NAME = "payment_request_statuses"
+IDEMPOTENCY_KEYS_TABLE_NAME = "idempotency_keys"
+
+
+def set_up_environment(bank_url: str):
+    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+    os.environ["AWS_DEFAULT_REGION"] = "eu-west-2"
+    os.environ["PAYMENT_REQUESTS_DYNAMODB_TABLE_NAME"] = TABLE_NAME
+    os.environ["PAYMENT_REQUESTS_OUTBOX_DYNAMODB_TABLE_NAME"] = OUTBOX_TABLE_NAME
+    os.environ["PAYMENT_REQUEST_STATUSES_DYNAMODB_TABLE_NAME"] = STATUSES_TABLE_NAME
+    os.environ["IDEMPOTENCY_KEYS_DYNAMODB_TABLE_NAME"] = IDEMPOTENCY_KEYS_TABLE_NAME
+    os.environ["ACQUIRING_BANK_POST_PAYMENT_REQUEST_URL"] = bank_url
+    os.environ["ACQUIRING_BANK_API_KEY_SECRET_NAME"] = "api_key_secret_id"
+    os.environ["LOG_LEVEL"] = "WARNING"
+    configure_context_logger()
+
+
+def create_tables():
+    for table_name in (TABLE_NAME, OUTBOX_TABLE_NAME, STATUSES_TABLE_NAME):
+        boto3.resource("dynamodb").create_table(
+            TableName=table_name,
+            KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+    boto3.resource("dynamodb").create_table(
+        TableName=IDEMPOTENCY_KEYS_TABLE_NAME,
+        KeySchema=[{"AttributeName": "key", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": "key", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST",
+    )
+
+
+def make_batch(merchant_ids: list) -> list:
+    repository = PaymentRequestsRepository()
+    commands = []
+    for i in range(BATCH_SIZE):
+        payment_request = PaymentRequest(
+            SubmitPaymentRequest(
+                merchant_ids[i % len(merchant_ids)],
+                "1234123412341234",
+                "11-32",
+                "12.94",
+                "POUNDS",
+                "019",
+            )
+        )
+        repository.upsert(payment_request)
+        commands.append(
+            ForwardPaymentRequestToAcquiringBank(
+                payment_request.id, payment_request.merchant_id.value
+            )
+        )
+    return commands
+
+
+def forward_serially(commands: list):
+    service = PaymentRequestService()
+    for command in commands:
+        service.forward_payment_request_to_acquiring_bank(command)
+
+
+def forward_in_bulk(commands: list):
+    PaymentRequestService().forward_payment_requests_to_acquiring_bank(commands)
+
+
+def time_forward(forward, merchant_ids: list) -> float:
+    commands = make_batch(merchant_ids)
+    start = time.perf_counter()
+    forward(commands)
+    return time.perf_counter() - start
+
+
+def main():
+    merchant_ids = [str(uuid.uuid4()) for _ in range(NUMBER_OF_MERCHANTS)]
+    with StandInBank(delay_seconds=BANK_DELAY_SECONDS) as bank, mock_dynamodb():
+        set_up_environment(bank.url)
+        create_tables()
+        # The API key is not what is being measured, so skip Secrets Manager.
+        with patch.object(AcquiringBankClient, "_get_api_key", return_value="api-key"):
+            serial = time_forward(forward_serially, merchant_ids)
+            bulk = time_forward(forward_in_bulk, merchant_ids)
+
+    print(
+        f"Forwarding a batch of {BATCH_SIZE} for {NUMBER_OF_MERCHANTS} merchants to a bank "
+        f"taking {BANK_DELAY_SECONDS * 1000:.0f} ms per request"
+    )
+    print(f"  serial loop:   {serial * 1000:>8.1f} ms")
+    print(
+        f"  bulk forward:  {bulk * 1000:>8.1f} ms   (in flight: {MAX_FORWARDS_IN_FLIGHT} total, "
+        f"{MAX_FORWARDS_IN_FLIGHT_PER_MERCHANT} per merchant)"
+    )
+    print(f"  speed up:      {serial / bulk:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
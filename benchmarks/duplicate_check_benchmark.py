@@ -0,0 +1,160 @@
+"""False positive rate and latency of the duplicate PaymentRequest pre-check.
+
+DuplicatePaymentRequestDetector remembers recent PaymentRequests in a TimeBucketedBloomFilter,
+and only queries the merchant's recent PaymentRequests when the filter reports one as seen.
+
+False positive rate: the filter is configured as DuplicatePaymentRequestDetector configures it,
+each live bucket is filled with distinct keys, and keys that were never added are checked.
+A key is reported if any live bucket's filter reports it, so with every bucket at capacity
+the expected rate is 1 - (1 - rate) ** live_buckets.
+
+Latency: wall time of a check that the filter answers alone (a PaymentRequest not seen
+before), against the confirmation query a positive check makes (or that every check would make
+without the filter), for a merchant with RECENT_PAYMENT_REQUESTS in the window. DynamoDB is
+emulated by moto, so the query's time is moto's, not a network round trip to DynamoDB, which
+typically adds several milliseconds.
+
+Usage (from the repository root):
+    python -m benchmarks.duplicate_check_benchmark
+"""
+import os
+import statistics
+import time
+import uuid
+from unittest.mock import patch
+
+import boto3
+from moto import mock_dynamodb
+
+from application.repositories.PaymentRequestsRepository import PaymentRequestsRepository
+from application.services.DuplicatePaymentRequestDetector import (
+    BUCKET_SECONDS,
+    CAPACITY_PER_BUCKET,
+    FALSE_POSITIVE_RATE,
+    WINDOW_SECONDS,
+    DuplicatePaymentRequestDetector,
+)
+from core.commands.SubmitPaymentRequest import SubmitPaymentRequest
+from core.payment_request_aggregate.PaymentRequest import PaymentRequest
+from shared_kernel.bloom_filters.TimeBucketedBloomFilter import TimeBucketedBloomFilter
+from shared_kernel.lambda_logging.set_up_logger import configure_context_logger
+
+NUMBER_OF_PROBES = 100_000
+NUMBER_OF_CHECKS = 2000
+RECENT_PAYMENT_REQUESTS = 50
+FILL_FRACTIONS = (0.1, 0.5, 1.0)
+TABLE_NAME = "payment_requests"
+MONOTONIC = "shared_kernel.bloom_filters.TimeBucketedBloomFilter.time.monotonic"
+
+
+def set_up_environment():
+    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+    os.environ["AWS_DEFAULT_REGION"] = "eu-west-2"
+    os.environ["PAYMENT_REQUESTS_DYNAMODB_TABLE_NAME"] = TABLE_NAME
+    os.environ["LOG_LEVEL"] = "WARNING"
+    configure_context_logger()
+
+
+def create_table():
+    boto3.resource("dynamodb").create_table(
+        TableName=TABLE_NAME,
+        KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+        AttributeDefinitions=[
+            {"AttributeName": "id", "AttributeType": "S"},
+            {"AttributeName": "merchant_key", "AttributeType": "S"},
+            {"AttributeName": "created_at", "AttributeType": "N"},
+        ],
+        GlobalSecondaryIndexes=[
+            {
+                "IndexName": "by_merchant_and_created_at",
+                "KeySchema": [
+                    {"AttributeName": "merchant_key", "KeyType": "HASH"},
+                    {"AttributeName": "created_at", "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "ALL"},
+            }
+        ],
+        BillingMode="PAY_PER_REQUEST",
+    )
+
+
+def make_payment_request(merchant_id: str, amount: str) -> PaymentRequest:
+    return PaymentRequest(
+        SubmitPaymentRequest(merchant_id, "1234123412341234", "11-32", amount, "POUNDS", "019")
+    )
+
+
+def false_positive_rate(fill_fraction: float) -> tuple:
+    recent = TimeBucketedBloomFilter(
+        WINDOW_SECONDS, BUCKET_SECONDS, CAPACITY_PER_BUCKET, FALSE_POSITIVE_RATE
+    )
+    keys_per_bucket = int(CAPACITY_PER_BUCKET * fill_fraction)
+    live_buckets = WINDOW_SECONDS // BUCKET_SECONDS + 1
+    for bucket in range(live_buckets):
+        with patch(MONOTONIC, return_value=bucket * BUCKET_SECONDS):
+            for index in range(keys_per_bucket):
+                recent.add(f"added {bucket} {index}".encode())
+
+    with patch(MONOTONIC, return_value=(live_buckets - 1) * BUCKET_SECONDS):
+        false_positives = sum(
+            f"never added {index}".encode() in recent for index in range(NUMBER_OF_PROBES)
+        )
+    return false_positives / NUMBER_OF_PROBES, 1 - (1 - FALSE_POSITIVE_RATE) ** live_buckets
+
+
+def wall_times_us(check, arguments: list) -> list:
+    times = []
+    for argument in arguments:
+        start = time.perf_counter()
+        check(argument)
+        times.append((time.perf_counter() - start) * 1_000_000)
+    return times
+
+
+def report(label: str, times: list):
+    percentiles = statistics.quantiles(times, n=100)
+    print(
+        f"  {label:<34} p50 {percentiles[49]:>8.1f} us   p99 {percentiles[98]:>8.1f} us"
+        f"   mean {statistics.mean(times):>8.1f} us"
+    )
+
+
+def main():
+    with mock_dynamodb():
+        set_up_environment()
+        create_table()
+        repository = PaymentRequestsRepository()
+        detector = DuplicatePaymentRequestDetector(repository)
+        merchant_id = str(uuid.uuid4())
+        for index in range(RECENT_PAYMENT_REQUESTS):
+            repository.upsert(make_payment_request(merchant_id, f"{index + 1}.00"))
+
+        new_payment_requests = [
+            make_payment_request(merchant_id, f"{index + 1}.99")
+            for index in range(NUMBER_OF_CHECKS)
+        ]
+        filter_check_times = wall_times_us(detector.find_duplicate_of, new_payment_requests)
+        since = int(time.time()) - WINDOW_SECONDS
+        confirmation_times = wall_times_us(
+            lambda _: list(repository.iter_by_merchant(merchant_id, since=since)),
+            range(NUMBER_OF_CHECKS // 10),
+        )
+
+    print(
+        f"False positive rate, {WINDOW_SECONDS} s window in {BUCKET_SECONDS} s buckets of"
+        f" {CAPACITY_PER_BUCKET} keys at {FALSE_POSITIVE_RATE}, over {NUMBER_OF_PROBES} probes:"
+    )
+    for fill_fraction in FILL_FRACTIONS:
+        observed, expected_at_capacity = false_positive_rate(fill_fraction)
+        print(
+            f"  buckets {fill_fraction:>4.0%} full{'':<21} observed {observed:.5f}"
+            f"   expected at capacity {expected_at_capacity:.5f}"
+        )
+    print(f"Wall time per check, merchant with {RECENT_PAYMENT_REQUESTS} recent PaymentRequests:")
+    report("Bloom filter only (not seen)", filter_check_times)
+    report("confirmation query (moto)", confirmation_times)
+
+
+if __name__ == "__main__":
+    main()
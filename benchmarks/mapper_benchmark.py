@@ -0,0 +1,85 @@
+"""Objects/second when hydrating PaymentRequest aggregates from DynamoDB items.
+
+Compares the generic Mapper.from_json walk with the compiled builder used by PaymentRequestMapper.
+
+Usage (from the repository root):
+    python -m benchmarks.mapper_benchmark
+"""
+import copy
+import time
+import uuid
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+from application.mapping.mapper import Mapper
+from application.mapping.payment_request_mapper import PaymentRequestMapper
+from core.commands.SubmitPaymentRequest import SubmitPaymentRequest
+from core.payment_request_aggregate.PaymentRequest import PaymentRequest
+from core.payment_request_aggregate.value_objects.AcquiringBankResponse import (
+    AcquiringBankResponse,
+)
+
+NUMBER_OF_ITEMS = 20_000
+REPEATS = 5
+
+
+def make_dynamodb_items(number_of_items):
+    """Items shaped exactly as the boto3 DynamoDB resource returns them from get_item."""
+    serializer = TypeSerializer()
+    deserializer = TypeDeserializer()
+    items = []
+    for i in range(number_of_items):
+        payment_request = PaymentRequest(
+            SubmitPaymentRequest(
+                str(uuid.uuid4()), "1234123412341234", "11-32", f"{i % 500 + 1}.99", "POUNDS", "019"
+            )
+        )
+        if i % 2:
+            payment_request.mark_as_forwarded_to_acquiring_bank()
+        if i % 4 == 3:
+            payment_request.process_acquiring_bank_response(
+                AcquiringBankResponse(AcquiringBankResponse.PAID)
+            )
+        item = Mapper.object_to_dict(payment_request)
+        wire_item = {key: serializer.serialize(value) for key, value in item.items()}
+        items.append({key: deserializer.deserialize(value) for key, value in wire_item.items()})
+    return items
+
+
+def uncompiled_copy(mapper):
+    clone = copy.copy(mapper)
+    clone._builder = None
+    clone.attribute_mappers = {
+        attribute_name: uncompiled_copy(attribute_mapper)
+        for attribute_name, attribute_mapper in mapper.attribute_mappers.items()
+    }
+    return clone
+
+
+def objects_per_second(from_json, items):
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for item in items:
+            from_json(item)
+        best = min(best, time.perf_counter() - start)
+    return len(items) / best
+
+
+def main():
+    items = make_dynamodb_items(NUMBER_OF_ITEMS)
+
+    compiled_mapper = PaymentRequestMapper.mapper
+    generic_mapper = uncompiled_copy(compiled_mapper)
+
+    generic = objects_per_second(generic_mapper.from_json, items)
+    compiled = objects_per_second(compiled_mapper.from_json, items)
+
+    print(f"Hydrating {NUMBER_OF_ITEMS} PaymentRequests from DynamoDB items (best of {REPEATS})")
+    print(f"  generic Mapper.from_json: {generic:>12,.0f} objects/s")
+    print(f"  compiled Mapper:          {compiled:>12,.0f} objects/s")
+    print(f"  speed up:                 {compiled / generic:>12.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Bytes of memory per PaymentRequest aggregate hydrated from a DynamoDB item.
+
+PaymentRequest, AggregateRoot and the value objects declare __slots__, so their instances
+carry no __dict__. For comparison, the same items are also mapped into dict backed twins of
+those classes (plain classes with the same names, whose instances keep their attributes in a
+__dict__, as before the classes were slotted), using the same mapper configuration. Currency
+and AcquiringBankResponse are also interned, so hydrating them allocates nothing; their twins
+are not.
+
+Memory is measured with tracemalloc, as the allocations made while mapping. Attribute values
+taken unchanged from the items (e.g. strings) are shared with the items, so are not counted;
+the amount, parsed to a new Decimal, is, in both layouts. The size of an instance's __dict__
+varies between Python versions, so the saving on the Lambda runtime (3.9) will differ.
+
+Usage (from the repository root):
+    python -m benchmarks.memory_benchmark
+"""
+import copy
+import gc
+import platform
+import tracemalloc
+
+from application.mapping.payment_request_mapper import PaymentRequestMapper
+from benchmarks.mapper_benchmark import make_dynamodb_items
+from shared_kernel.AggregateRoot import AggregateRoot
+from shared_kernel.ValueObject import ValueObject
+
+NUMBER_OF_ITEMS = 100_000
+
+
+def dict_backed_copy(mapper):
+    """Copies a compiled mapper tree, swapping each slotted domain type for a dict backed twin.
+
+    The twins are not interned, as the types were not before they were slotted.
+    """
+    clone = copy.copy(mapper)
+    if issubclass(mapper.target_type, (AggregateRoot, ValueObject)):
+        clone.target_type = type(mapper.target_type.__name__, (), {})
+        clone.interned_instances = None
+    clone.attribute_mappers = {
+        attribute_name: dict_backed_copy(attribute_mapper)
+        for attribute_name, attribute_mapper in mapper.attribute_mappers.items()
+    }
+    return clone.compile()
+
+
+def bytes_per_object(from_json, items) -> float:
+    gc.collect()
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    objects = [from_json(item) for item in items]
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # The list holding the objects costs the same in both layouts, so is not counted.
+    list_bytes = len(objects) * 8
+    del objects
+    return (end - start - list_bytes) / len(items)
+
+
+def main():
+    items = make_dynamodb_items(NUMBER_OF_ITEMS)
+
+    slotted_mapper = PaymentRequestMapper.mapper
+    dict_backed_mapper = dict_backed_copy(slotted_mapper)
+
+    dict_backed = bytes_per_object(dict_backed_mapper.from_json, items)
+    slotted = bytes_per_object(slotted_mapper.from_json, items)
+
+    print(
+        f"Memory per PaymentRequest hydrated from a DynamoDB item, {NUMBER_OF_ITEMS} items,"
+        f" Python {platform.python_version()}"
+    )
+    print(f"  __dict__ (before): {dict_backed:>8.0f} bytes")
+    print(f"  __slots__ (after): {slotted:>8.0f} bytes")
+    print(f"  saving:            {1 - slotted / dict_backed:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
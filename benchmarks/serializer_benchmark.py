@@ -0,0 +1,60 @@
+"""Time taken to turn PaymentRequest aggregates into DynamoDB items.
+
+Compares the previous json round trip (json.dumps then json.loads) with Mapper.object_to_dict.
+
+Usage (from the repository root):
+    python -m benchmarks.serializer_benchmark
+"""
+import json
+import time
+import uuid
+
+from application.mapping.mapper import Mapper
+from core.commands.SubmitPaymentRequest import SubmitPaymentRequest
+from core.payment_request_aggregate.PaymentRequest import PaymentRequest
+
+NUMBER_OF_AGGREGATES = 10_000
+REPEATS = 5
+
+
+def json_round_trip(obj):
+    return json.loads(Mapper.object_to_json_string(obj))
+
+
+def make_aggregates(number_of_aggregates):
+    return [
+        PaymentRequest(
+            SubmitPaymentRequest(
+                str(uuid.uuid4()), "1234123412341234", "11-32", f"{i % 500 + 1}.99", "POUNDS", "019"
+            )
+        )
+        for i in range(number_of_aggregates)
+    ]
+
+
+def best_time(to_dict, aggregates):
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for aggregate in aggregates:
+            to_dict(aggregate)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    aggregates = make_aggregates(NUMBER_OF_AGGREGATES)
+
+    round_trip = best_time(json_round_trip, aggregates)
+    direct = best_time(Mapper.object_to_dict, aggregates)
+
+    print(f"Serialising {NUMBER_OF_AGGREGATES} PaymentRequests to items (best of {REPEATS})")
+    print(f"  json round trip:        {round_trip * 1000:>8.1f} ms")
+    print(f"  Mapper.object_to_dict:  {direct * 1000:>8.1f} ms")
+    print(f"  speed up:               {round_trip / direct:>8.1f}x")
+    print(f"  amount via round trip:  {json_round_trip(aggregates[0])['amount']['amount']!r}")
+    print(f"  amount via direct:      {Mapper.object_to_dict(aggregates[0])['amount']['amount']!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""CPU time spent serving GetPaymentRequestStatus.
+
+Compares two read paths:
+    aggregate: gets the whole item and maps it to a PaymentRequest before forming the DTO
+    projection: gets the response saved to the status projection when the PaymentRequest
+        last changed, with the CVV from the payment requests table, in one BatchGetItem, as
+        served by GetPaymentRequestStatus
+
+DynamoDB is emulated by moto,
+so the end-to-end numbers include moto's own work, which favours the aggregate path: moto
+applies the projection path's ProjectionExpression in-process by deep copying the item, work
+DynamoDB does server-side. The item to response numbers are the Lambda's own work and exclude
+moto.
+
+A ProjectionExpression does not reduce read capacity: DynamoDB charges a read by the size of
+the whole item, so reading the CVV costs the projection path as much as the aggregate's read,
+on top of reading the status. Both items round up to the same 4 KB read unit at this size.
+The capacity reported is what DynamoDB would charge for eventually consistent reads.
+
+Usage (from the repository root):
+    python -m benchmarks.status_read_benchmark
+"""
+import json
+import math
+import os
+import statistics
+import time
+
+import boto3
+from moto import mock_dynamodb
+
+from application.dtos.GetPaymentRequestStatusDTO import GetPaymentRequestStatusDTO
+from application.repositories.PaymentRequestsRepository import (
+    PaymentRequestsRepository,
+    _to_payment_request,
+)
+from application.repositories.PaymentRequestStatusRepository import (
+    PaymentRequestStatusRepository,
+)
+from core.commands.SubmitPaymentRequest import SubmitPaymentRequest
+from core.payment_request_aggregate.PaymentRequest import PaymentRequest
+from shared_kernel.lambda_logging.set_up_logger import configure_context_logger
+
+NUMBER_OF_REQUESTS = 2000
+TABLE_NAME = "payment_requests"
+STATUSES_TABLE_NAME = "payment_request_statuses"
+
+
+def set_up_environment():
+    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+    os.environ["AWS_DEFAULT_REGION"] = "eu-west-2"
+    os.environ["PAYMENT_REQUESTS_DYNAMODB_TABLE_NAME"] = TABLE_NAME
+    os.environ["PAYMENT_REQUEST_STATUSES_DYNAMODB_TABLE_NAME"] = STATUSES_TABLE_NAME
+    os.environ["LOG_LEVEL"] = "WARNING"
+    configure_context_logger()
+
+
+def create_tables():
+    for table_name in (TABLE_NAME, STATUSES_TABLE_NAME):
+        boto3.resource("dynamodb").create_table(
+            TableName=table_name,
+            KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+
+
+def save_payment_request() -> str:
+    payment_request = PaymentRequest(
+        SubmitPaymentRequest(
+            "0b20e14d-0122-4b60-824a-fcc4c2a3b52a",
+            "1234123412341234",
+            "11-32",
+            "12.94",
+            "POUNDS",
+            "019",
+        )
+    )
+    PaymentRequestsRepository().upsert(payment_request)
+    PaymentRequestStatusRepository().save(payment_request)
+    return payment_request.id
+
+
+def via_aggregate(repository: PaymentRequestsRepository, payment_request_id: str) -> dict:
+    payment_request = repository.get_by_aggregate_root_id(payment_request_id)
+    return GetPaymentRequestStatusDTO.from_payment_request(payment_request).json
+
+
+def via_projection(repository: PaymentRequestStatusRepository, payment_request_id: str) -> dict:
+    return GetPaymentRequestStatusDTO.from_status_item(
+        repository.get_status(payment_request_id)
+    ).json
+
+
+def cpu_times_us(serve, *args) -> list:
+    times = []
+    for _ in range(NUMBER_OF_REQUESTS):
+        start = time.process_time()
+        serve(*args)
+        times.append((time.process_time() - start) * 1_000_000)
+    return times
+
+
+def item_size_bytes(item: dict) -> int:
+    # Approximates DynamoDB's item size: the lengths of attribute names and values.
+    return len(json.dumps(item, default=str, separators=(",", ":")))
+
+
+def report(label: str, times: list):
+    percentiles = statistics.quantiles(times, n=100)
+    print(
+        f"  {label:<34} p50 {percentiles[49]:>7.1f} us   p99 {percentiles[98]:>7.1f} us"
+        f"   mean {statistics.mean(times):>7.1f} us"
+    )
+
+
+def main():
+    with mock_dynamodb():
+        set_up_environment()
+        create_tables()
+        payment_request_id = save_payment_request()
+        aggregate_repository = PaymentRequestsRepository()
+        read_repository = PaymentRequestStatusRepository()
+        full_item = (
+            boto3.resource("dynamodb")
+            .Table(TABLE_NAME)
+            .get_item(Key={"id": payment_request_id})["Item"]
+        )
+        status_item = read_repository.get_status(payment_request_id)
+
+        end_to_end_aggregate = cpu_times_us(via_aggregate, aggregate_repository, payment_request_id)
+        end_to_end_projection = cpu_times_us(via_projection, read_repository, payment_request_id)
+
+    item_to_response_aggregate = cpu_times_us(
+        lambda: GetPaymentRequestStatusDTO.from_payment_request(_to_payment_request(full_item))
+    )
+    item_to_response_projection = cpu_times_us(
+        lambda: GetPaymentRequestStatusDTO.from_status_item(status_item)
+    )
+
+    print(f"CPU time to serve {NUMBER_OF_REQUESTS} GetPaymentRequestStatus requests")
+    print(" end to end (including moto):")
+    report("aggregate", end_to_end_aggregate)
+    report("projection", end_to_end_projection)
+    print(" item to response:")
+    report("aggregate", item_to_response_aggregate)
+    report("projection", item_to_response_projection)
+    print(" bytes returned, and RCU charged, per read:")
+    for label, returned, stored in (
+        ("aggregate", [full_item], [full_item]),
+        ("projection", [status_item], [status_item, full_item]),
+    ):
+        rcu = sum(0.5 * math.ceil(item_size_bytes(item) / 4096) for item in stored)
+        print(f"  {label:<34} ~{sum(map(item_size_bytes, returned)):>4} bytes   {rcu} RCU")
+
+
+if __name__ == "__main__":
+    main()
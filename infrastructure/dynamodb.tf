@@ -1,6 +1,56 @@
 
 resource "aws_dynamodb_table" "payment_requests" {
-  name           = "payment_requests"
+  name             = "payment_requests"
+  billing_mode     = "PROVISIONED"
+  read_capacity    = 20
+  write_capacity   = 20
+  hash_key         = "id"
+  stream_enabled   = true
+  stream_view_type = "NEW_IMAGE"
+
+  attribute {
+    name = "id"
+    type = "S"
+  }
+
+  attribute {
+    name = "merchant_key"
+    type = "S"
+  }
+
+  attribute {
+    name = "created_at"
+    type = "N"
+  }
+
+  # Lists a merchant's payment requests in the order they were created.
+  global_secondary_index {
+    name            = "by_merchant_and_created_at"
+    hash_key        = "merchant_key"
+    range_key       = "created_at"
+    read_capacity   = 20
+    write_capacity  = 20
+    projection_type = "ALL"
+  }
+}
+
+resource "aws_dynamodb_table" "payment_requests_outbox" {
+  name             = "payment_requests_outbox"
+  billing_mode     = "PROVISIONED"
+  read_capacity    = 20
+  write_capacity   = 20
+  hash_key         = "id"
+  stream_enabled   = true
+  stream_view_type = "KEYS_ONLY"
+
+  attribute {
+    name = "id"
+    type = "S"
+  }
+}
+
+resource "aws_dynamodb_table" "payment_request_statuses" {
+  name           = "payment_request_statuses"
   billing_mode   = "PROVISIONED"
   read_capacity  = 20
   write_capacity = 20
@@ -11,3 +61,22 @@ resource "aws_dynamodb_table" "payment_requests" {
     type = "S"
   }
 }
+
+resource "aws_dynamodb_table" "idempotency_keys" {
+  name           = "idempotency_keys"
+  billing_mode   = "PROVISIONED"
+  read_capacity  = 20
+  write_capacity = 20
+  hash_key       = "key"
+
+  attribute {
+    name = "key"
+    type = "S"
+  }
+
+  # Completed keys are kept for IDEMPOTENCY_KEY_RETENTION_SECONDS, then deleted by DynamoDB.
+  ttl {
+    attribute_name = "expires_at"
+    enabled        = true
+  }
+}
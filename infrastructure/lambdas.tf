@@ -5,11 +5,14 @@ resource "aws_lambda_function" "ForwardPaymentRequestToAcquiringBank" {
   handler          = "application.lambdas.ForwardPaymentRequestToAcquiringBank.lambda_function.lambda_handler"
   runtime          = "python3.9"
   source_code_hash = filebase64sha256("../payment_gateway_lambdas.zip")
-  timeout          = 30
+  timeout          = 90
   environment {
     variables = {
-      PAYMENT_REQUESTS_DYNAMODB_TABLE_NAME    = aws_dynamodb_table.payment_requests.name
-      QUIET_LOGS                              = "true"
+      PAYMENT_REQUESTS_OUTBOX_DYNAMODB_TABLE_NAME  = aws_dynamodb_table.payment_requests_outbox.name
+      PAYMENT_REQUESTS_DYNAMODB_TABLE_NAME         = aws_dynamodb_table.payment_requests.name
+      PAYMENT_REQUEST_STATUSES_DYNAMODB_TABLE_NAME = aws_dynamodb_table.payment_request_statuses.name
+      IDEMPOTENCY_KEYS_DYNAMODB_TABLE_NAME         = aws_dynamodb_table.idempotency_keys.name
+      QUIET_LOGS                                   = "true"
     }
   }
 }
@@ -23,6 +26,25 @@ resource "aws_lambda_function" "GetPaymentRequestStatus" {
   runtime          = "python3.9"
   source_code_hash = filebase64sha256("../payment_gateway_lambdas.zip")
   timeout          = 30
+  environment {
+    variables = {
+      PAYMENT_REQUESTS_DYNAMODB_TABLE_NAME         = aws_dynamodb_table.payment_requests.name
+      PAYMENT_REQUEST_STATUSES_DYNAMODB_TABLE_NAME = aws_dynamodb_table.payment_request_statuses.name
+      QUIET_LOGS                                   = "true"
+    }
+  }
+}
+
+
+
+resource "aws_lambda_function" "GetPaymentRequestStatuses" {
+  function_name    = "GetPaymentRequestStatuses"
+  filename         = "../payment_gateway_lambdas.zip"
+  role             = "fake_role" # localstack doesn't support IAM in community edition
+  handler          = "application.lambdas.GetPaymentRequestStatuses.lambda_function.lambda_handler"
+  runtime          = "python3.9"
+  source_code_hash = filebase64sha256("../payment_gateway_lambdas.zip")
+  timeout          = 30
   environment {
     variables = {
       PAYMENT_REQUESTS_DYNAMODB_TABLE_NAME = aws_dynamodb_table.payment_requests.name
@@ -31,6 +53,21 @@ resource "aws_lambda_function" "GetPaymentRequestStatus" {
   }
 }
 
+resource "aws_lambda_function" "ListPaymentRequests" {
+  function_name    = "ListPaymentRequests"
+  filename         = "../payment_gateway_lambdas.zip"
+  role             = "fake_role" # localstack doesn't support IAM in community edition
+  handler          = "application.lambdas.ListPaymentRequests.lambda_function.lambda_handler"
+  runtime          = "python3.9"
+  source_code_hash = filebase64sha256("../payment_gateway_lambdas.zip")
+  timeout          = 30
+  environment {
+    variables = {
+      PAYMENT_REQUESTS_DYNAMODB_TABLE_NAME = aws_dynamodb_table.payment_requests.name
+      QUIET_LOGS                           = "true"
+    }
+  }
+}
 
 resource "aws_lambda_function" "ProcessAcquiringBankResponse" {
   function_name    = "ProcessAcquiringBankResponse"
@@ -42,8 +79,11 @@ resource "aws_lambda_function" "ProcessAcquiringBankResponse" {
   timeout          = 30
   environment {
     variables = {
-      PAYMENT_REQUESTS_DYNAMODB_TABLE_NAME = aws_dynamodb_table.payment_requests.name
-      QUIET_LOGS                           = "true"
+      PAYMENT_REQUESTS_OUTBOX_DYNAMODB_TABLE_NAME  = aws_dynamodb_table.payment_requests_outbox.name
+      PAYMENT_REQUESTS_DYNAMODB_TABLE_NAME         = aws_dynamodb_table.payment_requests.name
+      PAYMENT_REQUEST_STATUSES_DYNAMODB_TABLE_NAME = aws_dynamodb_table.payment_request_statuses.name
+      IDEMPOTENCY_KEYS_DYNAMODB_TABLE_NAME         = aws_dynamodb_table.idempotency_keys.name
+      QUIET_LOGS                                   = "true"
     }
   }
 }
@@ -59,9 +99,76 @@ resource "aws_lambda_function" "SubmitPaymentRequest" {
   timeout          = 30
   environment {
     variables = {
-      PAYMENT_REQUESTS_DYNAMODB_TABLE_NAME   = aws_dynamodb_table.payment_requests.name
-      PAYMENT_REQUESTS_TO_FORWARD_QUEUE_NAME = aws_sqs_queue.forward_payment_request_to_acquiring_bank.name
-      QUIET_LOGS                             = "true"
+      PAYMENT_REQUESTS_OUTBOX_DYNAMODB_TABLE_NAME  = aws_dynamodb_table.payment_requests_outbox.name
+      PAYMENT_REQUESTS_DYNAMODB_TABLE_NAME         = aws_dynamodb_table.payment_requests.name
+      PAYMENT_REQUESTS_TO_FORWARD_QUEUE_NAME       = aws_sqs_queue.forward_payment_request_to_acquiring_bank.name
+      PAYMENT_REQUEST_STATUSES_DYNAMODB_TABLE_NAME = aws_dynamodb_table.payment_request_statuses.name
+      IDEMPOTENCY_KEYS_DYNAMODB_TABLE_NAME         = aws_dynamodb_table.idempotency_keys.name
+      QUIET_LOGS                                   = "true"
     }
   }
 }
+
+
+
+resource "aws_lambda_function" "SubmitPaymentRequests" {
+  function_name    = "SubmitPaymentRequests"
+  filename         = "../payment_gateway_lambdas.zip"
+  role             = "fake_role" # localstack doesn't support IAM in community edition
+  handler          = "application.lambdas.SubmitPaymentRequests.lambda_function.lambda_handler"
+  runtime          = "python3.9"
+  source_code_hash = filebase64sha256("../payment_gateway_lambdas.zip")
+  timeout          = 30
+  memory_size      = 512
+  environment {
+    variables = {
+      PAYMENT_REQUESTS_OUTBOX_DYNAMODB_TABLE_NAME  = aws_dynamodb_table.payment_requests_outbox.name
+      PAYMENT_REQUESTS_DYNAMODB_TABLE_NAME         = aws_dynamodb_table.payment_requests.name
+      PAYMENT_REQUESTS_TO_FORWARD_QUEUE_NAME       = aws_sqs_queue.forward_payment_request_to_acquiring_bank.name
+      PAYMENT_REQUEST_STATUSES_DYNAMODB_TABLE_NAME = aws_dynamodb_table.payment_request_statuses.name
+      IDEMPOTENCY_KEYS_DYNAMODB_TABLE_NAME         = aws_dynamodb_table.idempotency_keys.name
+      QUIET_LOGS                                   = "true"
+    }
+  }
+}
+
+resource "aws_lambda_function" "RelayOutbox" {
+  function_name    = "RelayOutbox"
+  filename         = "../payment_gateway_lambdas.zip"
+  role             = "fake_role" # localstack doesn't support IAM in community edition
+  handler          = "application.lambdas.RelayOutbox.lambda_function.lambda_handler"
+  runtime          = "python3.9"
+  source_code_hash = filebase64sha256("../payment_gateway_lambdas.zip")
+  timeout          = 60
+  environment {
+    variables = {
+      PAYMENT_REQUESTS_OUTBOX_DYNAMODB_TABLE_NAME = aws_dynamodb_table.payment_requests_outbox.name
+      QUIET_LOGS                                  = "true"
+    }
+  }
+}
+
+resource "aws_lambda_function" "RebuildPaymentRequestStatuses" {
+  function_name    = "RebuildPaymentRequestStatuses"
+  filename         = "../payment_gateway_lambdas.zip"
+  role             = "fake_role" # localstack doesn't support IAM in community edition
+  handler          = "application.lambdas.RebuildPaymentRequestStatuses.lambda_function.lambda_handler"
+  runtime          = "python3.9"
+  source_code_hash = filebase64sha256("../payment_gateway_lambdas.zip")
+  timeout          = 900
+  environment {
+    variables = {
+      PAYMENT_REQUESTS_DYNAMODB_TABLE_NAME         = aws_dynamodb_table.payment_requests.name
+      PAYMENT_REQUEST_STATUSES_DYNAMODB_TABLE_NAME = aws_dynamodb_table.payment_request_statuses.name
+      QUIET_LOGS                                   = "true"
+    }
+  }
+}
+
+resource "aws_lambda_permission" "allow_events_to_invoke_RelayOutbox" {
+  statement_id  = "AllowExecutionFromEventBridge"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.RelayOutbox.function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.relay_outbox_every_minute.arn
+}
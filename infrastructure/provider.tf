@@ -9,6 +9,7 @@ provider "aws" {
   endpoints {
     lambda         = "http://localhost:4566"
     dynamodb       = "http://localhost:4566"
+    events         = "http://localhost:4566"
     sqs            = "http://localhost:4566"
     secretsmanager = "http://localhost:4566"
   }
@@ -3,7 +3,7 @@ resource "aws_sqs_queue" "forward_payment_request_to_acquiring_bank" {
   name                       = "forward-payment-request-to-acquiring-bank"
   sqs_managed_sse_enabled    = true
   message_retention_seconds  = 1209600
-  visibility_timeout_seconds = 30
+  visibility_timeout_seconds = 540 # 6x the lambda timeout, as recommended by AWS
   redrive_policy = jsonencode({
     deadLetterTargetArn = aws_sqs_queue.forward_payment_request_to_acquiring_bank_dlq.arn
     maxReceiveCount     = 1
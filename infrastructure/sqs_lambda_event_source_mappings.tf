@@ -1,5 +1,50 @@
 resource "aws_lambda_event_source_mapping" "trigger_ForwardPaymentRequestToAcquiringBank_from_command_queue" {
-  event_source_arn = aws_sqs_queue.forward_payment_request_to_acquiring_bank.arn
-  function_name    = aws_lambda_function.ForwardPaymentRequestToAcquiringBank.arn
-  batch_size       = 1
+  event_source_arn        = aws_sqs_queue.forward_payment_request_to_acquiring_bank.arn
+  function_name           = aws_lambda_function.ForwardPaymentRequestToAcquiringBank.arn
+  batch_size              = 10
+  function_response_types = ["ReportBatchItemFailures"]
+}
+
+resource "aws_lambda_event_source_mapping" "trigger_RelayOutbox_from_outbox_stream" {
+  event_source_arn                   = aws_dynamodb_table.payment_requests_outbox.stream_arn
+  function_name                      = aws_lambda_function.RelayOutbox.arn
+  starting_position                  = "LATEST"
+  batch_size                         = 100
+  maximum_batching_window_in_seconds = 1
+
+  # Only new entries are relayed. Without this, the REMOVE records of the relay's own deletes
+  # would invoke it again.
+  filter_criteria {
+    filter {
+      pattern = jsonencode({ eventName = ["INSERT"] })
+    }
+  }
+}
+
+# Sweeps the outbox for entries that a previous relay failed to publish.
+resource "aws_cloudwatch_event_rule" "relay_outbox_every_minute" {
+  name                = "relay-outbox-every-minute"
+  schedule_expression = "rate(1 minute)"
+}
+
+resource "aws_cloudwatch_event_target" "relay_outbox_every_minute" {
+  rule = aws_cloudwatch_event_rule.relay_outbox_every_minute.name
+  arn  = aws_lambda_function.RelayOutbox.arn
+}
+
+# Rebuilds the status of each changed PaymentRequest, repairing those left behind by a failed save.
+resource "aws_lambda_event_source_mapping" "trigger_RebuildPaymentRequestStatuses_from_payment_requests_stream" {
+  event_source_arn                   = aws_dynamodb_table.payment_requests.stream_arn
+  function_name                      = aws_lambda_function.RebuildPaymentRequestStatuses.arn
+  starting_position                  = "LATEST"
+  batch_size                         = 100
+  maximum_batching_window_in_seconds = 1
+  maximum_retry_attempts             = 10
+  function_response_types            = ["ReportBatchItemFailures"]
+
+  filter_criteria {
+    filter {
+      pattern = jsonencode({ eventName = ["INSERT", "MODIFY"] })
+    }
+  }
 }
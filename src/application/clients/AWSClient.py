@@ -1,34 +1,114 @@
 import os
+import threading
 
 import boto3
+from botocore.config import Config
+
+# Connections are kept alive between warm invocations of a Lambda, so the timeouts are kept
+# short and retries use the standard mode, which backs off and retries throttling errors.
+DEFAULT_CONFIG = Config(
+    max_pool_connections=10,
+    tcp_keepalive=True,
+    connect_timeout=2,
+    read_timeout=5,
+    retries={"mode": "standard", "max_attempts": 3},
+)
 
 
 class AWSClient:
+    """Creates boto3 clients and resources once per container, then reuses them.
+
+    Lambda instantiates repositories and services on every invocation. Caching means warm
+    invocations no longer pay for session creation, endpoint resolution and a new connection pool.
+
+    Clients and resources are keyed by service, endpoint and region. boto3 clients are thread
+    safe, so they are shared by all threads. boto3 resources are not, so each thread gets its own.
+    """
+
+    _config = DEFAULT_CONFIG
+    _lock = threading.Lock()
+    _clients = {}
+    _thread_local = threading.local()
+    # Incremented by clear_cache, so resources cached by other threads are discarded too.
+    _generation = 0
+
+    @classmethod
+    def configure(cls, config: Config) -> None:
+        """Sets the botocore Config used for new clients and resources, and clears the cache.
+
+        Args:
+            config (Config): e.g. Config(max_pool_connections=50, read_timeout=10)
+        """
+        with cls._lock:
+            cls._config = config
+        cls.clear_cache()
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        with cls._lock:
+            cls._clients = {}
+            cls._generation += 1
+
     @staticmethod
     def get_dynamodb_resource():
-        if os.environ.get("LOCALSTACK_HOSTNAME"):
-            return boto3.resource(
-                "dynamodb", endpoint_url=f"http://{os.environ['LOCALSTACK_HOSTNAME']}:4566"
-            )
-        else:
-            return boto3.resource("dynamodb")
+        return AWSClient._get_resource("dynamodb")
 
     @staticmethod
     def get_sqs_resource():
-        if os.environ.get("LOCALSTACK_HOSTNAME"):
-            return boto3.resource(
-                "sqs", endpoint_url=f"http://{os.environ['LOCALSTACK_HOSTNAME']}:4566"
-            )
-        else:
-            return boto3.resource("sqs")
+        return AWSClient._get_resource("sqs")
 
     @staticmethod
     def get_secretsmanager_client():
-        if os.environ.get("LOCALSTACK_HOSTNAME"):
-            return boto3.client(
-                service_name="secretsmanager",
-                region_name="eu-west-2",
-                endpoint_url=f"http://{os.environ['LOCALSTACK_HOSTNAME']}:4566",
-            )
-        else:
-            return boto3.client(service_name="secretsmanager", region_name="eu-west-2")
+        return AWSClient._get_client("secretsmanager", region_name="eu-west-2")
+
+    @classmethod
+    def _get_resource(cls, service_name: str, region_name: str = None):
+        resources = getattr(cls._thread_local, "resources", None)
+        if resources is None or cls._thread_local.generation != cls._generation:
+            resources = cls._thread_local.resources = {}
+            cls._thread_local.generation = cls._generation
+
+        key = cls._cache_key(service_name, region_name)
+        resource = resources.get(key)
+        if resource is None:
+            # The default boto3 session is not thread safe, so creation is serialised.
+            with cls._lock:
+                resource = boto3.resource(
+                    service_name, **cls._connection_arguments(region_name), config=cls._config
+                )
+            resources[key] = resource
+        return resource
+
+    @classmethod
+    def _get_client(cls, service_name: str, region_name: str = None):
+        key = cls._cache_key(service_name, region_name)
+        client = cls._clients.get(key)
+        if client is None:
+            with cls._lock:
+                client = cls._clients.get(key)
+                if client is None:
+                    client = boto3.client(
+                        service_name=service_name,
+                        **cls._connection_arguments(region_name),
+                        config=cls._config,
+                    )
+                    cls._clients[key] = client
+        return client
+
+    @staticmethod
+    def _connection_arguments(region_name: str = None) -> dict:
+        connection_arguments = {}
+        if region_name:
+            connection_arguments["region_name"] = region_name
+        localstack_hostname = os.environ.get("LOCALSTACK_HOSTNAME")
+        if localstack_hostname:
+            connection_arguments["endpoint_url"] = f"http://{localstack_hostname}:4566"
+        return connection_arguments
+
+    @staticmethod
+    def _cache_key(service_name: str, region_name: str = None) -> tuple:
+        return (
+            service_name,
+            os.environ.get("LOCALSTACK_HOSTNAME"),
+            region_name or os.environ.get("AWS_REGION") or os.environ.get("AWS_DEFAULT_REGION"),
+        )
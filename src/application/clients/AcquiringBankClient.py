@@ -1,22 +1,68 @@
 import os
+import threading
 
 import requests
+from requests.adapters import HTTPAdapter
 
-from application.clients.AWSClient import AWSClient
+from application.clients.SecretsCache import SecretsCache
 from application.mapping.payment_request_mapper import Mapper
 from core.payment_request_aggregate.PaymentRequest import PaymentRequest
 from shared_kernel.lambda_logging import get_logger
 
+# Maximum number of connections kept open to the bank, i.e. the number of concurrent requests
+# that can reuse a connection.
+POOL_SIZE = int(os.environ.get("ACQUIRING_BANK_HTTP_POOL_SIZE", "10"))
+CONNECT_TIMEOUT_SECONDS = float(os.environ.get("ACQUIRING_BANK_CONNECT_TIMEOUT_SECONDS", "3.05"))
+READ_TIMEOUT_SECONDS = float(os.environ.get("ACQUIRING_BANK_READ_TIMEOUT_SECONDS", "30"))
+# Status codes that mean the bank did not accept our API key, which may have been rotated.
+UNAUTHORISED_STATUS_CODES = (401, 403)
+
 
 class AcquiringBankClient:
     """
     Assumption: API Key (also, potentially network level controls)
     will be used to authenticate our system to call Bank's APIs
+
+    Requests are sent through a pooled HTTP session that is created once per container,
+    so warm invocations reuse kept-alive TCP+TLS connections to the bank.
+
+    The API key is read through SecretsCache. If the bank responds 401/403 the key is
+    refreshed from Secrets Manager and, if it has been rotated, the request is retried once.
     """
 
+    _session = None
+    _session_lock = threading.Lock()
+
+    @classmethod
+    def get_session(cls) -> requests.Session:
+        """Gets the container-scoped session, creating it on first use.
+
+        Returns:
+            requests.Session: session with a connection pool of POOL_SIZE connections
+        """
+        if cls._session is None:
+            with cls._session_lock:
+                if cls._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    session.headers["Connection"] = "keep-alive"
+                    cls._session = session
+        return cls._session
+
+    @classmethod
+    def close_session(cls) -> None:
+        """Closes the container-scoped session and its pooled connections."""
+        with cls._session_lock:
+            if cls._session is not None:
+                cls._session.close()
+                cls._session = None
+
     def __init__(self):
         self.logger = get_logger()
         if not os.environ.get("LOCALSTACK_HOSTNAME"):
+            self.api_key_secret_name = os.environ["ACQUIRING_BANK_API_KEY_SECRET_NAME"]
             self.api_key = self._get_api_key()
             self.api_post_payment_request_url = os.environ[
                 "ACQUIRING_BANK_POST_PAYMENT_REQUEST_URL"
@@ -27,26 +73,34 @@ class AcquiringBankClient:
             self.logger.info("In localstack, continuing without sending request to Acquiring Bank.")
             return
 
-        response = requests.post(
+        payment_request_json = Mapper.object_to_json_string(payment_request)
+        response = self._post(payment_request_json)
+
+        if response.status_code in UNAUTHORISED_STATUS_CODES:
+            rejected_api_key = self.api_key
+            self.api_key = self._get_api_key(force_refresh=True)
+            if self.api_key != rejected_api_key:
+                self.logger.info("API key was rejected and has been rotated, retrying.")
+                response = self._post(payment_request_json)
+
+        # Any 4xx or 5xx status will cause exception to be raised
+        response.raise_for_status()
+
+    def _post(self, payment_request_json: str) -> requests.Response:
+        response = self.get_session().post(
             self.api_post_payment_request_url,
-            timeout=30,
+            timeout=(CONNECT_TIMEOUT_SECONDS, READ_TIMEOUT_SECONDS),
             headers={
                 "x-api-key": self.api_key,
             },
-            json=Mapper.object_to_json_string(payment_request),
+            json=payment_request_json,
         )
-
         self.logger.info(f"Status code response from bank: {response.status_code}")
+        return response
 
-        # Any 4xx or 5xx status will cause exception to be raised
-        response.raise_for_status()
-
-    def _get_api_key(self):
+    def _get_api_key(self, force_refresh: bool = False):
         try:
-            api_key_secret_name = os.environ["ACQUIRING_BANK_API_KEY_SECRET_NAME"]
-            client = AWSClient.get_secretsmanager_client()
-            get_secret_response = client.get_secret_value(SecretId=api_key_secret_name)
-            return get_secret_response["SecretString"]
+            return SecretsCache.get(self.api_key_secret_name, force_refresh=force_refresh)
         except Exception as e:
             self.logger.error("Failed to get API key.")
             raise e
@@ -0,0 +1,125 @@
+import os
+import threading
+from typing import Iterable, List
+
+from botocore.exceptions import ClientError
+
+from application.clients.AWSClient import AWSClient
+from application.mapping.mapper import Mapper
+from application.repositories.batching import MAX_ATTEMPTS, chunked, wait_before_retry
+from shared_kernel.lambda_logging import get_logger
+
+SEND_MESSAGE_BATCH_LIMIT = 10
+
+
+class CommandQueue:
+    """Publishes commands, serialised as JSON, to an SQS queue.
+
+    Queue URLs are resolved once per container and cached, so publishing a command is a single
+    SQS round trip. Many commands can be published with send_many, ten per SendMessageBatch call.
+    """
+
+    _lock = threading.Lock()
+    _queue_urls = {}
+
+    def __init__(self, queue_name: str):
+        self.logger = get_logger()
+        self.queue_name = queue_name
+        sqs_resource = AWSClient.get_sqs_resource()
+        # Queue() only builds the resource from the URL, it does not call SQS.
+        self.queue = sqs_resource.Queue(self._get_queue_url(sqs_resource, queue_name))
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        with cls._lock:
+            cls._queue_urls = {}
+
+    def send(self, command: object) -> None:
+        """Publishes a command.
+
+        Args:
+            command (object): the command to publish
+        """
+        self.queue.send_message(MessageBody=Mapper.object_to_json_string(command))
+
+    def send_many(self, commands: Iterable[object]) -> dict:
+        """Publishes many commands, using SendMessageBatch.
+
+        Commands are sent in batches of 10 (the SendMessageBatch limit). Entries that fail
+        because of an SQS fault are retried with exponential backoff; entries that fail because
+        of a fault in the message itself are not, as they would fail again.
+
+        Args:
+            commands (Iterable[object]): the commands to publish
+
+        Returns:
+            dict: position in commands -> reason, for each command that could not be published.
+        """
+        return self.send_message_bodies(
+            Mapper.object_to_json_string(command) for command in commands
+        )
+
+    def send_message_bodies(self, message_bodies: Iterable[str]) -> dict:
+        """Publishes commands that have already been serialised, as send_many does.
+
+        Args:
+            message_bodies (Iterable[str]): the serialised commands to publish
+
+        Returns:
+            dict: position in message_bodies -> reason, for each that could not be published.
+        """
+        failures = {}
+        position = 0
+        for chunk in chunked(message_bodies, SEND_MESSAGE_BATCH_LIMIT):
+            entries = [
+                {"Id": str(position + i), "MessageBody": message_body}
+                for i, message_body in enumerate(chunk)
+            ]
+            failures.update(self._send_batch(entries))
+            position += len(chunk)
+
+        if failures:
+            self.logger.error(f"Failed to publish {len(failures)} commands to {self.queue_name}.")
+        return failures
+
+    def _send_batch(self, entries: List[dict]) -> dict:
+        failures = {}
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                response = self.queue.send_messages(Entries=entries)
+            except ClientError as e:
+                reason = e.response["Error"]["Code"]
+                self.logger.error(f"Failed to publish batch of commands: {reason}")
+                failures.update({int(entry["Id"]): reason for entry in entries})
+                return failures
+
+            entries_by_id = {entry["Id"]: entry for entry in entries}
+            entries = []
+            for failed in response.get("Failed", []):
+                if failed["SenderFault"]:
+                    failures[int(failed["Id"])] = failed["Code"]
+                else:
+                    entries.append(entries_by_id[failed["Id"]])
+
+            if not entries:
+                return failures
+
+            if attempt == MAX_ATTEMPTS:
+                reason = f"Unprocessed after {MAX_ATTEMPTS} attempts."
+                failures.update({int(entry["Id"]): reason for entry in entries})
+                return failures
+
+            self.logger.info(f"Retrying {len(entries)} commands that could not be published.")
+            wait_before_retry(attempt)
+
+    @classmethod
+    def _get_queue_url(cls, sqs_resource, queue_name: str) -> str:
+        key = (queue_name, os.environ.get("LOCALSTACK_HOSTNAME"))
+        queue_url = cls._queue_urls.get(key)
+        if queue_url is None:
+            queue_url = sqs_resource.meta.client.get_queue_url(QueueName=queue_name)["QueueUrl"]
+            with cls._lock:
+                cls._queue_urls[key] = queue_url
+        return queue_url
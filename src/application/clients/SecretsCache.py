@@ -0,0 +1,69 @@
+import os
+import threading
+import time
+
+from application.clients.AWSClient import AWSClient
+from shared_kernel.lambda_logging import get_logger
+
+TTL_SECONDS = float(os.environ.get("SECRETS_CACHE_TTL_SECONDS", "300"))
+
+
+class SecretsCache:
+    """Caches secret values from Secrets Manager for the lifetime of the container.
+
+    Values are refreshed lazily: the first read after TTL_SECONDS fetches the secret again.
+    If that fetch fails, the stale value is served so a Secrets Manager blip does not fail
+    every request. Callers that know a value is wrong (e.g. the bank rejected the API key)
+    can force a refresh.
+    """
+
+    _lock = threading.Lock()
+    _entries = {}
+
+    @classmethod
+    def get(cls, secret_id: str, force_refresh: bool = False) -> str:
+        """Gets a secret's value, fetching it if it is not cached, expired or forced.
+
+        Args:
+            secret_id (str): name or ARN of the secret
+            force_refresh (bool): fetch the secret even if a fresh value is cached
+
+        Raises:
+            Exception: if the secret cannot be fetched and no value is cached
+
+        Returns:
+            str: the secret's SecretString
+        """
+        entry = cls._entries.get(secret_id)
+        if entry is not None and not force_refresh and not cls._is_expired(entry):
+            return entry[0]
+
+        # Fetching under the lock stops concurrent threads all fetching the same secret.
+        with cls._lock:
+            entry = cls._entries.get(secret_id)
+            if entry is not None and not force_refresh and not cls._is_expired(entry):
+                return entry[0]
+            try:
+                value = cls._fetch(secret_id)
+            except Exception as e:
+                if entry is None or force_refresh:
+                    get_logger().error(f"Failed to get secret: {secret_id}")
+                    raise e
+                get_logger().warning(f"Failed to refresh secret, using cached value: {secret_id}")
+                return entry[0]
+            cls._entries[secret_id] = (value, time.monotonic())
+            return value
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls._entries = {}
+
+    @staticmethod
+    def _fetch(secret_id: str) -> str:
+        client = AWSClient.get_secretsmanager_client()
+        return client.get_secret_value(SecretId=secret_id)["SecretString"]
+
+    @staticmethod
+    def _is_expired(entry: tuple) -> bool:
+        return time.monotonic() - entry[1] >= TTL_SECONDS
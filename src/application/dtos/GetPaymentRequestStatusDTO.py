@@ -1,18 +1,89 @@
 from core.payment_request_aggregate.PaymentRequest import PaymentRequest
 from shared_kernel.lambda_logging.set_up_logger import get_logger
 
+IN_PAYMENT_GATEWAY = "Processing - In Payment Gateway"
+AWAITING_ACQUIRING_BANK_RESPONSE = "Processing - Awaiting response from acquiring bank"
+
 
 class GetPaymentRequestStatusDTO:
-    def __init__(self, payment_request: PaymentRequest, status: str):
+    def __init__(self, json: dict, etag: str):
         get_logger().info("Forming GetPaymentRequestStatusDTO to return to client.")
-        self.json = {
-            "payment_details": {
-                "id": payment_request.id,
-                "card_number": payment_request.card_number.to_masked_card_number(),
-                "cvv": payment_request.cvv.value,
-                "expiry_date": str(payment_request.expiry_date),
-                "amount": payment_request.amount.amount,
-                "currency": payment_request.amount.currency.value,
+        self.json = json
+        self.etag = etag
+
+    @classmethod
+    def from_payment_request(cls, payment_request: PaymentRequest):
+        return cls(
+            {
+                "payment_details": {
+                    "id": payment_request.id,
+                    "card_number": payment_request.card_number.to_masked_card_number(),
+                    "cvv": payment_request.cvv.value,
+                    "expiry_date": str(payment_request.expiry_date),
+                    "amount": payment_request.amount.amount,
+                    "currency": payment_request.amount.currency.value,
+                },
+                "status": cls.status_of(payment_request),
             },
-            "status": status,
-        }
+            etag_of(payment_request.version),
+        )
+
+    @classmethod
+    def from_status_item(cls, status_item: dict):
+        """Forms the DTO from a status saved by PaymentRequestStatusRepository.
+
+        Args:
+            status_item (dict): _
+
+        Returns:
+            GetPaymentRequestStatusDTO: _
+        """
+        return cls(
+            {
+                "payment_details": status_item["payment_details"],
+                "status": status_item["status"],
+            },
+            etag_of(status_item["version"]),
+        )
+
+    @staticmethod
+    def status_of(payment_request: PaymentRequest) -> str:
+        response = payment_request.acquiring_bank_response
+        return describe_status(
+            payment_request.is_sent_to_acquiring_bank, response.value if response else None
+        )
+
+
+def describe_status(is_sent_to_acquiring_bank: bool, acquiring_bank_response: str = None) -> str:
+    """Describes how far a PaymentRequest has progressed, for merchants.
+
+    Assumption has been made that whatever status is provided to the Payment
+    Gateway by the Acquiring Bank, can safely be shown to Merchants as-is.
+
+    Args:
+        is_sent_to_acquiring_bank (bool): _
+        acquiring_bank_response (str): value of the AcquiringBankResponse, if one was received
+
+    Returns:
+        str: the status
+    """
+    if not is_sent_to_acquiring_bank:
+        return IN_PAYMENT_GATEWAY
+    if acquiring_bank_response is None:
+        return AWAITING_ACQUIRING_BANK_RESPONSE
+    return acquiring_bank_response
+
+
+def etag_of(version: int) -> str:
+    """Forms a strong ETag for the status of a PaymentRequest at a version.
+
+    The status is formed only from the PaymentRequest, which is saved with a new version on
+    every change, so a version identifies a single representation of its status.
+
+    Args:
+        version (int): version of the PaymentRequest
+
+    Returns:
+        str: the ETag, quoted as HTTP requires
+    """
+    return f'"{version}"'
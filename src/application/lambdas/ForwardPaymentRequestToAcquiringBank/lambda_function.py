@@ -5,35 +5,55 @@ from core.commands.ForwardPaymentRequestToAcquiringBank import (
     ForwardPaymentRequestToAcquiringBank,
 )
 from shared_kernel.lambda_logging.decorators import configure_lambda_logger
-from shared_kernel.lambda_logging.set_up_logger import add_context, get_logger
+from shared_kernel.lambda_logging.set_up_logger import get_logger
 
 
 @configure_lambda_logger
 def lambda_handler(event, context):
     """Triggered via SQS Event Source Mapping
 
-    Pulls single message off queue (could be modified to process
-    batches by looping over Records).
+    Forwards every message in the batch concurrently. The event source mapping reports batch
+    item failures, so only the messages that failed are returned to the queue (and DLQ'd once
+    maxReceiveCount is reached); the rest of the batch is deleted.
 
     Message follows ForwardPaymentRequestToAcquiringBank schema.
     Versioning should be introduced for this command schema to simplify
     backward compatibility.
 
-    Exceptions are deliberately not handled, so messages are DLQ'd if they are not processed.
-
     Args:
         event (dict): provided by SQS
         context (object): provided by AWS
+
+    Returns:
+        dict: batchItemFailures, the messageIds of messages that were not processed
     """
     logger = get_logger()
+    logger.info(f"Received {len(event['Records'])} messages from SQS.")
+
+    batch_item_failures = []
+    message_ids = []
+    commands = []
+    for record in event["Records"]:
+        try:
+            commands.append(_parse_command(record))
+            message_ids.append(record["messageId"])
+        except Exception as e:
+            # Exceptions can contain PII, so only the type is logged.
+            logger.error(f"Failed to parse message {record['messageId']}: {type(e).__name__}")
+            batch_item_failures.append({"itemIdentifier": record["messageId"]})
+
+    service = PaymentRequestService()
+    outcomes = service.forward_payment_requests_to_acquiring_bank(commands)
 
-    message_body = json.loads(event["Records"][0]["body"])
-    logger.info("Parsed message from SQS.")
+    for message_id, outcome in zip(message_ids, outcomes):
+        if outcome is not None:
+            logger.error(f"Failed to forward message {message_id}: {type(outcome).__name__}")
+            batch_item_failures.append({"itemIdentifier": message_id})
 
-    command_from_queue = ForwardPaymentRequestToAcquiringBank.from_json(message_body)
-    add_context(logger, "merchant_id", command_from_queue.merchant_id)
-    logger.info("Formed ForwardPaymentRequestToAcquiringBank command.")
+    logger.info(f"Forwarded {len(event['Records']) - len(batch_item_failures)} messages.")
+    return {"batchItemFailures": batch_item_failures}
 
-    service = PaymentRequestService()
-    service.forward_payment_request_to_acquiring_bank(command_from_queue)
-    logger.info("Forwarded to acquiring bank.")
+
+def _parse_command(record: dict) -> ForwardPaymentRequestToAcquiringBank:
+    message_body = json.loads(record["body"])
+    return ForwardPaymentRequestToAcquiringBank.from_json(message_body)
@@ -1,6 +1,14 @@
+import os
+
 from application.dtos.GetPaymentRequestStatusDTO import GetPaymentRequestStatusDTO
 from application.repositories.exceptions.NotFound import NotFound
-from application.repositories.PaymentRequestsRepository import PaymentRequestsRepository
+from application.repositories.PaymentRequestStatusRepository import (
+    PaymentRequestStatusRepository,
+)
+from core.payment_request_aggregate.value_objects.AcquiringBankResponse import (
+    AcquiringBankResponse,
+)
+from shared_kernel.caching.LRUCache import LRUCache
 from shared_kernel.guard_clauses.uuid_guard import is_valid_uuid
 from shared_kernel.lambda_logging.decorators import (
     configure_lambda_logger,
@@ -9,6 +17,18 @@ from shared_kernel.lambda_logging.decorators import (
 )
 from shared_kernel.lambda_logging.set_up_logger import add_context, get_logger
 
+# Statuses are cached for the lifetime of the container. A terminal status never changes, so is
+# kept for longer; any other status is kept briefly, to absorb merchants polling in a tight loop.
+STATUS_CACHE_MAX_SIZE = int(os.environ.get("STATUS_CACHE_MAX_SIZE", "10000"))
+TERMINAL_STATUS_CACHE_TTL_SECONDS = float(
+    os.environ.get("TERMINAL_STATUS_CACHE_TTL_SECONDS", "3600")
+)
+NON_TERMINAL_STATUS_CACHE_TTL_SECONDS = float(
+    os.environ.get("NON_TERMINAL_STATUS_CACHE_TTL_SECONDS", "2")
+)
+
+status_cache = LRUCache(STATUS_CACHE_MAX_SIZE)
+
 
 @configure_lambda_logger
 @return_500_for_unhandled_exceptions
@@ -23,11 +43,15 @@ def lambda_handler(event, context):
     decision.
 
     NB: Read stack is thinner than Writer stack by design. The write stack
-    is optimised for correctness, while the read stack is optimised for speed.
+    is optimised for correctness, while the read stack is optimised for speed:
+    the response is precomputed whenever the PaymentRequest changes, so it is
+    served from PaymentRequestStatusRepository with a single key lookup.
+    Responses are then cached in the container, keyed by merchant and PaymentRequest,
+    and only once the PaymentRequest is known to belong to the merchant.
 
-    If called for, another repository could be created that was specifically built
-    for speed. It could cut out the steps where json is mapped to python objects, then
-    back to json, for instance.
+    Responses carry an ETag, the version of the PaymentRequest. If the request's
+    If-None-Match header matches it, 304 Not Modified is returned without a body,
+    so polling an unchanged status transfers almost nothing.
 
     Args:
         event (dict): API Gateway Proxy Lambda Integration event
@@ -69,39 +93,58 @@ def lambda_handler(event, context):
         logger.info(message)
         return {"statusCode": 400, "body": message}
 
-    repo = PaymentRequestsRepository()
+    cache_key = (merchant_id, payment_request_id)
+    cached = status_cache.get(cache_key)
+    if cached is not None:
+        logger.info(f"Status served from cache: {status_cache.stats()}")
+        return _respond(event, *cached)
+
+    repo = PaymentRequestStatusRepository()
 
     try:
-        payment_request = repo.get_by_aggregate_root_id(payment_request_id)
+        status_item = repo.get_status(payment_request_id)
     except NotFound:
         return {"statusCode": 404, "body": "Not Found"}
 
-    if payment_request.merchant_id.value != merchant_id:
+    if status_item["merchant_id"] != merchant_id:
         logger.critical(
             f"The merchant with ID: {merchant_id} tried to get the status of a payment"
-            f" for another merchant, whose ID is: {payment_request.merchant_id.value}!"
+            f" for another merchant, whose ID is: {status_item['merchant_id']}!"
         )
         return {"statusCode": 404, "body": "Not Found"}
 
-    if not payment_request.is_sent_to_acquiring_bank:
-        return {
-            "statusCode": 200,
-            "body": GetPaymentRequestStatusDTO(
-                payment_request, "Processing - In Payment Gateway"
-            ).json,
-        }
-
-    if payment_request.acquiring_bank_response is None:
-        return {
-            "statusCode": 200,
-            "body": GetPaymentRequestStatusDTO(
-                payment_request, "Processing - Awaiting response from acquiring bank"
-            ).json,
-        }
-
-    return {
-        "statusCode": 200,
-        "body": GetPaymentRequestStatusDTO(
-            payment_request, payment_request.acquiring_bank_response.value
-        ).json,
-    }
+    dto = GetPaymentRequestStatusDTO.from_status_item(status_item)
+    status_cache.put(cache_key, (dto.etag, dto.json), _cache_ttl_seconds(dto.json["status"]))
+    logger.info(f"Status cached: {status_cache.stats()}")
+
+    return _respond(event, dto.etag, dto.json)
+
+
+def _respond(event: dict, etag: str, body: dict) -> dict:
+    if _is_not_modified(event, etag):
+        get_logger().info("Status not modified.")
+        return {"statusCode": 304, "headers": {"ETag": etag}}
+    return {"statusCode": 200, "headers": {"ETag": etag}, "body": body}
+
+
+def _is_not_modified(event: dict, etag: str) -> bool:
+    # Header names are case insensitive, and API Gateway passes them as the client sent them.
+    headers = event.get("headers") or {}
+    if_none_match = next(
+        (value for name, value in headers.items() if name.lower() == "if-none-match"), None
+    )
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison, so a weak validator (W/"...") also matches.
+    return any(
+        candidate.strip().removeprefix("W/") == etag for candidate in if_none_match.split(",")
+    )
+
+
+def _cache_ttl_seconds(status: str) -> float:
+    # A PaymentRequest's status is the Acquiring Bank's response, once one is received.
+    if status in AcquiringBankResponse.TERMINAL_RESPONSES:
+        return TERMINAL_STATUS_CACHE_TTL_SECONDS
+    return NON_TERMINAL_STATUS_CACHE_TTL_SECONDS
@@ -0,0 +1,131 @@
+import json
+import os
+from typing import List, Tuple
+
+from application.dtos.GetPaymentRequestStatusDTO import GetPaymentRequestStatusDTO
+from application.repositories.exceptions.UnprocessedKeys import UnprocessedKeys
+from application.repositories.PaymentRequestsRepository import PaymentRequestsRepository
+from shared_kernel.guard_clauses.uuid_guard import is_valid_uuid
+from shared_kernel.lambda_logging.decorators import (
+    configure_lambda_logger,
+    return_500_for_unhandled_exceptions,
+)
+from shared_kernel.lambda_logging.set_up_logger import add_context, get_logger
+
+MAX_IDS_PER_REQUEST = int(os.environ.get("MAX_IDS_PER_STATUS_REQUEST", "100"))
+
+NOT_FOUND = {"error": "Not Found"}
+NOT_A_VALID_UUID = {"error": "payment_request_id is not a valid uuid"}
+UNAVAILABLE = {"error": "Status could not be retrieved, please retry."}
+NOT_AN_ARRAY = "Body must contain a payment_request_ids array."
+TOO_MANY_IDS = f"At most {MAX_IDS_PER_REQUEST} payment_request_ids can be requested at once."
+
+
+@configure_lambda_logger
+@return_500_for_unhandled_exceptions
+def lambda_handler(event, context):
+    """Gets the statuses of many payment requests belonging to one merchant.
+
+    The body is a JSON object: {"payment_request_ids": [...]}, with at most
+    MAX_IDS_PER_STATUS_REQUEST IDs. The PaymentRequests are fetched with BatchGetItem.
+
+    Each ID is checked as GetPaymentRequestStatus checks a single ID. IDs that are not valid
+    uuids, do not exist, or belong to another merchant get an error entry, rather than failing
+    the whole request.
+
+    Args:
+        event (dict): API Gateway Proxy Lambda Integration event
+        context (object): AWS provided obejct
+
+    Returns:
+        _type_: HTTP Response, whose body maps each ID to its status DTO or an error
+    """
+    logger = get_logger()
+
+    try:
+        merchant_id = event["pathParameters"]["merchant_id"]
+        add_context(logger, "merchant_id", merchant_id)
+    except KeyError as ke:
+        logger.error(f"API Gateway event did not contain expected field: {ke}")
+        return {"statusCode": 500, "body": "Internal Server Error"}
+
+    if not is_valid_uuid(merchant_id):
+        message = "merchant_id is not a valid uuid"
+        logger.info(message)
+        return {"statusCode": 400, "body": message}
+
+    try:
+        statuses, valid_ids = _parse_payment_request_ids(event)
+    except ValueError as ve:
+        return {"statusCode": 400, "body": str(ve)}
+
+    _add_statuses_of_payment_requests(statuses, valid_ids, merchant_id, logger)
+    return {"statusCode": 200, "body": statuses}
+
+
+def _parse_payment_request_ids(event) -> Tuple[dict, List[str]]:
+    """Parses the payment_request_ids from the body of the request.
+
+    Args:
+        event (dict): API Gateway Proxy Lambda Integration event
+
+    Raises:
+        ValueError: If the body has no payment_request_ids array, or it has too many IDs
+
+    Returns:
+        Tuple[dict, List[str]]: the statuses, mapping each ID to NOT_FOUND, or NOT_A_VALID_UUID,
+            and the distinct IDs that are valid uuids, in the order requested
+    """
+    try:
+        payment_request_ids = json.loads(event["body"])["payment_request_ids"]
+    except (KeyError, TypeError, ValueError):
+        raise ValueError(NOT_AN_ARRAY)
+    if type(payment_request_ids) is not list:
+        raise ValueError(NOT_AN_ARRAY)
+    if len(payment_request_ids) > MAX_IDS_PER_REQUEST:
+        raise ValueError(TOO_MANY_IDS)
+
+    statuses = {}
+    valid_ids = []
+    for payment_request_id in payment_request_ids:
+        if not is_valid_uuid(payment_request_id):
+            statuses[str(payment_request_id)] = NOT_A_VALID_UUID
+        elif payment_request_id not in statuses:
+            statuses[payment_request_id] = NOT_FOUND
+            valid_ids.append(payment_request_id)
+    return statuses, valid_ids
+
+
+def _add_statuses_of_payment_requests(
+    statuses: dict, payment_request_ids: List[str], merchant_id: str, logger
+):
+    """Sets the status of each of the merchant's PaymentRequests that are found.
+
+    PaymentRequests of other merchants stay NOT_FOUND. If they cannot all be fetched, those not
+    yet found are UNAVAILABLE.
+
+    Args:
+        statuses (dict): maps each ID to NOT_FOUND, updated in place
+        payment_request_ids (List[str]): _
+        merchant_id (str): of the merchant making the request
+        logger (Logger): _
+    """
+    repo = PaymentRequestsRepository()
+    try:
+        for payment_request in repo.get_many_by_aggregate_root_ids(payment_request_ids):
+            if payment_request.merchant_id.value != merchant_id:
+                logger.critical(
+                    f"The merchant with ID: {merchant_id} tried to get the status of a payment"
+                    f" for another merchant, whose ID is: {payment_request.merchant_id.value}!"
+                )
+                continue
+            statuses[payment_request.id] = GetPaymentRequestStatusDTO.from_payment_request(
+                payment_request
+            ).json
+    except UnprocessedKeys:
+        # Fetching stops at the first chunk with unprocessed keys, so any ID not yet found
+        # may exist.
+        logger.error("Could not get every PaymentRequest.")
+        for payment_request_id in payment_request_ids:
+            if statuses[payment_request_id] is NOT_FOUND:
+                statuses[payment_request_id] = UNAVAILABLE
@@ -0,0 +1,122 @@
+import base64
+import json
+import os
+
+from application.dtos.GetPaymentRequestStatusDTO import GetPaymentRequestStatusDTO
+from application.repositories.PaymentRequestsRepository import (
+    MERCHANT_KEY_ATTRIBUTE,
+    PaymentRequestsRepository,
+)
+from shared_kernel.guard_clauses.uuid_guard import is_valid_uuid
+from shared_kernel.lambda_logging.decorators import (
+    configure_lambda_logger,
+    return_500_for_unhandled_exceptions,
+)
+from shared_kernel.lambda_logging.set_up_logger import add_context, get_logger
+
+MAX_PAGE_SIZE = int(os.environ.get("MAX_PAYMENT_REQUESTS_PER_PAGE", "100"))
+
+
+@configure_lambda_logger
+@return_500_for_unhandled_exceptions
+def lambda_handler(event, context):
+    """Lists a merchant's payment requests, oldest first, a page at a time.
+
+    Optional query string parameters:
+        since, until: only include payment requests created in this range, inclusive,
+            in seconds since the epoch
+        limit: maximum number of payment requests in the page, at most MAX_PAGE_SIZE
+        cursor: the next_cursor returned with the previous page
+
+    Pages are read from the merchant index of the payment requests table, so listing costs
+    the same however many payment requests the merchant has. next_cursor is null on the
+    last page.
+
+    Args:
+        event (dict): API Gateway Proxy Lambda Integration event
+        context (object): AWS provided obejct
+
+    Returns:
+        _type_: HTTP Response, whose body holds the page of status DTOs and the next_cursor
+    """
+    logger = get_logger()
+
+    try:
+        merchant_id = event["pathParameters"]["merchant_id"]
+        add_context(logger, "merchant_id", merchant_id)
+    except KeyError as ke:
+        logger.error(f"API Gateway event did not contain expected field: {ke}")
+        return {"statusCode": 500, "body": "Internal Server Error"}
+
+    if not is_valid_uuid(merchant_id):
+        message = "merchant_id is not a valid uuid"
+        logger.info(message)
+        return {"statusCode": 400, "body": message}
+
+    query = event.get("queryStringParameters") or {}
+    try:
+        since = _parse_int(query, "since")
+        until = _parse_int(query, "until")
+        limit = _parse_int(query, "limit", default=MAX_PAGE_SIZE)
+    except ValueError as e:
+        logger.info(str(e))
+        return {"statusCode": 400, "body": str(e)}
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        return {"statusCode": 400, "body": f"limit must be between 1 and {MAX_PAGE_SIZE}."}
+    if since is not None and until is not None and since > until:
+        return {"statusCode": 400, "body": "since must not be after until."}
+
+    cursor = None
+    if query.get("cursor"):
+        cursor = _decode_cursor(query["cursor"], merchant_id)
+        if cursor is None:
+            logger.info("cursor is not valid.")
+            return {"statusCode": 400, "body": "cursor is not valid."}
+
+    repo = PaymentRequestsRepository()
+    payment_requests, next_cursor = repo.get_page_by_merchant(
+        merchant_id, since, until, limit, cursor
+    )
+
+    return {
+        "statusCode": 200,
+        "body": {
+            "payment_requests": [
+                GetPaymentRequestStatusDTO.from_payment_request(payment_request).json
+                for payment_request in payment_requests
+            ],
+            "next_cursor": _encode_cursor(next_cursor) if next_cursor else None,
+        },
+    }
+
+
+def _parse_int(query: dict, name: str, default: int = None) -> int:
+    if query.get(name) is None:
+        return default
+    try:
+        return int(query[name])
+    except ValueError:
+        raise ValueError(f"{name} must be an integer.")
+
+
+def _encode_cursor(last_evaluated_key: dict) -> str:
+    # The key's created_at is returned as a Decimal, which json cannot serialise.
+    key = {**last_evaluated_key, "created_at": int(last_evaluated_key["created_at"])}
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def _decode_cursor(cursor: str, merchant_id: str) -> dict:
+    """Decodes a cursor, returning None unless it is a cursor of this merchant's listing."""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError:
+        return None
+    if (
+        type(key) is not dict
+        or set(key) != {"id", MERCHANT_KEY_ATTRIBUTE, "created_at"}
+        or key[MERCHANT_KEY_ATTRIBUTE] != merchant_id
+        or type(key["id"]) is not str
+        or type(key["created_at"]) is not int
+    ):
+        return None
+    return key
@@ -0,0 +1,61 @@
+from boto3.dynamodb.types import TypeDeserializer
+
+from application.repositories.PaymentRequestStatusRepository import (
+    PaymentRequestStatusRepository,
+)
+from shared_kernel.lambda_logging.decorators import configure_lambda_logger
+from shared_kernel.lambda_logging.set_up_logger import get_logger
+
+_deserializer = TypeDeserializer()
+
+
+@configure_lambda_logger
+def lambda_handler(event, context):
+    """Triggered via the payment requests table's DynamoDB stream, to repair the statuses served
+    by GetPaymentRequestStatus.
+
+    Statuses are saved after each change to a PaymentRequest, and are rebuilt on read if
+    missing. This rebuilds the status of each PaymentRequest in the stream from its new image,
+    so a status left behind by a failed save, which a read cannot detect, is repaired within
+    seconds. The event source mapping reports batch item failures, so a record whose status
+    could not be saved is retried.
+
+    Invoked without records, e.g. by hand to fill a new statuses table, every status that is
+    behind is rebuilt from the whole table.
+
+    Args:
+        event (dict): provided by DynamoDB Streams
+        context (object): provided by AWS
+
+    Returns:
+        dict: batchItemFailures, the sequence numbers of records that were not processed, or
+            the number of statuses rebuilt
+    """
+    repo = PaymentRequestStatusRepository()
+    if "Records" not in event:
+        return {"rebuilt": repo.rebuild_all()}
+
+    logger = get_logger()
+    number_rebuilt = 0
+    batch_item_failures = []
+    for record in event["Records"]:
+        sequence_number = record["dynamodb"]["SequenceNumber"]
+        if "NewImage" not in record["dynamodb"]:
+            # The PaymentRequest was deleted.
+            continue
+        try:
+            repo.rebuild_from_item(_deserialize(record["dynamodb"]["NewImage"]))
+            number_rebuilt += 1
+        except Exception as e:
+            # Exceptions can contain PII, so only the type is logged.
+            logger.error(
+                f"Failed to rebuild status of record {sequence_number}: {type(e).__name__}"
+            )
+            batch_item_failures.append({"itemIdentifier": sequence_number})
+
+    logger.info(f"Rebuilt {number_rebuilt} statuses.")
+    return {"batchItemFailures": batch_item_failures}
+
+
+def _deserialize(image: dict) -> dict:
+    return {name: _deserializer.deserialize(value) for name, value in image.items()}
@@ -0,0 +1,30 @@
+from application.services.OutboxRelayService import OutboxRelayService
+from shared_kernel.lambda_logging.decorators import configure_lambda_logger
+
+
+@configure_lambda_logger
+def lambda_handler(event, context):
+    """Triggered via the outbox table's DynamoDB stream, and on a schedule.
+
+    The stream reports entries soon after they are added to the outbox, and only those entries
+    are relayed. The event source mapping only passes INSERT records; others, e.g. the REMOVE
+    records of the relay's own deletes, are ignored here too. The schedule sweeps the whole
+    outbox for entries that a previous relay failed to publish.
+
+    Args:
+        event (dict): provided by DynamoDB Streams or EventBridge
+        context (object): provided by AWS
+
+    Returns:
+        dict: the number of commands relayed
+    """
+    service = OutboxRelayService()
+    if "Records" not in event:
+        return {"relayed": service.relay_outbox()}
+
+    entry_ids = [
+        record["dynamodb"]["Keys"]["id"]["S"]
+        for record in event["Records"]
+        if record.get("eventName") == "INSERT"
+    ]
+    return {"relayed": service.relay_entries(entry_ids)}
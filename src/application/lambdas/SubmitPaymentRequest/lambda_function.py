@@ -1,7 +1,12 @@
 import json
+from decimal import Decimal
 
+from application.lambdas.payload import submit_payment_request_from_payload
+from application.repositories.exceptions.IdempotencyKeyInUse import IdempotencyKeyInUse
+from application.repositories.exceptions.IdempotencyKeyReused import (
+    IdempotencyKeyReused,
+)
 from application.services.PaymentRequestService import PaymentRequestService
-from core.commands.SubmitPaymentRequest import SubmitPaymentRequest
 from shared_kernel.lambda_logging.decorators import (
     configure_lambda_logger,
     return_400_for_domain_exceptions,
@@ -9,6 +14,9 @@ from shared_kernel.lambda_logging.decorators import (
 )
 from shared_kernel.lambda_logging.set_up_logger import add_context, get_logger
 
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+
 
 @configure_lambda_logger
 @return_500_for_unhandled_exceptions
@@ -18,6 +26,9 @@ def lambda_handler(event, context):
 
     Transforms event into SubmitPaymentRequest command and passes to PayementRequestService
 
+    Merchants may send an Idempotency-Key header, so a request can be retried safely: a retry
+    returns the ID of the PaymentRequest created by the first request with that key.
+
     Args:
         event (dict): provided by API Gateway
         context (object): provided by AWS
@@ -28,26 +39,39 @@ def lambda_handler(event, context):
 
     add_context(logger, "merchant_id", merchant_id)
 
-    payload = json.loads(event["body"])
+    idempotency_key = _get_header(event, IDEMPOTENCY_KEY_HEADER)
+    if idempotency_key is not None and not 0 < len(idempotency_key) <= MAX_IDEMPOTENCY_KEY_LENGTH:
+        return {
+            "statusCode": 400,
+            "body": f"{IDEMPOTENCY_KEY_HEADER} must be 1 to {MAX_IDEMPOTENCY_KEY_LENGTH} characters.",
+        }
+
+    # Amounts are parsed as Decimals, so they are not subject to float rounding.
+    payload = json.loads(event["body"], parse_float=Decimal)
     try:
-        (card_number, expiry_date, amount, currency, cvv) = _get_fields_from_payload(payload)
+        command = submit_payment_request_from_payload(merchant_id, payload)
     except KeyError as ke:
         return {"statusCode": 400, "body": f"Missing required field: {ke}"}
 
-    command = SubmitPaymentRequest(merchant_id, card_number, expiry_date, amount, currency, cvv)
-
     service = PaymentRequestService()
 
-    payment_request_id = service.submit_payment_request(command)
+    try:
+        payment_request_id = service.submit_payment_request(command, idempotency_key)
+    except IdempotencyKeyInUse:
+        return {
+            "statusCode": 409,
+            "body": f"A request with this {IDEMPOTENCY_KEY_HEADER} is being processed.",
+        }
+    except IdempotencyKeyReused:
+        return {
+            "statusCode": 422,
+            "body": f"{IDEMPOTENCY_KEY_HEADER} was used for a different request.",
+        }
 
     return {"statusCode": 201, "body": payment_request_id}
 
 
-def _get_fields_from_payload(payload: dict):
-    return (
-        payload["card_number"],
-        payload["expiry_date"],
-        payload["amount"],
-        payload["currency"],
-        payload["cvv"],
-    )
+def _get_header(event: dict, name: str):
+    # Header names are case insensitive, and API Gateway passes them as the client sent them.
+    headers = event.get("headers") or {}
+    return next((value for key, value in headers.items() if key.lower() == name.lower()), None)
@@ -0,0 +1,83 @@
+import json
+import os
+from decimal import Decimal
+
+from application.lambdas.payload import submit_payment_request_from_payload
+from application.repositories.exceptions.NotSaved import NotSaved
+from application.services.PaymentRequestService import PaymentRequestService
+from shared_kernel.exceptions.DomainException import DomainException
+from shared_kernel.lambda_logging.decorators import (
+    configure_lambda_logger,
+    return_500_for_unhandled_exceptions,
+)
+from shared_kernel.lambda_logging.set_up_logger import add_context, get_logger
+
+MAX_PAYMENTS_PER_REQUEST = int(os.environ.get("MAX_PAYMENTS_PER_BULK_REQUEST", "1000"))
+
+
+@configure_lambda_logger
+@return_500_for_unhandled_exceptions
+def lambda_handler(event, context):
+    """Triggered via API Gateway integration.
+
+    Accepts a JSON array of payments, each with the fields accepted by SubmitPaymentRequest.
+    Every payment is validated, and the valid ones are submitted together.
+
+    Returns a result for each payment, in the order given: the new PaymentRequest's ID, or
+    the errors explaining why it was not created. The status code is 201 if every payment was
+    created, otherwise 207.
+
+    Args:
+        event (dict): provided by API Gateway
+        context (object): provided by AWS
+    """
+    logger = get_logger()
+    merchant_id = event["pathParameters"]["merchant_id"]
+
+    add_context(logger, "merchant_id", merchant_id)
+
+    # Amounts are parsed as Decimals, so they are not subject to float rounding.
+    payloads = json.loads(event["body"], parse_float=Decimal)
+    if type(payloads) is not list:
+        return {"statusCode": 400, "body": "Body must be a JSON array of payments."}
+    if len(payloads) > MAX_PAYMENTS_PER_REQUEST:
+        return {
+            "statusCode": 400,
+            "body": f"At most {MAX_PAYMENTS_PER_REQUEST} payments can be submitted per request.",
+        }
+
+    results = [None] * len(payloads)
+    positions = []
+    commands = []
+    for position, payload in enumerate(payloads):
+        try:
+            command = submit_payment_request_from_payload(merchant_id, payload)
+        except KeyError as ke:
+            results[position] = {"errors": [f"Missing required field: {ke}"]}
+            continue
+        except TypeError:
+            results[position] = {"errors": ["Payment must be a JSON object."]}
+            continue
+        except DomainException as e:
+            results[position] = {"errors": e.messages}
+            continue
+        positions.append(position)
+        commands.append(command)
+
+    service = PaymentRequestService()
+    outcomes = service.submit_payment_requests(commands)
+
+    for position, outcome in zip(positions, outcomes):
+        if type(outcome) is str:
+            results[position] = {"payment_request_id": outcome}
+        elif type(outcome) is NotSaved:
+            results[position] = {"errors": ["Payment could not be saved, please retry."]}
+        else:
+            results[position] = {"errors": outcome.messages}
+
+    number_created = sum("payment_request_id" in result for result in results)
+    logger.info(f"Created {number_created} of {len(payloads)} payments.")
+    return {
+        "statusCode": 201 if number_created == len(payloads) else 207,
+        "body": results,
+    }
@@ -0,0 +1,40 @@
+from core.commands.SubmitPaymentRequest import SubmitPaymentRequest
+from shared_kernel.exceptions.DomainException import DomainException
+
+# Fields that the value objects can only validate as strings. Amounts and currencies of any type
+# are validated by MonetaryAmount and Currency.
+STRING_FIELDS = ("card_number", "expiry_date", "cvv")
+
+
+def submit_payment_request_from_payload(merchant_id: str, payload: dict) -> SubmitPaymentRequest:
+    """Makes the SubmitPaymentRequest for a payment a merchant posted.
+
+    Shared by the SubmitPaymentRequest and SubmitPaymentRequests handlers, which accept the same
+    fields for each payment.
+
+    Args:
+        merchant_id (str): from the path
+        payload (dict): the payment, as parsed from the request body
+
+    Raises:
+        KeyError: if a required field is missing
+        TypeError: if the payment is not a JSON object
+        DomainException: if a field that must be a string is not
+
+    Returns:
+        SubmitPaymentRequest: _
+    """
+    command = SubmitPaymentRequest(
+        merchant_id,
+        payload["card_number"],
+        payload["expiry_date"],
+        payload["amount"],
+        payload["currency"],
+        payload["cvv"],
+    )
+    messages = [
+        f"{name} must be a string." for name in STRING_FIELDS if type(payload[name]) is not str
+    ]
+    if messages:
+        raise DomainException.from_multiple_messages(messages)
+    return command
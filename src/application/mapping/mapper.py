@@ -1,4 +1,6 @@
 import json
+from decimal import Decimal
+from typing import Mapping
 
 from shared_kernel.lambda_logging.set_up_logger import get_logger
 
@@ -12,7 +14,10 @@ class Mapper:
         self.attribute_mappers = {}
         self.target_type = None
         self.is_list_mapper = False
+        self.interned_instances = None
+        self.interned_key = None
         self.logger = get_logger()
+        self._builder = None
 
     @classmethod
     def for_type(cls, target_type: type):
@@ -85,6 +90,46 @@ class Mapper:
             self.attribute_mappers[attribute_name] = attribute_mapper
         return self
 
+    def with_interned_instances(self, instances: Mapping, key: str = "value"):
+        """Configure the shared instances of the target_type that json is mapped to.
+
+        Json whose only attribute is key, with a value found in instances, is mapped to the
+        instance found, instead of a new one. Other json is mapped to a new instance, as usual.
+
+        Args:
+            instances (Mapping): shared instances of the target_type, keyed by value of key
+            key (str): name of the attribute that identifies an instance
+
+        Returns:
+            Mapper: The configured Mapper
+
+        Usage:
+            currency_mapper = Mapper.for_type(Currency).with_interned_instances(Currency.INSTANCES)
+        """
+        self.interned_instances = instances
+        self.interned_key = key
+        return self
+
+    def compile(self):
+        """Compile the configured mapper tree into a builder specialised for the target_type.
+
+        The attribute_mappers are walked once, here, instead of on every call to from_json.
+        Each mapped attribute gets a single converter function, so mapping an object costs
+        one function call per mapped field, rather than a generic dispatch per key.
+
+        Should be called once the mapper is fully configured, e.g. at import time.
+
+        Returns:
+            Mapper: The compiled Mapper
+
+        Usage:
+            book_mapper = Mapper.for_type(Book).with_attribute_mappings(
+                author=Mapper.for_type(Author)
+            ).compile()
+        """
+        self._builder = self._build()
+        return self
+
     def from_json(self, json) -> object:
         """Given a dict / json, return an object of type: target_type
 
@@ -100,6 +145,9 @@ class Mapper:
         Returns:
             target_type: An instance of the target_type
         """
+        if self._builder is not None:
+            return self._builder(json)
+
         self.logger.debug(f"Mapping JSON to object of type: {self.target_type}")
         self.logger.debug(f"JSON to map: {json}")
         if type(json) is not dict:
@@ -107,9 +155,18 @@ class Mapper:
             self.logger.info(error_message)
             raise TypeError(error_message)
 
+        if self.interned_instances is not None:
+            instance = _interned_instance_for(json, self.interned_instances, self.interned_key)
+            if instance is not None:
+                return instance
+
         instance = object.__new__(self.target_type)
+        attribute_names = _settable_attribute_names_of(self.target_type)
 
         for attribute_name, value in json.items():
+            if attribute_names is not None and attribute_name not in attribute_names:
+                continue
+
             if not self._has_attribute_mapper(attribute_name) or value is None:
                 setattr(instance, attribute_name, value)
                 continue
@@ -133,6 +190,105 @@ class Mapper:
 
         return instance
 
+    def _build(self):
+        build_new = self._build_new()
+        if self.interned_instances is None:
+            return build_new
+
+        instances = self.interned_instances
+        key = self.interned_key
+
+        def build_interned(json):
+            instance = _interned_instance_for(json, instances, key)
+            if instance is not None:
+                return instance
+            return build_new(json)
+
+        return build_interned
+
+    def _build_new(self):
+        target_type = self.target_type
+        logger = self.logger
+        converters = {
+            attribute_name: attribute_mapper._build_converter()
+            for attribute_name, attribute_mapper in self.attribute_mappers.items()
+        }
+
+        slot_names = _slot_names_of(target_type)
+        if not slot_names:
+
+            def build(json):
+                if type(json) is not dict:
+                    error_message = "Expected a dict as input."
+                    logger.info(error_message)
+                    raise TypeError(error_message)
+
+                instance = object.__new__(target_type)
+                attributes = instance.__dict__
+
+                for attribute_name, value in json.items():
+                    converter = converters.get(attribute_name)
+                    if converter is None or value is None:
+                        attributes[attribute_name] = value
+                    else:
+                        attributes[attribute_name] = converter(value)
+
+                return instance
+
+            return build
+
+        # Slots are set through their descriptors. Other keys go in the instance's __dict__, if it
+        # has one, else are dropped.
+        slot_setters = {name: getattr(target_type, name).__set__ for name in slot_names}
+        has_dict = bool(target_type.__dictoffset__)
+
+        def build_slotted(json):
+            if type(json) is not dict:
+                error_message = "Expected a dict as input."
+                logger.info(error_message)
+                raise TypeError(error_message)
+
+            instance = object.__new__(target_type)
+            attributes = instance.__dict__ if has_dict else None
+
+            for attribute_name, value in json.items():
+                converter = converters.get(attribute_name)
+                if converter is not None and value is not None:
+                    value = converter(value)
+                slot_setter = slot_setters.get(attribute_name)
+                if slot_setter is not None:
+                    slot_setter(instance, value)
+                elif attributes is not None:
+                    attributes[attribute_name] = value
+
+            return instance
+
+        return build_slotted
+
+    def _build_converter(self):
+        """Returns the function that converts a single attribute value using this mapper."""
+        build = self._build()
+        target_type = self.target_type
+        logger = self.logger
+
+        if self.is_list_mapper:
+
+            def convert_list(value):
+                if type(value) is not list:
+                    error_message = f"The mapper was configured to process a list, but a {type(value)} was received."
+                    logger.info(error_message)
+                    raise ValueError(error_message)
+                return [build(item) for item in value]
+
+            return convert_list
+
+        def convert(value):
+            if type(value) is dict:
+                return build(value)
+            return target_type(value)
+
+        return convert
+
     def _has_attribute_mapper(self, property):
         return self.attribute_mappers.get(property) is not None
 
@@ -148,13 +304,16 @@ class Mapper:
         """Given an object, returns it's dict (json) representation.
         Useful when trying to persist aggregate roots to json based data stores (dynamodb).
 
+        The object graph is walked once, without a round trip through a json string.
+        Decimals are kept as numbers, so the result can be handed straight to put_item.
+
         Args:
             obj (object): The object to map
 
         Returns:
             dict: the dictionary representation of the object
         """
-        return json.loads(Mapper.object_to_json_string(obj))
+        return _serialize(obj)
 
     @staticmethod
     def object_to_json_string(obj: object) -> str:
@@ -166,4 +325,189 @@ class Mapper:
         Returns:
             str: the string representation
         """
-        return json.dumps(obj, default=lambda o: getattr(o, "__dict__", str(o)))
+        return json.dumps(obj, default=_json_default)
+
+
+# DynamoDB numbers can hold up to 38 significant digits, with a magnitude between 1E-130 and 1E+126.
+_MAX_DYNAMODB_NUMBER_DIGITS = 38
+_MIN_DYNAMODB_NUMBER_EXPONENT = -130
+_MAX_DYNAMODB_NUMBER_EXPONENT = 125
+
+
+def _serialize_decimal(value: Decimal):
+    """Keeps a Decimal as a number, unless DynamoDB could not store it exactly.
+
+    e.g. Decimal(12.94) holds the full binary expansion of the float, which is too precise
+    for DynamoDB, so its exact string representation is stored instead.
+    """
+    if (
+        value.is_finite()
+        and len(value.as_tuple().digits) <= _MAX_DYNAMODB_NUMBER_DIGITS
+        and (
+            not value
+            or _MIN_DYNAMODB_NUMBER_EXPONENT <= value.adjusted() <= _MAX_DYNAMODB_NUMBER_EXPONENT
+        )
+    ):
+        return value
+    return str(value)
+
+
+def _serialize_float(value: float):
+    return _serialize_decimal(Decimal(str(value)))
+
+
+def _serialize_list(value):
+    return [_serialize(item) for item in value]
+
+
+def _serialize_dict(value: dict):
+    return {str(key): _serialize(item) for key, item in value.items()}
+
+
+def _serialize_attributes(obj: object) -> dict:
+    return {name: _serialize(value) for name, value in obj.__dict__.items()}
+
+
+def _slotted_attributes_serializer(value_type: type):
+    slot_names = _slot_names_of(value_type)
+    has_dict = bool(value_type.__dictoffset__)
+
+    def serialize_slotted_attributes(obj: object) -> dict:
+        try:
+            attributes = {name: _serialize(getattr(obj, name)) for name in slot_names}
+        except AttributeError:
+            # A slot is not set, so each is got in turn.
+            attributes = {}
+            for name in slot_names:
+                value = getattr(obj, name, _UNSET)
+                if value is not _UNSET:
+                    attributes[name] = _serialize(value)
+        if has_dict:
+            for name, value in obj.__dict__.items():
+                attributes[name] = _serialize(value)
+        return attributes
+
+    return serialize_slotted_attributes
+
+
+def _json_default(obj: object):
+    value_type = type(obj)
+    if not _is_serialized_by_attributes(value_type):
+        return str(obj)
+    if not _slot_names_of(value_type):
+        return obj.__dict__
+    return _attributes_of(obj)
+
+
+def _interned_instance_for(json, instances: Mapping, key: str):
+    if type(json) is not dict or len(json) != 1:
+        return None
+    try:
+        return instances.get(json.get(key))
+    except TypeError:
+        # The value is not hashable, so cannot be a key of instances.
+        return None
+
+
+def _keep(value):
+    return value
+
+
+# Field plans, keyed by class. Plans for classes not listed here are built on first use.
+_serializers = {
+    str: _keep,
+    bool: _keep,
+    int: _keep,
+    type(None): _keep,
+    Decimal: _serialize_decimal,
+    float: _serialize_float,
+    list: _serialize_list,
+    tuple: _serialize_list,
+    dict: _serialize_dict,
+}
+# Subclasses of these are serialized as their base is. Plans built on first use are not
+# inherited, as a subclass may add slots, or a __dict__, to its base's.
+_base_serializers = tuple(_serializers.items())
+
+
+def _serializer_for(value_type: type):
+    for supported_type, serializer in _base_serializers:
+        if issubclass(value_type, supported_type):
+            return serializer
+
+    if not _is_serialized_by_attributes(value_type):
+        return str
+
+    if _slot_names_of(value_type):
+        return _slotted_attributes_serializer(value_type)
+
+    return _serialize_attributes
+
+
+def _serialize(value):
+    serializer = _serializers.get(type(value))
+    if serializer is None:
+        serializer = _serializers[type(value)] = _serializer_for(type(value))
+    return serializer(value)
+
+
+_UNSET = object()
+# Names of the slots of each class, including those of its bases, keyed by class.
+_slot_names = {}
+# Whether slotted classes are serialized by their attributes, keyed by class.
+_serialized_by_attributes = {}
+
+
+def _slot_names_of(value_type: type) -> tuple:
+    slot_names = _slot_names.get(value_type)
+    if slot_names is None:
+        names = []
+        for klass in reversed(value_type.__mro__):
+            slots = klass.__dict__.get("__slots__", ())
+            for name in (slots,) if isinstance(slots, str) else slots:
+                if name not in ("__dict__", "__weakref__") and name not in names:
+                    names.append(name)
+        slot_names = _slot_names[value_type] = tuple(names)
+    return slot_names
+
+
+def _settable_attribute_names_of(value_type: type):
+    """Names of the attributes that instances of value_type can hold, or None if any name."""
+    # Non-zero when instances carry a __dict__.
+    if value_type.__dictoffset__:
+        return None
+    return frozenset(_slot_names_of(value_type))
+
+
+def _is_serialized_by_attributes(value_type: type) -> bool:
+    """Whether instances are serialized as a dict of their attributes, rather than with str.
+
+    True for instances with a __dict__, or with slots. Slotted classes that define their own
+    pickled state, as UUID and Path do, are the exception: their slots are implementation
+    details, so they are serialized with str.
+    """
+    if value_type.__dictoffset__:
+        return True
+    is_serialized_by_attributes = _serialized_by_attributes.get(value_type)
+    if is_serialized_by_attributes is None:
+        is_serialized_by_attributes = _serialized_by_attributes[value_type] = bool(
+            _slot_names_of(value_type)
+        ) and not any(
+            name in klass.__dict__
+            for klass in value_type.__mro__
+            if klass is not object
+            for name in ("__reduce__", "__reduce_ex__", "__getstate__")
+        )
+    return is_serialized_by_attributes
+
+
+def _attributes_of(obj: object) -> dict:
+    """The attributes of an instance with slots, skipping unset slots, then its __dict__, if any."""
+    attributes = {}
+    for name in _slot_names_of(type(obj)):
+        value = getattr(obj, name, _UNSET)
+        if value is not _UNSET:
+            attributes[name] = value
+    if type(obj).__dictoffset__:
+        attributes.update(obj.__dict__)
+    return attributes
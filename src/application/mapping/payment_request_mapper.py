@@ -22,15 +22,22 @@ class PaymentRequestMapper:
         PaymentRequest: instance of PaymentRequest
     """
 
-    mapper = Mapper.for_type(PaymentRequest).with_attribute_mappings(
-        card_number=Mapper.for_type(CardNumber),
-        merchant_id=Mapper.for_type(MerchantId),
-        expiry_date=Mapper.for_type(ExpiryDate),
-        cvv=Mapper.for_type(CVV),
-        amount=Mapper.for_type(MonetaryAmount).with_attribute_mappings(
-            currency=Mapper.for_type(Currency), amount=Mapper.for_type(Decimal)
-        ),
-        acquiring_bank_response=Mapper.for_type(AcquiringBankResponse),
+    mapper = (
+        Mapper.for_type(PaymentRequest)
+        .with_attribute_mappings(
+            card_number=Mapper.for_type(CardNumber),
+            merchant_id=Mapper.for_type(MerchantId),
+            expiry_date=Mapper.for_type(ExpiryDate),
+            cvv=Mapper.for_type(CVV),
+            amount=Mapper.for_type(MonetaryAmount).with_attribute_mappings(
+                currency=Mapper.for_type(Currency).with_interned_instances(Currency.INSTANCES),
+                amount=Mapper.for_type(Decimal),
+            ),
+            acquiring_bank_response=Mapper.for_type(AcquiringBankResponse).with_interned_instances(
+                AcquiringBankResponse.INSTANCES
+            ),
+        )
+        .compile()
     )
 
     @staticmethod
@@ -0,0 +1,165 @@
+import json
+import os
+import time
+from typing import Optional
+
+from botocore.exceptions import ClientError
+
+from application.clients.AWSClient import AWSClient
+from application.repositories.exceptions.IdempotencyKeyInUse import IdempotencyKeyInUse
+from application.repositories.exceptions.IdempotencyKeyReused import (
+    IdempotencyKeyReused,
+)
+from shared_kernel.caching.LRUCache import LRUCache
+from shared_kernel.lambda_logging import get_logger
+
+IN_PROGRESS = "IN_PROGRESS"
+COMPLETED = "COMPLETED"
+# How long a request holds its key. Should exceed the timeout of any lambda that takes a key, so
+# a key is only taken over once the request holding it has certainly stopped.
+LEASE_SECONDS = int(os.environ.get("IDEMPOTENCY_LEASE_SECONDS", "120"))
+# How long a completed request's result is kept, and so how long its key guards against duplicates.
+RETENTION_SECONDS = int(os.environ.get("IDEMPOTENCY_KEY_RETENTION_SECONDS", str(24 * 60 * 60)))
+CACHE_MAX_SIZE = int(os.environ.get("IDEMPOTENCY_CACHE_MAX_SIZE", "10000"))
+
+
+class IdempotencyKeysRepository:
+    """Records which requests have been processed, and their results, by idempotency key.
+
+    A request takes its key with begin, which conditionally puts an in progress item, and then
+    either completes the key with its result or releases it if it failed. Only one request can
+    hold a key at a time: a duplicate that arrives while the key is held is refused, and one
+    that arrives after it is completed is given the stored result. A key held for longer than
+    LEASE_SECONDS, by a request that crashed, can be taken again.
+
+    Each key is stored with a fingerprint of its request's contents, so a key reused for a
+    different request is refused rather than answered with another request's result.
+
+    Completed results never change, so they are also cached for the lifetime of the container.
+    A duplicate delivered to the same container is answered without reading DynamoDB.
+    """
+
+    _completed = LRUCache(CACHE_MAX_SIZE)
+
+    def __init__(self):
+        self.table_name = os.environ["IDEMPOTENCY_KEYS_DYNAMODB_TABLE_NAME"]
+        self.logger = get_logger()
+        self.table = AWSClient.get_dynamodb_resource().Table(self.table_name)
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        cls._completed.clear()
+
+    def begin(self, key: str, fingerprint: str) -> Optional[dict]:
+        """Takes a key for a request, unless the request has been processed already.
+
+        Args:
+            key (str): the idempotency key, scoped to the operation (and merchant)
+            fingerprint (str): digest of the request's contents
+
+        Raises:
+            IdempotencyKeyInUse: if a request with this key is being processed
+            IdempotencyKeyReused: if the key was taken by a request with different contents
+            Exception: unexpected exception is logged and bubbled upwards
+
+        Returns:
+            Optional[dict]: the stored result if the request was processed already, else None,
+                meaning the key is taken and the request should be processed
+        """
+        cached = self._completed.get(key)
+        if cached is not None:
+            return _result_for(cached[0], cached[1], fingerprint)
+
+        now = int(time.time())
+        try:
+            self.table.put_item(
+                Item={
+                    "key": key,
+                    "status": IN_PROGRESS,
+                    "fingerprint": fingerprint,
+                    "lease_expires_at": now + LEASE_SECONDS,
+                    "expires_at": now + RETENTION_SECONDS,
+                },
+                ConditionExpression=(
+                    "attribute_not_exists(#key) OR #expires_at < :now"
+                    " OR (#status = :in_progress AND #lease_expires_at < :now)"
+                ),
+                ExpressionAttributeNames={
+                    "#key": "key",
+                    "#status": "status",
+                    "#lease_expires_at": "lease_expires_at",
+                    "#expires_at": "expires_at",
+                },
+                ExpressionAttributeValues={":now": now, ":in_progress": IN_PROGRESS},
+            )
+            return None
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                self.logger.error(f"Failed to take idempotency key: {e.__class__.__name__}")
+                self.logger.debug(f"Exception: {e}")
+                raise e
+
+        item = self.table.get_item(Key={"key": key}, ConsistentRead=True).get("Item")
+        if item is None or item["status"] == IN_PROGRESS:
+            # A missing item was released after the put was refused; the caller may retry.
+            self.logger.info("Idempotency key is held by another request.")
+            if item is not None and item["fingerprint"] != fingerprint:
+                raise IdempotencyKeyReused()
+            raise IdempotencyKeyInUse()
+
+        result = json.loads(item["result"])
+        self._completed.put(key, (item["fingerprint"], result), RETENTION_SECONDS)
+        return _result_for(item["fingerprint"], result, fingerprint)
+
+    def complete(self, key: str, fingerprint: str, result: dict) -> None:
+        """Stores the result of a processed request, releasing its key to duplicates.
+
+        Args:
+            key (str): the key taken by begin
+            fingerprint (str): digest of the request's contents
+            result (dict): JSON serializable result, returned to duplicates of the request
+
+        Raises:
+            Exception: unexpected exception is logged and bubbled upwards
+        """
+        try:
+            self.table.put_item(
+                Item={
+                    "key": key,
+                    "status": COMPLETED,
+                    "fingerprint": fingerprint,
+                    "result": json.dumps(result),
+                    "expires_at": int(time.time()) + RETENTION_SECONDS,
+                }
+            )
+        except Exception as e:
+            self.logger.error(f"Failed to complete idempotency key: {e.__class__.__name__}")
+            self.logger.debug(f"Exception: {e}")
+            raise e
+        self._completed.put(key, (fingerprint, result), RETENTION_SECONDS)
+
+    def release(self, key: str) -> None:
+        """Releases a key taken by a request that failed, so it can be retried.
+
+        Failures are logged rather than raised, as the caller is handling the request's own
+        exception. A key that is not released can be taken again once its lease expires.
+
+        Args:
+            key (str): the key taken by begin
+        """
+        try:
+            self.table.delete_item(
+                Key={"key": key},
+                ConditionExpression="#status = :in_progress",
+                ExpressionAttributeNames={"#status": "status"},
+                ExpressionAttributeValues={":in_progress": IN_PROGRESS},
+            )
+        except Exception as e:
+            self.logger.error(f"Failed to release idempotency key: {e.__class__.__name__}")
+            self.logger.debug(f"Exception: {e}")
+
+
+def _result_for(stored_fingerprint: str, result: dict, fingerprint: str) -> dict:
+    if stored_fingerprint != fingerprint:
+        raise IdempotencyKeyReused()
+    return result
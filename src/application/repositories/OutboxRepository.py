@@ -0,0 +1,170 @@
+import os
+import time
+import uuid
+from typing import Iterable, Iterator, List, Optional
+
+from botocore.exceptions import ClientError
+
+from application.clients.AWSClient import AWSClient
+from application.mapping.mapper import Mapper
+from shared_kernel.lambda_logging import get_logger
+
+SCAN_PAGE_SIZE = 100
+# How long a relay has to publish and delete the entries it claimed, before other relays may
+# claim them.
+CLAIM_SECONDS = int(os.environ.get("OUTBOX_CLAIM_SECONDS", "60"))
+_UNCLAIMED_CONDITION = "attribute_not_exists(#claimed_until) OR #claimed_until < :now"
+_CLAIM_CONDITION = "attribute_exists(#id) AND (" + _UNCLAIMED_CONDITION + ")"
+
+
+class OutboxRepository:
+    """The outbox holds commands that must be published to SQS once a change is saved.
+
+    Entries are written in the same DynamoDB transaction as the change (see
+    PaymentRequestsRepository.upsert), so a command is never lost, or published for a change
+    that was not saved. OutboxRelayService claims the entries, publishes them, and then
+    deletes them.
+
+    A claim is a lease, held until the claimed_until attribute, so relays that overlap do not
+    publish the same entry, and an entry claimed by a relay that failed is claimed again once
+    the lease runs out.
+    """
+
+    def __init__(self):
+        self.outbox_table_name = os.environ["PAYMENT_REQUESTS_OUTBOX_DYNAMODB_TABLE_NAME"]
+        self.logger = get_logger()
+        self.outbox_table = AWSClient.get_dynamodb_resource().Table(self.outbox_table_name)
+
+    def make_entry(self, queue_name: str, command: object) -> dict:
+        """Makes a TransactWriteItems Put of an outbox entry for a command.
+
+        Args:
+            queue_name (str): name of the SQS queue the command is to be published to
+            command (object): the command to publish
+
+        Returns:
+            dict: a TransactWriteItems element
+        """
+        return {
+            "Put": {
+                "TableName": self.outbox_table_name,
+                "Item": {
+                    "id": str(uuid.uuid4()),
+                    "queue_name": queue_name,
+                    "message_body": Mapper.object_to_json_string(command),
+                    "created_at": int(time.time()),
+                },
+            }
+        }
+
+    def iter_unclaimed_entries(self) -> Iterator[List[dict]]:
+        """Scans the outbox a page at a time, skipping entries claimed by a relay.
+
+        Entries are not claimed by the scan; they may be claimed by another relay before
+        claim is called.
+
+        Yields:
+            List[dict]: the next page of unclaimed outbox entries
+        """
+        scan_arguments = {
+            "Limit": SCAN_PAGE_SIZE,
+            "ConsistentRead": True,
+            "FilterExpression": _UNCLAIMED_CONDITION,
+            "ExpressionAttributeNames": {"#claimed_until": "claimed_until"},
+            "ExpressionAttributeValues": {":now": int(time.time())},
+        }
+        while True:
+            response = self.outbox_table.scan(**scan_arguments)
+            if response["Items"]:
+                yield response["Items"]
+            if "LastEvaluatedKey" not in response:
+                return
+            scan_arguments["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    def claim(self, entry_id: str) -> Optional[dict]:
+        """Claims an outbox entry for CLAIM_SECONDS, using a conditional UpdateItem.
+
+        Args:
+            entry_id (str): _
+
+        Raises:
+            Exception: unexpected exception is logged and bubbled upwards
+
+        Returns:
+            Optional[dict]: the entry, or None if it has been deleted, or is claimed by another
+                relay
+        """
+        now = int(time.time())
+        try:
+            return self.outbox_table.update_item(
+                Key={"id": entry_id},
+                UpdateExpression="SET #claimed_until = :claimed_until",
+                ConditionExpression=_CLAIM_CONDITION,
+                ExpressionAttributeNames={"#id": "id", "#claimed_until": "claimed_until"},
+                ExpressionAttributeValues={":now": now, ":claimed_until": now + CLAIM_SECONDS},
+                ReturnValues="ALL_NEW",
+            )["Attributes"]
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                return None
+            self.logger.error(f"Failed to claim outbox entry: {e.__class__.__name__}")
+            self.logger.debug(f"Exception: {e}")
+            raise e
+
+    def claim_many(self, entry_ids: Iterable[str]) -> List[dict]:
+        """Claims outbox entries, as claim does.
+
+        Args:
+            entry_ids (Iterable[str]): _
+
+        Returns:
+            List[dict]: the entries claimed, skipping those deleted or claimed by another relay
+        """
+        entries = []
+        number_skipped = 0
+        for entry_id in entry_ids:
+            entry = self.claim(entry_id)
+            if entry is None:
+                number_skipped += 1
+            else:
+                entries.append(entry)
+        if number_skipped:
+            self.logger.info(
+                f"Skipped {number_skipped} outbox entries, deleted or claimed by another relay."
+            )
+        return entries
+
+    def release_many(self, entry_ids: Iterable[str]) -> None:
+        """Releases claimed outbox entries, so the next relay can claim them without waiting.
+
+        Failures are logged, not raised, as the claims run out after CLAIM_SECONDS anyway.
+
+        Args:
+            entry_ids (Iterable[str]): _
+        """
+        for entry_id in entry_ids:
+            try:
+                self.outbox_table.update_item(
+                    Key={"id": entry_id},
+                    UpdateExpression="REMOVE #claimed_until",
+                    ConditionExpression="attribute_exists(#id)",
+                    ExpressionAttributeNames={"#id": "id", "#claimed_until": "claimed_until"},
+                )
+            except ClientError as e:
+                self.logger.error(f"Failed to release outbox entry: {e.__class__.__name__}")
+                self.logger.debug(f"Exception: {e}")
+
+    def delete_many(self, entry_ids: Iterable[str]) -> None:
+        """Deletes outbox entries, using BatchWriteItem.
+
+        Args:
+            entry_ids (Iterable[str]): IDs of the entries to delete
+        """
+        number_deleted = 0
+        with self.outbox_table.batch_writer() as batch:
+            for entry_id in entry_ids:
+                batch.delete_item(Key={"id": entry_id})
+                number_deleted += 1
+        self.logger.info(
+            f"Deleted {number_deleted} entries from the {self.outbox_table_name} table."
+        )
@@ -0,0 +1,337 @@
+import os
+from decimal import Decimal
+from typing import Iterable
+
+from botocore.exceptions import ClientError
+
+from application.clients.AWSClient import AWSClient
+from application.dtos.GetPaymentRequestStatusDTO import (
+    GetPaymentRequestStatusDTO,
+    describe_status,
+)
+from application.mapping.mapper import Mapper
+from application.repositories.batching import MAX_ATTEMPTS, wait_before_retry
+from application.repositories.exceptions.NotFound import NotFound
+from application.repositories.exceptions.UnprocessedKeys import UnprocessedKeys
+from core.payment_request_aggregate.PaymentRequest import PaymentRequest
+from core.payment_request_aggregate.value_objects.CardNumber import CardNumber
+from shared_kernel.lambda_logging import get_logger
+
+SCAN_PAGE_SIZE = 100
+# Attributes of a payment requests table item that a status is rebuilt from.
+_REBUILD_ATTRIBUTES = (
+    "id",
+    "version",
+    "merchant_id",
+    "card_number",
+    "expiry_date",
+    "amount",
+    "is_sent_to_acquiring_bank",
+    "acquiring_bank_response",
+)
+
+
+class PaymentRequestStatusRepository:
+    """Read-side repository for the status of PaymentRequests.
+
+    Statuses are kept in a projection table, one small item per PaymentRequest, holding the
+    response GetPaymentRequestStatus returns (masked card, amount and status text) with the
+    merchant's ID and the version of the PaymentRequest it was formed from. Card security codes
+    must not be stored in any form, so the projection has no CVV: get_status reads it from the
+    payment requests table, in the same BatchGetItem as the status. A status read is therefore
+    a single round trip, with no domain logic.
+
+    PaymentRequestService saves the projection after each change to a PaymentRequest. Should
+    that fail, the projection is rebuilt from the payment requests table: on read if it is
+    missing, and from the item in the table's stream, by rebuild_from_item, after each change.
+    rebuild_all rebuilds every projection that is behind, e.g. to fill a new table. Projections
+    are only ever replaced by those of a later version, so writers racing each other cannot
+    move a status backwards.
+    """
+
+    def __init__(self):
+        self.payment_requests_table_name = os.environ["PAYMENT_REQUESTS_DYNAMODB_TABLE_NAME"]
+        self.statuses_table_name = os.environ["PAYMENT_REQUEST_STATUSES_DYNAMODB_TABLE_NAME"]
+        self.logger = get_logger()
+        self.dynamodb_resource = AWSClient.get_dynamodb_resource()
+        self.payment_requests_table = self.dynamodb_resource.Table(self.payment_requests_table_name)
+        self.statuses_table = self.dynamodb_resource.Table(self.statuses_table_name)
+        self._projection = {
+            "ProjectionExpression": ", ".join(f"#{name}" for name in _REBUILD_ATTRIBUTES),
+            "ExpressionAttributeNames": {f"#{name}": name for name in _REBUILD_ATTRIBUTES},
+        }
+
+    def get_status(self, payment_request_id: str) -> dict:
+        """Gets the status of a PaymentRequest, with its CVV, rebuilding it if it is missing.
+
+        Args:
+            payment_request_id (str): _
+
+        Raises:
+            NotFound: if the PaymentRequest does not exist
+            UnprocessedKeys: if the items could not be fetched after retrying
+
+        Returns:
+            dict: item with id, merchant_id, version, payment_details and status
+        """
+        responses = self._batch_get(
+            {
+                self.statuses_table_name: {"Keys": [{"id": payment_request_id}]},
+                self.payment_requests_table_name: {
+                    "Keys": [{"id": payment_request_id}],
+                    "ProjectionExpression": "#cvv",
+                    "ExpressionAttributeNames": {"#cvv": "cvv"},
+                },
+            }
+        )
+        if not responses[self.payment_requests_table_name]:
+            self.logger.info(
+                f"PaymentRequest not found in {self.payment_requests_table_name} table."
+            )
+            raise NotFound()
+        cvv = responses[self.payment_requests_table_name][0]["cvv"]["value"]
+
+        if not responses[self.statuses_table_name]:
+            self.logger.info(f"Status not found in {self.statuses_table_name} table, rebuilding.")
+            return _with_cvv(self.rebuild(payment_request_id), cvv)
+
+        return _with_cvv(_with_amount_as_decimal(responses[self.statuses_table_name][0]), cvv)
+
+    def _get_payment_request_item(self, payment_request_id: str) -> dict:
+        """Gets the attributes of a PaymentRequest that its status is rebuilt from.
+
+        Args:
+            payment_request_id (str): _
+
+        Raises:
+            NotFound: if the PaymentRequest does not exist
+
+        Returns:
+            dict: the payment requests table item, with only the attributes in _REBUILD_ATTRIBUTES
+        """
+        response = self.payment_requests_table.get_item(
+            Key={"id": payment_request_id}, **self._projection
+        )
+        if "Item" not in response:
+            self.logger.info(
+                f"PaymentRequest not found in {self.payment_requests_table_name} table."
+            )
+            raise NotFound()
+        return response["Item"]
+
+    def save(self, payment_request: PaymentRequest) -> None:
+        """Saves the status of a PaymentRequest, unless a later version is already saved.
+
+        Args:
+            payment_request (PaymentRequest): the PaymentRequest, as saved
+
+        Raises:
+            Exception: unexpected exception is logged and bubbled upwards
+        """
+        self._put_if_newer(
+            _to_status_item(
+                GetPaymentRequestStatusDTO.from_payment_request(payment_request).json,
+                payment_request.merchant_id.value,
+                payment_request.version,
+            )
+        )
+
+    def save_many(self, payment_requests: Iterable[PaymentRequest]) -> None:
+        """Saves the statuses of newly created PaymentRequests, using BatchWriteItem.
+
+        BatchWriteItem does not support conditions, so versions are not checked. Intended for
+        PaymentRequests that have only just been created.
+
+        Args:
+            payment_requests (Iterable[PaymentRequest]): the PaymentRequests, as saved
+        """
+        number_saved = 0
+        with self.statuses_table.batch_writer() as batch:
+            for payment_request in payment_requests:
+                batch.put_item(
+                    Item=_to_status_item(
+                        GetPaymentRequestStatusDTO.from_payment_request(payment_request).json,
+                        payment_request.merchant_id.value,
+                        payment_request.version,
+                    )
+                )
+                number_saved += 1
+        self.logger.info(f"Saved {number_saved} statuses to {self.statuses_table_name} table.")
+
+    def rebuild(self, payment_request_id: str) -> dict:
+        """Rebuilds the status of a PaymentRequest from the payment requests table.
+
+        Args:
+            payment_request_id (str): _
+
+        Raises:
+            NotFound: if the PaymentRequest does not exist
+
+        Returns:
+            dict: item with id, merchant_id, version, payment_details and status, as saved,
+                without the CVV
+        """
+        status_item = self._status_item_from(self._get_payment_request_item(payment_request_id))
+        self._put_if_newer(status_item)
+        return _with_amount_as_decimal(status_item)
+
+    def rebuild_from_item(self, payment_request_item: dict) -> None:
+        """Rebuilds the status of a PaymentRequest from its payment requests table item.
+
+        Args:
+            payment_request_item (dict): item with at least the attributes in
+                _REBUILD_ATTRIBUTES, e.g. the new image of a stream record
+
+        Raises:
+            Exception: unexpected exception is logged and bubbled upwards
+        """
+        self._put_if_newer(self._status_item_from(payment_request_item))
+
+    def rebuild_all(self) -> int:
+        """Rebuilds every status that is missing, or behind its PaymentRequest.
+
+        The payment requests table is scanned a page at a time. The versions of the saved
+        statuses are fetched for each page, so only statuses that have drifted are written.
+
+        Raises:
+            UnprocessedKeys: if a page's statuses could not be fetched after retrying
+
+        Returns:
+            int: number of statuses rebuilt
+        """
+        number_rebuilt = 0
+        scan_arguments = {"Limit": SCAN_PAGE_SIZE, **self._projection}
+        while True:
+            response = self.payment_requests_table.scan(**scan_arguments)
+            page = response["Items"]
+            saved_versions = self._get_saved_versions([item["id"] for item in page]) if page else {}
+            for item in page:
+                if saved_versions.get(item["id"], -1) < item.get("version", 0):
+                    self._put_if_newer(self._status_item_from(item))
+                    number_rebuilt += 1
+            if "LastEvaluatedKey" not in response:
+                break
+            scan_arguments["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+        self.logger.info(f"Rebuilt {number_rebuilt} statuses in {self.statuses_table_name} table.")
+        return number_rebuilt
+
+    def _status_item_from(self, payment_request_item: dict) -> dict:
+        return _to_status_item(
+            _status_json_from_item(payment_request_item),
+            payment_request_item["merchant_id"]["value"],
+            # Saved before versioning was introduced.
+            payment_request_item.get("version", 0),
+        )
+
+    def _put_if_newer(self, status_item: dict) -> None:
+        try:
+            self.statuses_table.put_item(
+                Item=status_item,
+                ConditionExpression="attribute_not_exists(#id) OR #version < :version",
+                ExpressionAttributeNames={"#id": "id", "#version": "version"},
+                ExpressionAttributeValues={":version": status_item["version"]},
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                self.logger.info(f"Status of version {status_item['version']} or later is saved.")
+                return
+            self.logger.error(f"Failed to save status: {e.__class__.__name__}")
+            self.logger.debug(f"Exception: {e}")
+            raise e
+        self.logger.info(f"Saved status to {self.statuses_table_name} table.")
+
+    def _get_saved_versions(self, payment_request_ids: list) -> dict:
+        responses = self._batch_get(
+            {
+                self.statuses_table_name: {
+                    "Keys": [
+                        {"id": payment_request_id} for payment_request_id in payment_request_ids
+                    ],
+                    "ProjectionExpression": "#id, #version",
+                    "ExpressionAttributeNames": {"#id": "id", "#version": "version"},
+                }
+            }
+        )
+        return {
+            status_item["id"]: status_item["version"]
+            for status_item in responses[self.statuses_table_name]
+        }
+
+    def _batch_get(self, request_items: dict) -> dict:
+        """Gets items with BatchGetItem, retrying unprocessed keys.
+
+        Args:
+            request_items (dict): RequestItems of the first BatchGetItem
+
+        Raises:
+            UnprocessedKeys: if keys are still unprocessed after MAX_ATTEMPTS
+
+        Returns:
+            dict: the items fetched from each table in request_items, by table name
+        """
+        responses = {table_name: [] for table_name in request_items}
+        attempt = 0
+        while request_items:
+            attempt += 1
+            response = self.dynamodb_resource.batch_get_item(RequestItems=request_items)
+            for table_name, items in response["Responses"].items():
+                responses[table_name].extend(items)
+
+            request_items = response.get("UnprocessedKeys", {})
+            if request_items and attempt == MAX_ATTEMPTS:
+                keys = [key for table in request_items.values() for key in table["Keys"]]
+                self.logger.error(f"{len(keys)} keys unprocessed after {MAX_ATTEMPTS} attempts.")
+                raise UnprocessedKeys([key["id"] for key in keys])
+            if request_items:
+                wait_before_retry(attempt)
+        return responses
+
+
+def _status_json_from_item(item: dict) -> dict:
+    # Forms the status of a payment requests table item as
+    # GetPaymentRequestStatusDTO.from_payment_request does, without building a PaymentRequest,
+    # and without the CVV.
+    acquiring_bank_response = item["acquiring_bank_response"]
+    return {
+        "payment_details": {
+            "id": item["id"],
+            "card_number": CardNumber.mask(item["card_number"]["value"]),
+            "expiry_date": f"{item['expiry_date']['month']}-{item['expiry_date']['year']}",
+            # Amounts too precise for a DynamoDB number are stored as strings.
+            "amount": Decimal(item["amount"]["amount"]),
+            "currency": item["amount"]["currency"]["value"],
+        },
+        "status": describe_status(
+            item["is_sent_to_acquiring_bank"],
+            acquiring_bank_response["value"] if acquiring_bank_response else None,
+        ),
+    }
+
+
+def _to_status_item(status_json: dict, merchant_id: str, version: int) -> dict:
+    # Card security codes must not be stored in any form, so the CVV is left out.
+    payment_details = {
+        name: value for name, value in status_json["payment_details"].items() if name != "cvv"
+    }
+    return Mapper.object_to_dict(
+        {
+            "id": payment_details["id"],
+            "merchant_id": merchant_id,
+            "version": version,
+            **status_json,
+            "payment_details": payment_details,
+        }
+    )
+
+
+def _with_amount_as_decimal(status_item: dict) -> dict:
+    # Amounts too precise for a DynamoDB number are stored as strings.
+    payment_details = status_item["payment_details"]
+    payment_details["amount"] = Decimal(payment_details["amount"])
+    return status_item
+
+
+def _with_cvv(status_item: dict, cvv: str) -> dict:
+    status_item["payment_details"]["cvv"] = cvv
+    return status_item
@@ -1,29 +1,59 @@
 import os
+import weakref
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from botocore.exceptions import ClientError
 
 from application.clients.AWSClient import AWSClient
 from application.mapping.mapper import Mapper
 from application.mapping.payment_request_mapper import PaymentRequestMapper
+from application.repositories.batching import MAX_ATTEMPTS, chunked, wait_before_retry
+from application.repositories.exceptions.ConcurrencyConflict import ConcurrencyConflict
 from application.repositories.exceptions.NotFound import NotFound
+from application.repositories.exceptions.UnprocessedKeys import UnprocessedKeys
 from core.payment_request_aggregate.PaymentRequest import PaymentRequest
 from shared_kernel.lambda_logging import get_logger
 
+BATCH_WRITE_ITEM_LIMIT = 25
+BATCH_GET_ITEM_LIMIT = 100
+# DynamoDB now accepts 100 items per TransactWriteItems, but moto and localstack still enforce 25.
+TRANSACT_WRITE_ITEMS_LIMIT = 25
+_KEY_AND_VERSION_ATTRIBUTES = ("id", "version")
+# GSI keys must be top level scalar attributes, but merchant_id is a map, so its value is copied
+# to MERCHANT_KEY_ATTRIBUTE. It is dropped again when an item is mapped to a PaymentRequest.
+MERCHANT_KEY_ATTRIBUTE = "merchant_key"
+BY_MERCHANT_INDEX_NAME = "by_merchant_and_created_at"
+QUERY_PAGE_SIZE = 100
+
 
 class PaymentRequestsRepository:
     def __init__(self):
         self.payment_requests_table_name = os.environ["PAYMENT_REQUESTS_DYNAMODB_TABLE_NAME"]
         self.logger = get_logger()
-        self.payment_requests_table = AWSClient.get_dynamodb_resource().Table(
-            self.payment_requests_table_name
-        )
+        self.dynamodb_resource = AWSClient.get_dynamodb_resource()
+        self.payment_requests_table = self.dynamodb_resource.Table(self.payment_requests_table_name)
+        # Items as they were last loaded or saved by this repository, keyed by PaymentRequest.
+        # Used to work out which attributes have changed when a PaymentRequest is updated. Keys
+        # are weak, so an item is dropped with its PaymentRequest, and a repository that is
+        # reused, e.g. across warm invocations, does not grow.
+        self._loaded_items = weakref.WeakKeyDictionary()
 
-    def upsert(self, payment_request: PaymentRequest) -> None:
+    def upsert(self, payment_request: PaymentRequest, outbox_entries: Iterable[dict] = ()) -> None:
         """Inserts or overwrites.
 
+        Optimistic concurrency: the write only succeeds if the item does not exist yet,
+        or is still at the version of the PaymentRequest. The version is then incremented.
+
+        If outbox entries are given, they are written in the same transaction (TransactWriteItems),
+        so the commands are recorded if and only if the PaymentRequest is saved.
+
         Args:
             PaymentRequest (PaymentRequest): PaymentRequest to insert or overwrite in dynamodb.
+            outbox_entries (Iterable[dict]): made by OutboxRepository.make_entry
 
         Raises:
             TypeError: if provided object is not of type PaymentRequest
+            ConcurrencyConflict: if another writer saved the PaymentRequest since it was loaded
             Exception: unexpected exception is logged and bubbled upwards
         """
         if type(payment_request) != PaymentRequest:
@@ -32,16 +62,303 @@ class PaymentRequestsRepository:
             )
             raise TypeError()
 
+        expected_version = payment_request.version
+        item = _to_item(payment_request)
+        item["version"] = expected_version + 1
+        condition = {
+            "ConditionExpression": f"attribute_not_exists(#id) OR {_version_condition(expected_version)}",
+            "ExpressionAttributeNames": {"#id": "id", "#version": "version"},
+            "ExpressionAttributeValues": {":expected_version": expected_version},
+        }
+        outbox_entries = list(outbox_entries)
+
         try:
-            self.payment_requests_table.put_item(Item=Mapper.object_to_dict(payment_request))
+            if outbox_entries:
+                self._put_with_outbox_entries(item, condition, outbox_entries)
+            else:
+                self.payment_requests_table.put_item(Item=item, **condition)
             self.logger.info(
                 f"Created or updated PaymentRequest in the {self.payment_requests_table_name} table."
             )
+        except ClientError as e:
+            if not _is_condition_failure(e):
+                self.logger.error(
+                    f"Failed to save PaymentRequest in database: {e.__class__.__name__}"
+                )
+                self.logger.debug(f"Exception: {e}")
+                raise e
+            self.logger.info(f"PaymentRequest is no longer at version {expected_version}.")
+            raise ConcurrencyConflict()
         except Exception as e:
             self.logger.error(f"Failed to save PaymentRequest in database: {e.__class__.__name__}")
             self.logger.debug(f"Exception: {e}")
             raise e
 
+        payment_request.version = item["version"]
+        self._loaded_items[payment_request] = item
+
+    def _put_with_outbox_entries(self, item: dict, condition: dict, outbox_entries: list) -> None:
+        # The resource's client converts Python values to DynamoDB's types, as the Table does.
+        self.dynamodb_resource.meta.client.transact_write_items(
+            TransactItems=[
+                {"Put": {"TableName": self.payment_requests_table_name, "Item": item, **condition}},
+                *outbox_entries,
+            ]
+        )
+
+    def update(self, payment_request: PaymentRequest) -> None:
+        """Persists only the attributes that changed since the PaymentRequest was loaded
+        or saved by this repository, using UpdateItem.
+
+        Attributes changed by other writers in the meantime are not overwritten, and fewer
+        write capacity units are consumed than rewriting the whole item.
+
+        Optimistic concurrency: the update only succeeds if the item is still at the version
+        of the PaymentRequest. The version is then incremented.
+
+        Falls back to upsert if the PaymentRequest was not loaded by this repository.
+
+        Args:
+            payment_request (PaymentRequest): PaymentRequest to update in dynamodb.
+
+        Raises:
+            TypeError: if provided object is not of type PaymentRequest
+            NotFound: if the PaymentRequest no longer exists in dynamodb
+            ConcurrencyConflict: if another writer saved the PaymentRequest since it was loaded
+            Exception: unexpected exception is logged and bubbled upwards
+        """
+        if type(payment_request) != PaymentRequest:
+            self.logger.error(
+                f"The argument passed to update() must be a {PaymentRequest}, not {type(payment_request)}."
+            )
+            raise TypeError()
+
+        loaded_item = self._loaded_items.get(payment_request)
+        if loaded_item is None:
+            self.logger.info("PaymentRequest was not loaded by this repository, upserting instead.")
+            self.upsert(payment_request)
+            return
+
+        expected_version = payment_request.version
+        item = _to_item(payment_request)
+        changed_attributes = {
+            name: value
+            for name, value in item.items()
+            if name not in _KEY_AND_VERSION_ATTRIBUTES
+            and (name not in loaded_item or loaded_item[name] != value)
+        }
+        removed_attributes = [
+            name
+            for name in loaded_item
+            if name not in item and name not in _KEY_AND_VERSION_ATTRIBUTES
+        ]
+
+        if not changed_attributes and not removed_attributes:
+            self.logger.info("PaymentRequest has not changed, nothing to update.")
+            return
+
+        item["version"] = expected_version + 1
+        changed_attributes["version"] = item["version"]
+        update_expression = _update_expression(changed_attributes, removed_attributes)
+        update_expression["ExpressionAttributeNames"]["#version"] = "version"
+        update_expression["ExpressionAttributeValues"][":expected_version"] = expected_version
+
+        try:
+            self.payment_requests_table.update_item(
+                Key={"id": payment_request.id},
+                ConditionExpression=f"attribute_exists(#id) AND {_version_condition(expected_version)}",
+                **update_expression,
+            )
+            self.logger.info(
+                f"Updated {len(changed_attributes) + len(removed_attributes)} attributes of PaymentRequest"
+                f" in the {self.payment_requests_table_name} table."
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                self.logger.error(
+                    f"Failed to update PaymentRequest in database: {e.__class__.__name__}"
+                )
+                self.logger.debug(f"Exception: {e}")
+                raise e
+            if "Item" not in self.payment_requests_table.get_item(Key={"id": payment_request.id}):
+                self.logger.error(
+                    f"PaymentRequest not found in {self.payment_requests_table_name} table."
+                )
+                raise NotFound()
+            self.logger.info(f"PaymentRequest is no longer at version {expected_version}.")
+            raise ConcurrencyConflict()
+
+        payment_request.version = item["version"]
+        self._loaded_items[payment_request] = item
+
+    def upsert_many(self, payment_requests: Iterable[PaymentRequest]) -> dict:
+        """Inserts or overwrites many PaymentRequests, using BatchWriteItem.
+
+        The iterable is streamed in chunks of 25 (the BatchWriteItem limit), so it is never held
+        in memory all at once. Unprocessed items are retried with exponential backoff.
+
+        BatchWriteItem does not support conditions, so versions are not checked. Intended for
+        bulk imports and replays, rather than concurrent writers.
+
+        Args:
+            payment_requests (Iterable[PaymentRequest]): PaymentRequests to insert or overwrite.
+
+        Raises:
+            TypeError: if any provided object is not of type PaymentRequest
+
+        Returns:
+            dict: PaymentRequest ID -> reason, for each PaymentRequest that could not be saved.
+        """
+        failures = {}
+        number_saved = 0
+
+        for chunk in chunked(payment_requests, BATCH_WRITE_ITEM_LIMIT):
+            put_requests = {}
+            for payment_request in chunk:
+                if type(payment_request) != PaymentRequest:
+                    self.logger.error(
+                        f"The items passed to upsert_many() must be {PaymentRequest}, not {type(payment_request)}."
+                    )
+                    raise TypeError()
+                # A batch may not contain the same key twice, the last write wins, as it would with upsert.
+                put_requests[payment_request.id] = {
+                    "PutRequest": {"Item": _to_item(payment_request)}
+                }
+
+            chunk_failures = self._batch_write(list(put_requests.values()))
+            failures.update(chunk_failures)
+            number_saved += len(put_requests) - len(chunk_failures)
+
+        self.logger.info(
+            f"Created or updated {number_saved} PaymentRequests in the {self.payment_requests_table_name} table."
+        )
+        if failures:
+            self.logger.error(f"Failed to save {len(failures)} PaymentRequests in database.")
+
+        return failures
+
+    def _batch_write(self, write_requests: list) -> dict:
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                response = self.dynamodb_resource.batch_write_item(
+                    RequestItems={self.payment_requests_table_name: write_requests}
+                )
+            except ClientError as e:
+                reason = e.response["Error"]["Code"]
+                self.logger.error(f"Failed to save batch of PaymentRequests in database: {reason}")
+                return {request["PutRequest"]["Item"]["id"]: reason for request in write_requests}
+
+            write_requests = response.get("UnprocessedItems", {}).get(
+                self.payment_requests_table_name, []
+            )
+            if not write_requests:
+                return {}
+
+            if attempt == MAX_ATTEMPTS:
+                reason = f"Unprocessed after {MAX_ATTEMPTS} attempts."
+                return {request["PutRequest"]["Item"]["id"]: reason for request in write_requests}
+
+            self.logger.info(f"Retrying {len(write_requests)} unprocessed PaymentRequests.")
+            wait_before_retry(attempt)
+
+    def insert_many_with_outbox_entries(
+        self, payment_requests_with_outbox_entries: Iterable[Tuple[PaymentRequest, List[dict]]]
+    ) -> dict:
+        """Inserts many new PaymentRequests, each with its outbox entries, using TransactWriteItems.
+
+        As many PaymentRequests as fit (with their outbox entries) are written per transaction,
+        so each PaymentRequest is saved if and only if its outbox entries are. A transaction that
+        is cancelled saves none of its PaymentRequests.
+
+        Args:
+            payment_requests_with_outbox_entries (Iterable[Tuple[PaymentRequest, List[dict]]]):
+                new PaymentRequests, with outbox entries made by OutboxRepository.make_entry
+
+        Raises:
+            TypeError: if any provided object is not of type PaymentRequest
+
+        Returns:
+            dict: PaymentRequest ID -> reason, for each PaymentRequest that could not be saved.
+        """
+        failures = {}
+        number_saved = 0
+
+        for transaction in self._insert_transactions(payment_requests_with_outbox_entries):
+            transaction_failures = self._transact_insert(transaction)
+            failures.update(transaction_failures)
+            number_saved += len(transaction) - len(transaction_failures)
+
+        self.logger.info(
+            f"Created {number_saved} PaymentRequests in the {self.payment_requests_table_name} table."
+        )
+        if failures:
+            self.logger.error(f"Failed to save {len(failures)} PaymentRequests in database.")
+
+        return failures
+
+    def _insert_transactions(
+        self, payment_requests_with_outbox_entries: Iterable[Tuple[PaymentRequest, List[dict]]]
+    ) -> Iterator[List[tuple]]:
+        """Groups PaymentRequests into transactions of at most TRANSACT_WRITE_ITEMS_LIMIT items.
+
+        Yields:
+            List[tuple]: (PaymentRequest, item, TransactWriteItems elements) for each PaymentRequest
+        """
+        transaction = []
+        number_of_transact_items = 0
+        for payment_request, outbox_entries in payment_requests_with_outbox_entries:
+            if type(payment_request) != PaymentRequest:
+                self.logger.error(
+                    "The items passed to insert_many_with_outbox_entries() must be "
+                    f"{PaymentRequest}, not {type(payment_request)}."
+                )
+                raise TypeError()
+
+            item = _to_item(payment_request)
+            item["version"] = payment_request.version + 1
+            transact_items = [
+                {
+                    "Put": {
+                        "TableName": self.payment_requests_table_name,
+                        "Item": item,
+                        "ConditionExpression": "attribute_not_exists(#id)",
+                        "ExpressionAttributeNames": {"#id": "id"},
+                    }
+                },
+                *outbox_entries,
+            ]
+
+            if number_of_transact_items + len(transact_items) > TRANSACT_WRITE_ITEMS_LIMIT:
+                yield transaction
+                transaction = []
+                number_of_transact_items = 0
+            transaction.append((payment_request, item, transact_items))
+            number_of_transact_items += len(transact_items)
+
+        if transaction:
+            yield transaction
+
+    def _transact_insert(self, transaction: List[tuple]) -> dict:
+        try:
+            self.dynamodb_resource.meta.client.transact_write_items(
+                TransactItems=[
+                    transact_item
+                    for _, _, transact_items in transaction
+                    for transact_item in transact_items
+                ]
+            )
+        except ClientError as e:
+            reason = e.response["Error"]["Code"]
+            self.logger.error(f"Failed to save batch of PaymentRequests in database: {reason}")
+            return {payment_request.id: reason for payment_request, _, _ in transaction}
+
+        for payment_request, item, _ in transaction:
+            payment_request.version = item["version"]
+            self._loaded_items[payment_request] = item
+        return {}
+
     def get_by_aggregate_root_id(self, payment_request_id: str) -> PaymentRequest:
         try:
             payment_request_item = self.payment_requests_table.get_item(
@@ -63,4 +380,238 @@ class PaymentRequestsRepository:
             self.logger.debug(f"Exception: {e}")
             raise e
 
-        return PaymentRequestMapper.from_json(payment_request_item)
+        payment_request = _to_payment_request(payment_request_item)
+        self._loaded_items[payment_request] = payment_request_item
+        return payment_request
+
+    def get_many_by_aggregate_root_ids(
+        self, payment_request_ids: Iterable[str]
+    ) -> Iterator[PaymentRequest]:
+        """Lazily gets many PaymentRequests, using BatchGetItem.
+
+        IDs are consumed in chunks of 100 (the BatchGetItem limit) and PaymentRequests are
+        yielded as each response arrives, so memory stays flat for huge lists of IDs.
+        Unprocessed keys are retried with exponential backoff.
+
+        PaymentRequests are not yielded in the order of the IDs. IDs that do not exist are skipped.
+        An ID repeated within a chunk is only fetched once.
+
+        Args:
+            payment_request_ids (Iterable[str]): IDs of the PaymentRequests to get.
+
+        Raises:
+            UnprocessedKeys: if keys remain unprocessed after retrying
+            Exception: unexpected exception is logged and bubbled upwards
+
+        Yields:
+            PaymentRequest: the PaymentRequests that were found
+        """
+        for chunk in chunked(payment_request_ids, BATCH_GET_ITEM_LIMIT):
+            keys = [{"id": payment_request_id} for payment_request_id in dict.fromkeys(chunk)]
+            attempt = 0
+            while keys:
+                attempt += 1
+                try:
+                    response = self.dynamodb_resource.batch_get_item(
+                        RequestItems={self.payment_requests_table_name: {"Keys": keys}}
+                    )
+                except Exception as e:
+                    self.logger.error(
+                        f"Failed to get PaymentRequests from database: {e.__class__.__name__}"
+                    )
+                    self.logger.debug(f"Exception: {e}")
+                    raise e
+
+                payment_request_items = response["Responses"].get(
+                    self.payment_requests_table_name, []
+                )
+                self.logger.info(
+                    f"Retrieved {len(payment_request_items)} PaymentRequests"
+                    f" from {self.payment_requests_table_name} table."
+                )
+                for payment_request_item in payment_request_items:
+                    yield _to_payment_request(payment_request_item)
+
+                keys = (
+                    response.get("UnprocessedKeys", {})
+                    .get(self.payment_requests_table_name, {})
+                    .get("Keys", [])
+                )
+                if keys and attempt == MAX_ATTEMPTS:
+                    self.logger.error(
+                        f"{len(keys)} keys unprocessed after {MAX_ATTEMPTS} attempts."
+                    )
+                    raise UnprocessedKeys([key["id"] for key in keys])
+                if keys:
+                    self.logger.info(f"Retrying {len(keys)} unprocessed keys.")
+                    wait_before_retry(attempt)
+
+    def iter_by_merchant(
+        self, merchant_id: str, since: Optional[int] = None, until: Optional[int] = None
+    ) -> Iterator[PaymentRequest]:
+        """Lazily gets a merchant's PaymentRequests, oldest first, using the merchant index.
+
+        Pages of QUERY_PAGE_SIZE are fetched as they are consumed, so memory stays flat however
+        many PaymentRequests the merchant has.
+
+        Args:
+            merchant_id (str): _
+            since (Optional[int]): earliest created_at to include, in seconds since the epoch
+            until (Optional[int]): latest created_at to include, in seconds since the epoch
+
+        Yields:
+            PaymentRequest: the merchant's PaymentRequests
+        """
+        cursor = None
+        while True:
+            payment_requests, cursor = self.get_page_by_merchant(
+                merchant_id, since, until, QUERY_PAGE_SIZE, cursor
+            )
+            yield from payment_requests
+            if cursor is None:
+                return
+
+    def get_page_by_merchant(
+        self,
+        merchant_id: str,
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+        limit: int = QUERY_PAGE_SIZE,
+        cursor: Optional[dict] = None,
+    ) -> Tuple[List[PaymentRequest], Optional[dict]]:
+        """Gets a page of a merchant's PaymentRequests, oldest first, using the merchant index.
+
+        PaymentRequests saved before created_at was recorded are not in the index.
+
+        Args:
+            merchant_id (str): _
+            since (Optional[int]): earliest created_at to include, in seconds since the epoch
+            until (Optional[int]): latest created_at to include, in seconds since the epoch
+            limit (int): maximum number of PaymentRequests in the page
+            cursor (Optional[dict]): returned with the previous page, to get the next one
+
+        Raises:
+            Exception: unexpected exception is logged and bubbled upwards
+
+        Returns:
+            Tuple[List[PaymentRequest], Optional[dict]]: the page, and the cursor of the next
+                page, which is None if this is the last page
+        """
+        query_arguments = {
+            "IndexName": BY_MERCHANT_INDEX_NAME,
+            "Limit": limit,
+            **_by_merchant_key_condition(merchant_id, since, until),
+        }
+        if cursor is not None:
+            query_arguments["ExclusiveStartKey"] = cursor
+
+        try:
+            response = self.payment_requests_table.query(**query_arguments)
+        except Exception as e:
+            self.logger.error(
+                f"Failed to get merchant's PaymentRequests from database: {e.__class__.__name__}"
+            )
+            self.logger.debug(f"Exception: {e}")
+            raise e
+
+        self.logger.info(
+            f"Retrieved {len(response['Items'])} of merchant's PaymentRequests"
+            f" from {self.payment_requests_table_name} table."
+        )
+        payment_requests = [_to_payment_request(item) for item in response["Items"]]
+        return payment_requests, response.get("LastEvaluatedKey")
+
+
+def _to_item(payment_request: PaymentRequest) -> dict:
+    item = Mapper.object_to_dict(payment_request)
+    item[MERCHANT_KEY_ATTRIBUTE] = payment_request.merchant_id.value
+    return item
+
+
+def _to_payment_request(payment_request_item: dict) -> PaymentRequest:
+    if (
+        "version" not in payment_request_item
+        or "possible_duplicate_of" not in payment_request_item
+        or MERCHANT_KEY_ATTRIBUTE in payment_request_item
+    ):
+        payment_request_item = dict(payment_request_item)
+        # Saved before versioning, or duplicate detection, was introduced.
+        payment_request_item.setdefault("version", 0)
+        payment_request_item.setdefault("possible_duplicate_of", None)
+        payment_request_item.pop(MERCHANT_KEY_ATTRIBUTE, None)
+    return PaymentRequestMapper.from_json(payment_request_item)
+
+
+def _by_merchant_key_condition(
+    merchant_id: str, since: Optional[int], until: Optional[int]
+) -> dict:
+    key_condition = "#merchant_key = :merchant_key"
+    names = {"#merchant_key": MERCHANT_KEY_ATTRIBUTE}
+    values = {":merchant_key": merchant_id}
+    if since is not None or until is not None:
+        names["#created_at"] = "created_at"
+    if since is not None and until is not None:
+        key_condition += " AND #created_at BETWEEN :since AND :until"
+        values.update({":since": since, ":until": until})
+    elif since is not None:
+        key_condition += " AND #created_at >= :since"
+        values[":since"] = since
+    elif until is not None:
+        key_condition += " AND #created_at <= :until"
+        values[":until"] = until
+    return {
+        "KeyConditionExpression": key_condition,
+        "ExpressionAttributeNames": names,
+        "ExpressionAttributeValues": values,
+    }
+
+
+def _is_condition_failure(error: ClientError) -> bool:
+    code = error.response["Error"]["Code"]
+    if code == "ConditionalCheckFailedException":
+        return True
+    # A cancelled transaction reports a reason for each item; the PaymentRequest is the first.
+    reasons = error.response.get("CancellationReasons", [])
+    return (
+        code == "TransactionCanceledException"
+        and bool(reasons)
+        and reasons[0].get("Code") == "ConditionalCheckFailed"
+    )
+
+
+def _version_condition(expected_version: int) -> str:
+    if expected_version == 0:
+        return "(attribute_not_exists(#version) OR #version = :expected_version)"
+    return "#version = :expected_version"
+
+
+def _update_expression(changed_attributes: dict, removed_attributes: list) -> dict:
+    """Builds the UpdateItem arguments that set changed_attributes and remove removed_attributes.
+
+    Attribute names are always passed as placeholders, so reserved words can be used as names.
+    """
+    attribute_names = {"#id": "id"}
+    attribute_values = {}
+    set_actions = []
+    remove_actions = []
+
+    for index, (name, value) in enumerate(changed_attributes.items()):
+        attribute_names[f"#set{index}"] = name
+        attribute_values[f":set{index}"] = value
+        set_actions.append(f"#set{index} = :set{index}")
+
+    for index, name in enumerate(removed_attributes):
+        attribute_names[f"#remove{index}"] = name
+        remove_actions.append(f"#remove{index}")
+
+    clauses = []
+    if set_actions:
+        clauses.append("SET " + ", ".join(set_actions))
+    if remove_actions:
+        clauses.append("REMOVE " + ", ".join(remove_actions))
+
+    return {
+        "UpdateExpression": " ".join(clauses),
+        "ExpressionAttributeNames": attribute_names,
+        "ExpressionAttributeValues": attribute_values,
+    }
@@ -0,0 +1,39 @@
+import random
+import time
+from itertools import islice
+from typing import Iterable, Iterator
+
+MAX_ATTEMPTS = 5
+BASE_DELAY_SECONDS = 0.05
+MAX_DELAY_SECONDS = 2.0
+
+
+def chunked(iterable: Iterable, size: int) -> Iterator[list]:
+    """Lazily splits an iterable into lists of at most size items.
+
+    Only one chunk is held in memory at a time, so arbitrarily large iterables can be streamed.
+
+    Args:
+        iterable (Iterable): items to split
+        size (int): maximum number of items per chunk
+
+    Yields:
+        list: the next chunk
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def wait_before_retry(attempt: int) -> None:
+    """Sleeps before retrying unprocessed items/keys of a batch operation.
+
+    Exponential backoff with full jitter, as recommended by AWS for DynamoDB batch operations.
+
+    Args:
+        attempt (int): number of attempts made so far, starting at 1
+    """
+    time.sleep(random.uniform(0, min(MAX_DELAY_SECONDS, BASE_DELAY_SECONDS * 2**attempt)))
@@ -0,0 +1,2 @@
+class ConcurrencyConflict(Exception):
+    """Raised when an aggregate was saved by another writer after it was loaded."""
@@ -0,0 +1,2 @@
+class IdempotencyKeyInUse(Exception):
+    """Raised when another request with the same idempotency key is still being processed."""
@@ -0,0 +1,2 @@
+class IdempotencyKeyReused(Exception):
+    """Raised when an idempotency key is reused for a request with different contents."""
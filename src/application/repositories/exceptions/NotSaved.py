@@ -0,0 +1,6 @@
+class NotSaved(Exception):
+    """Describes why an aggregate could not be saved by a batch operation."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
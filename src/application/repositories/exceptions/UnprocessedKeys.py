@@ -0,0 +1,4 @@
+class UnprocessedKeys(Exception):
+    def __init__(self, payment_request_ids: list):
+        super().__init__(f"{len(payment_request_ids)} keys were not processed.")
+        self.payment_request_ids = payment_request_ids
@@ -0,0 +1,147 @@
+import hashlib
+import os
+from collections import defaultdict
+from typing import Iterable, List, Optional
+
+from application.repositories.PaymentRequestsRepository import PaymentRequestsRepository
+from core.payment_request_aggregate.PaymentRequest import PaymentRequest
+from shared_kernel.bloom_filters.TimeBucketedBloomFilter import TimeBucketedBloomFilter
+from shared_kernel.lambda_logging.set_up_logger import get_logger
+
+# PaymentRequests for the same merchant, card, amount and currency within this many seconds of
+# each other are likely duplicates.
+WINDOW_SECONDS = int(os.environ.get("DUPLICATE_PAYMENT_WINDOW_SECONDS", "600"))
+BUCKET_SECONDS = int(os.environ.get("DUPLICATE_PAYMENT_BUCKET_SECONDS", "60"))
+CAPACITY_PER_BUCKET = int(os.environ.get("DUPLICATE_PAYMENT_CAPACITY_PER_BUCKET", "10000"))
+FALSE_POSITIVE_RATE = float(os.environ.get("DUPLICATE_PAYMENT_FALSE_POSITIVE_RATE", "0.001"))
+
+
+class DuplicatePaymentRequestDetector:
+    """Finds the earlier PaymentRequest a new one likely duplicates.
+
+    A PaymentRequest is a likely duplicate of another for the same merchant, card, amount and
+    currency created within WINDOW_SECONDS of it. Every PaymentRequest saved is remembered, by
+    remember, in a TimeBucketedBloomFilter for the lifetime of the container, keyed by a digest
+    of those fields. The merchant's recent PaymentRequests are only queried, to confirm a
+    duplicate, when the filter reports the key as seen, so most checks do not read DynamoDB.
+    Duplicates within a batch of new PaymentRequests are found in memory.
+
+    Each container only remembers the PaymentRequests it checked, so a duplicate submitted to
+    another container is not found. Duplicates are flagged, not prevented; merchants use an
+    Idempotency-Key to retry safely.
+    """
+
+    _recent = TimeBucketedBloomFilter(
+        WINDOW_SECONDS, BUCKET_SECONDS, CAPACITY_PER_BUCKET, FALSE_POSITIVE_RATE
+    )
+
+    def __init__(self, payment_requests_repo: PaymentRequestsRepository):
+        self.payment_requests_repo = payment_requests_repo
+        self.logger = get_logger()
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        cls._recent.clear()
+
+    def find_duplicate_of(self, payment_request: PaymentRequest) -> Optional[str]:
+        """Finds the earlier PaymentRequest a new one likely duplicates.
+
+        Args:
+            payment_request (PaymentRequest): the new PaymentRequest, not yet saved
+
+        Returns:
+            Optional[str]: ID of the earliest saved PaymentRequest it likely duplicates, if any
+        """
+        return self.find_duplicates_of([payment_request])[0]
+
+    def find_duplicates_of(self, payment_requests: List[PaymentRequest]) -> List[Optional[str]]:
+        """Finds the earlier PaymentRequest each of a batch of new ones likely duplicates.
+
+        A PaymentRequest repeated within the batch duplicates its first copy, unless that
+        duplicates a saved PaymentRequest. The first copies the filter reports as seen are
+        confirmed with one query of each merchant's recent PaymentRequests.
+
+        Args:
+            payment_requests (List[PaymentRequest]): the new PaymentRequests, not yet saved
+
+        Returns:
+            List[Optional[str]]: for each PaymentRequest, in order, the ID of the earliest
+                PaymentRequest it likely duplicates, if any
+        """
+        duplicates_of = [None] * len(payment_requests)
+        first_copy_by_key = {}
+        later_copies = []
+        to_confirm_by_merchant = defaultdict(list)
+        for index, payment_request in enumerate(payment_requests):
+            key = _duplicate_key_of(payment_request)
+            first_copy = first_copy_by_key.setdefault(key, index)
+            if first_copy != index:
+                later_copies.append((index, first_copy))
+            elif key in self._recent:
+                to_confirm_by_merchant[payment_request.merchant_id.value].append(index)
+
+        for merchant_id, unconfirmed in to_confirm_by_merchant.items():
+            self.logger.info(f"{len(unconfirmed)} PaymentRequests may be duplicates, confirming.")
+            since = min(payment_requests[index].created_at for index in unconfirmed)
+            recent_payment_requests = list(
+                self.payment_requests_repo.iter_by_merchant(
+                    merchant_id, since=since - WINDOW_SECONDS
+                )
+            )
+            for index in unconfirmed:
+                duplicates_of[index] = _earliest_duplicate_of(
+                    payment_requests[index], recent_payment_requests
+                )
+
+        for index, first_copy in later_copies:
+            duplicates_of[index] = duplicates_of[first_copy] or payment_requests[first_copy].id
+
+        number_of_duplicates = sum(duplicate_of is not None for duplicate_of in duplicates_of)
+        if number_of_duplicates:
+            self.logger.info(f"{number_of_duplicates} PaymentRequests are likely duplicates.")
+        return duplicates_of
+
+    def remember(self, payment_requests: Iterable[PaymentRequest]) -> None:
+        """Remembers saved PaymentRequests, so later duplicates of them are found.
+
+        Only PaymentRequests that were saved are remembered, as those not saved cannot be
+        found by the query that confirms a duplicate.
+
+        Args:
+            payment_requests (Iterable[PaymentRequest]): the PaymentRequests, as saved
+        """
+        for payment_request in payment_requests:
+            self._recent.add(_duplicate_key_of(payment_request))
+
+
+def _earliest_duplicate_of(
+    payment_request: PaymentRequest, recent_payment_requests: List[PaymentRequest]
+) -> Optional[str]:
+    # Recent PaymentRequests are oldest first.
+    for earlier_payment_request in recent_payment_requests:
+        if (
+            earlier_payment_request.id != payment_request.id
+            and earlier_payment_request.created_at >= payment_request.created_at - WINDOW_SECONDS
+            and _is_same_payment(earlier_payment_request, payment_request)
+        ):
+            return earlier_payment_request.id
+    return None
+
+
+def _duplicate_key_of(payment_request: PaymentRequest) -> bytes:
+    # Amounts are normalized so that, for example, 10.5 and 10.50 have the same key.
+    fields = (
+        payment_request.merchant_id.value,
+        payment_request.card_number.value,
+        str(payment_request.amount.amount.normalize()),
+        payment_request.amount.currency.value,
+    )
+    return hashlib.sha256("\x1f".join(fields).encode()).digest()
+
+
+def _is_same_payment(payment_request: PaymentRequest, other: PaymentRequest) -> bool:
+    return (
+        payment_request.card_number.value == other.card_number.value
+        and payment_request.amount.amount == other.amount.amount
+        and payment_request.amount.currency.value == other.amount.currency.value
+    )
@@ -0,0 +1,88 @@
+from collections import defaultdict
+from typing import Iterable, List, Tuple
+
+from application.clients.CommandQueue import CommandQueue
+from application.repositories.OutboxRepository import OutboxRepository
+from shared_kernel.lambda_logging.set_up_logger import get_logger
+
+
+class OutboxRelayService:
+    def __init__(self) -> None:
+        self.outbox_repo = OutboxRepository()
+        self.logger = get_logger()
+
+    def relay_entries(self, entry_ids: Iterable[str]) -> int:
+        """Publishes the given outbox entries to their SQS queues, then deletes them.
+
+        For entries just added to the outbox. Each entry is claimed first, so entries that have
+        been published already, or are claimed by another relay, are skipped.
+
+        Args:
+            entry_ids (Iterable[str]): IDs of the outbox entries
+
+        Returns:
+            int: the number of entries published
+        """
+        number_relayed, number_failed = self._publish(self.outbox_repo.claim_many(entry_ids))
+        self._log_outcome(number_relayed, number_failed)
+        return number_relayed
+
+    def relay_outbox(self) -> int:
+        """Publishes every unclaimed entry in the outbox to its SQS queue, then deletes it.
+
+        A sweep for entries that a previous relay failed to publish, as it scans the whole
+        outbox. Each entry is claimed before it is published, so relays that overlap do not
+        publish the same entry. An entry may still be published more than once (e.g. if the
+        relay fails between publishing and deleting it), so command handlers must be idempotent.
+
+        Returns:
+            int: the number of entries published
+        """
+        number_relayed = 0
+        number_failed = 0
+
+        for entries in self.outbox_repo.iter_unclaimed_entries():
+            claimed_entries = self.outbox_repo.claim_many(entry["id"] for entry in entries)
+            page_relayed, page_failed = self._publish(claimed_entries)
+            number_relayed += page_relayed
+            number_failed += page_failed
+
+        self._log_outcome(number_relayed, number_failed)
+        return number_relayed
+
+    def _publish(self, entries: List[dict]) -> Tuple[int, int]:
+        """Publishes claimed entries ten at a time with SendMessageBatch, deletes those that
+        were published, and releases the rest for the next relay.
+
+        Returns:
+            Tuple[int, int]: the number of entries published, and the number that failed
+        """
+        entries_by_queue = defaultdict(list)
+        for entry in entries:
+            entries_by_queue[entry["queue_name"]].append(entry)
+
+        number_relayed = 0
+        number_failed = 0
+        for queue_name, queue_entries in entries_by_queue.items():
+            failures = CommandQueue(queue_name).send_message_bodies(
+                entry["message_body"] for entry in queue_entries
+            )
+            self.outbox_repo.delete_many(
+                entry["id"]
+                for position, entry in enumerate(queue_entries)
+                if position not in failures
+            )
+            if failures:
+                self.outbox_repo.release_many(
+                    queue_entries[position]["id"] for position in failures
+                )
+            number_relayed += len(queue_entries) - len(failures)
+            number_failed += len(failures)
+        return number_relayed, number_failed
+
+    def _log_outcome(self, number_relayed: int, number_failed: int) -> None:
+        self.logger.info(f"Relayed {number_relayed} commands from the outbox.")
+        if number_failed:
+            self.logger.error(
+                f"Failed to relay {number_failed} commands, they remain in the outbox."
+            )
@@ -1,63 +1,197 @@
+import hashlib
 import os
+import threading
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Iterable, List, Optional, Union
 
 from application.clients.AcquiringBankClient import AcquiringBankClient
-from application.clients.AWSClient import AWSClient
 from application.mapping.mapper import Mapper
+from application.repositories.exceptions.ConcurrencyConflict import ConcurrencyConflict
+from application.repositories.exceptions.IdempotencyKeyInUse import IdempotencyKeyInUse
+from application.repositories.exceptions.NotSaved import NotSaved
+from application.repositories.IdempotencyKeysRepository import IdempotencyKeysRepository
+from application.repositories.OutboxRepository import OutboxRepository
 from application.repositories.PaymentRequestsRepository import PaymentRequestsRepository
+from application.repositories.PaymentRequestStatusRepository import (
+    PaymentRequestStatusRepository,
+)
+from application.services.DuplicatePaymentRequestDetector import (
+    DuplicatePaymentRequestDetector,
+)
 from core.commands.ForwardPaymentRequestToAcquiringBank import (
     ForwardPaymentRequestToAcquiringBank,
 )
 from core.commands.ProcessAcquiringBankResponse import ProcessAcquiringBankResponse
 from core.commands.SubmitPaymentRequest import SubmitPaymentRequest
 from core.payment_request_aggregate.PaymentRequest import PaymentRequest
+from core.payment_request_aggregate.PaymentRequestBatchValidator import (
+    PaymentRequestBatchValidator,
+)
 from core.payment_request_aggregate.value_objects.AcquiringBankResponse import (
     AcquiringBankResponse,
 )
+from core.payment_request_aggregate.value_objects.CardNumber import CardNumber
+from shared_kernel.exceptions.DomainException import DomainException
 from shared_kernel.lambda_logging.set_up_logger import get_logger
 
+MAX_CONCURRENCY_CONFLICT_ATTEMPTS = 3
+# Limits on the number of PaymentRequests being forwarded to the Acquiring Bank at once, in total
+# and for a single merchant, so one merchant's burst cannot use every connection to the bank.
+MAX_FORWARDS_IN_FLIGHT = int(os.environ.get("MAX_FORWARDS_IN_FLIGHT", "10"))
+MAX_FORWARDS_IN_FLIGHT_PER_MERCHANT = int(
+    os.environ.get("MAX_FORWARDS_IN_FLIGHT_PER_MERCHANT", "4")
+)
+
 
 class PaymentRequestService:
+    # Forwards run on a pool kept for the life of the container, and each of its threads keeps
+    # one service, so warm invocations reuse the repositories and the boto3 resources that
+    # AWSClient caches for those threads.
+    _forward_executor = None
+    _forward_executor_lock = threading.Lock()
+    _worker_state = threading.local()
+
     def __init__(self) -> None:
         self.payment_requests_repo = PaymentRequestsRepository()
+        self.outbox_repo = OutboxRepository()
+        self.status_repo = PaymentRequestStatusRepository()
+        self.idempotency_keys_repo = IdempotencyKeysRepository()
+        self.duplicate_detector = DuplicatePaymentRequestDetector(self.payment_requests_repo)
         self.logger = get_logger()
 
-    def submit_payment_request(self, command: SubmitPaymentRequest) -> str:
+    def submit_payment_request(
+        self, command: SubmitPaymentRequest, idempotency_key: Optional[str] = None
+    ) -> str:
         """Submit a PaymentRequest.
 
         Creates the PaymentRequest aggregate, where validation of inputs parameters occurs.
-        Adds the item to Dynamo, and if successful sends a command to SQS that instructs
-        the system that this request must be forwarded to the Acquiring Bank.
+        Adds the item to Dynamo, along with a command in the outbox that instructs the system
+        that this request must be forwarded to the Acquiring Bank, in one transaction.
+        OutboxRelayService then publishes the command to SQS.
 
-        Optimisations that can exist here to improve transactionality and performance include
-        the Transactional Outbox Pattern.
+        Transactional Outbox Pattern:
         https://learn.microsoft.com/en-us/azure/architecture/best-practices/transactional-outbox-cosmos
 
+        If the merchant supplies an idempotency key, a retry of a request with that key returns
+        the ID of the PaymentRequest the request created, rather than creating another.
+
         Args:
             command (SubmitPaymentRequest): _
+            idempotency_key (Optional[str]): key the merchant supplied for this request
+
+        Raises:
+            IdempotencyKeyInUse: if a request with the same key is being processed
+            IdempotencyKeyReused: if the key was used for a different request
 
         Returns:
             str: the new PaymentRequest's ID.
         """
+        if idempotency_key is None:
+            return self._submit_payment_request(command)
+
+        # Card security codes must not be stored in any form, even hashed, and card numbers
+        # only as the masked number.
+        contents = {
+            **vars(command),
+            "card_number": CardNumber.mask(str(command.card_number)),
+            "cvv": None,
+        }
+        result = self._process_once(
+            f"{SubmitPaymentRequest.__name__}#{command.merchant_id}#{idempotency_key}",
+            _fingerprint_of(contents),
+            lambda: {"payment_request_id": self._submit_payment_request(command)},
+        )
+        return result["payment_request_id"]
+
+    def _submit_payment_request(self, command: SubmitPaymentRequest) -> str:
         self.logger.info("Creating new Payment Request.")
         payment_request = PaymentRequest(command)
-
-        self.payment_requests_repo.upsert(payment_request)
+        self._flag_duplicates([payment_request])
 
         forward_payment_request_command = ForwardPaymentRequestToAcquiringBank(
             payment_request.id, payment_request.merchant_id.value
         )
-        self._send_forward_to_acquiring_bank_command_to_queue(forward_payment_request_command)
-        self.logger.info("Published ForwardPaymentRequestToAcquiringBank command to SQS.")
+        outbox_entry = self.outbox_repo.make_entry(
+            os.environ["PAYMENT_REQUESTS_TO_FORWARD_QUEUE_NAME"], forward_payment_request_command
+        )
+        self.payment_requests_repo.upsert(payment_request, outbox_entries=[outbox_entry])
+        self.logger.info("Saved PaymentRequest and ForwardPaymentRequestToAcquiringBank command.")
+        self.duplicate_detector.remember([payment_request])
+        self._save_status(payment_request)
 
         return payment_request.id
 
+    def submit_payment_requests(
+        self, commands: List[SubmitPaymentRequest]
+    ) -> List[Union[str, DomainException, NotSaved]]:
+        """Submit many PaymentRequests.
+
+        The commands are validated together by PaymentRequestBatchValidator, which fails each
+        as submit_payment_request would, so PaymentRequests are only built from valid commands.
+        These are saved with their outbox entries in as few transactions as possible.
+
+        Args:
+            commands (List[SubmitPaymentRequest]): _
+
+        Returns:
+            List[Union[str, DomainException, NotSaved]]: outcome of each command, in the order
+                given. The new PaymentRequest's ID, or the exception explaining why it was not
+                created.
+        """
+        self.logger.info(f"Creating {len(commands)} new Payment Requests.")
+        outcomes = [None] * len(commands)
+        queue_name = os.environ["PAYMENT_REQUESTS_TO_FORWARD_QUEUE_NAME"]
+        payment_requests = []
+
+        errors = PaymentRequestBatchValidator.validate_commands(commands)
+        for index, (command, error) in enumerate(zip(commands, errors)):
+            if error is not None:
+                outcomes[index] = error
+                continue
+            payment_request = PaymentRequest(command)
+            outcomes[index] = payment_request.id
+            payment_requests.append(payment_request)
+
+        self._flag_duplicates(payment_requests)
+        payment_requests_with_outbox_entries = []
+        for payment_request in payment_requests:
+            forward_payment_request_command = ForwardPaymentRequestToAcquiringBank(
+                payment_request.id, payment_request.merchant_id.value
+            )
+            outbox_entry = self.outbox_repo.make_entry(queue_name, forward_payment_request_command)
+            payment_requests_with_outbox_entries.append((payment_request, [outbox_entry]))
+
+        failures = self.payment_requests_repo.insert_many_with_outbox_entries(
+            payment_requests_with_outbox_entries
+        )
+        if failures:
+            outcomes = [
+                NotSaved(failures[outcome]) if outcome in failures else outcome
+                for outcome in outcomes
+            ]
+        saved_payment_requests = [
+            payment_request
+            for payment_request in payment_requests
+            if payment_request.id not in failures
+        ]
+        self.duplicate_detector.remember(saved_payment_requests)
+        self._save_statuses(saved_payment_requests)
+
+        number_created = sum(type(outcome) is str for outcome in outcomes)
+        self.logger.info(f"Created {number_created} of {len(commands)} Payment Requests.")
+        return outcomes
+
     def process_acquiring_bank_response(self, command: ProcessAcquiringBankResponse) -> None:
         payment_request = self.payment_requests_repo.get_by_aggregate_root_id(
             command.payment_request_id
         )
-        response = AcquiringBankResponse(command.response)
-        payment_request.process_acquiring_bank_response(response)
-        self.payment_requests_repo.upsert(payment_request)
+
+        def process_response(payment_request: PaymentRequest):
+            response = AcquiringBankResponse(command.response)
+            payment_request.process_acquiring_bank_response(response)
+
+        self._apply_and_save(payment_request, process_response)
 
     def forward_payment_request_to_acquiring_bank(
         self, command: ForwardPaymentRequestToAcquiringBank
@@ -65,16 +199,37 @@ class PaymentRequestService:
         """Forwards PaymentRequest to the Acquiring Bank, if it has not already done so.
 
         A note on idempotency:
-        There exists an edge case where duplicate messages are processed in very quick succession,
-        such that the the aggregate has not yet been updated in dynamo. This may result in duplciates
-        being sent to the Acquiring Bank.
+        Commands are delivered at least once, and duplicates can be processed concurrently,
+        before the aggregate is updated in dynamo. Each PaymentRequest is therefore forwarded
+        under an idempotency key: a duplicate that arrives while it is being forwarded, or
+        after, returns without loading the aggregate or calling the bank. The key is the
+        PaymentRequest's ID rather than the SQS message ID, so duplicates published by the
+        outbox relay, which have their own message IDs, are caught too.
 
-        Better strategies exist to enforce idempotency, such as storing hashes of messages, or pushing
-        that responsibiltiy to SQS itself.
+        A duplicate that arrives while the PaymentRequest is being forwarded is dropped rather
+        than retried: the forward queue DLQs a message on its first failure (maxReceiveCount
+        is 1), so should the forward in progress fail, its own message is DLQ'd.
 
         Args:
             command (ForwardPaymentRequestToAcquiringBank): Command containing relevant information
         """
+
+        def forward() -> dict:
+            self._forward_payment_request_to_acquiring_bank(command)
+            return {}
+
+        try:
+            self._process_once(
+                f"{ForwardPaymentRequestToAcquiringBank.__name__}#{command.payment_request_id}",
+                _fingerprint_of(vars(command)),
+                forward,
+            )
+        except IdempotencyKeyInUse:
+            self.logger.info("PaymentRequest is being forwarded by another request, dropping.")
+
+    def _forward_payment_request_to_acquiring_bank(
+        self, command: ForwardPaymentRequestToAcquiringBank
+    ) -> None:
         # get payment request aggregate root
         payment_request = self.payment_requests_repo.get_by_aggregate_root_id(
             command.payment_request_id
@@ -91,22 +246,207 @@ class PaymentRequestService:
         acquiring_bank_client = AcquiringBankClient()
         acquiring_bank_client.post_payment_request(payment_request)
 
-        payment_request.mark_as_forwarded_to_acquiring_bank()
-        self.payment_requests_repo.upsert(payment_request)
+        self._apply_and_save(
+            payment_request,
+            lambda payment_request: payment_request.mark_as_forwarded_to_acquiring_bank(),
+        )
 
-    def _send_forward_to_acquiring_bank_command_to_queue(
-        self, command: ForwardPaymentRequestToAcquiringBank
-    ) -> None:
-        """Publishes the ForwardPaymentRequestToAcquiringBank command to teh
-        PAYMENT_REQUESTS_TO_FORWARD SQS queue.
+    def forward_payment_requests_to_acquiring_bank(
+        self, commands: List[ForwardPaymentRequestToAcquiringBank]
+    ) -> List[Optional[Exception]]:
+        """Forwards a batch of PaymentRequests to the Acquiring Bank concurrently.
 
-        TECH DEBT: The mechanism to send commands to SQS queues
-        could be refactored behind an abstraction as required.
+        Each command is processed as by forward_payment_request_to_acquiring_bank, on a pool of
+        MAX_FORWARDS_IN_FLIGHT threads that is kept between invocations. At most
+        MAX_FORWARDS_IN_FLIGHT_PER_MERCHANT commands for the same merchant are in flight at once;
+        the rest wait without holding a thread.
 
         Args:
-            command (ForwardPaymentRequestToAcquiringBank): Command to add to the queue
+            commands (List[ForwardPaymentRequestToAcquiringBank]): Commands to process
+
+        Returns:
+            List[Optional[Exception]]: outcome of each command, in the order given. None if the
+                PaymentRequest was forwarded (or had been already), else the exception raised.
         """
-        queue_name = os.environ["PAYMENT_REQUESTS_TO_FORWARD_QUEUE_NAME"]
-        sqs_resource = AWSClient.get_sqs_resource()
-        payments_to_forward_queue = sqs_resource.get_queue_by_name(QueueName=queue_name)
-        payments_to_forward_queue.send_message(MessageBody=Mapper.object_to_json_string(command))
+        outcomes = [None] * len(commands)
+        pending_by_merchant = defaultdict(deque)
+        for index, command in enumerate(commands):
+            pending_by_merchant[command.merchant_id].append(index)
+        in_flight_by_merchant = defaultdict(int)
+
+        executor = self._get_forward_executor()
+        in_flight = {}
+
+        def submit_ready_commands():
+            for merchant_id, pending in pending_by_merchant.items():
+                while (
+                    pending
+                    and len(in_flight) < MAX_FORWARDS_IN_FLIGHT
+                    and in_flight_by_merchant[merchant_id] < MAX_FORWARDS_IN_FLIGHT_PER_MERCHANT
+                ):
+                    index = pending.popleft()
+                    future = executor.submit(self._forward_in_worker, commands[index])
+                    in_flight[future] = index
+                    in_flight_by_merchant[merchant_id] += 1
+
+        submit_ready_commands()
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = in_flight.pop(future)
+                in_flight_by_merchant[commands[index].merchant_id] -= 1
+                outcomes[index] = future.exception()
+            submit_ready_commands()
+
+        failures = sum(outcome is not None for outcome in outcomes)
+        self.logger.info(f"Forwarded {len(commands) - failures} of {len(commands)} commands.")
+        return outcomes
+
+    @classmethod
+    def _forward_in_worker(cls, command: ForwardPaymentRequestToAcquiringBank) -> None:
+        # Repositories hold boto3 resources, which are not thread safe, so each worker thread
+        # uses its own service, made for its first command and reused for the rest.
+        service = getattr(cls._worker_state, "service", None)
+        if service is None:
+            service = cls._worker_state.service = cls()
+        service.forward_payment_request_to_acquiring_bank(command)
+
+    @classmethod
+    def _get_forward_executor(cls) -> ThreadPoolExecutor:
+        with cls._forward_executor_lock:
+            if cls._forward_executor is None:
+                cls._forward_executor = ThreadPoolExecutor(
+                    max_workers=MAX_FORWARDS_IN_FLIGHT, thread_name_prefix="forward"
+                )
+            return cls._forward_executor
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Shuts down the forward pool, discarding the services of its threads."""
+        with cls._forward_executor_lock:
+            executor, cls._forward_executor = cls._forward_executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _process_once(self, key: str, fingerprint: str, process: Callable[[], dict]) -> dict:
+        """Processes a command once per idempotency key, returning the stored result to duplicates.
+
+        Args:
+            key (str): idempotency key, scoped to the operation
+            fingerprint (str): digest of the command's contents
+            process (Callable[[], dict]): processes the command, returning a JSON serializable result
+
+        Raises:
+            IdempotencyKeyInUse: if a command with the same key is being processed
+            IdempotencyKeyReused: if the key was used for a command with different contents
+
+        Returns:
+            dict: the result of processing the command, now or by an earlier duplicate
+        """
+        result = self.idempotency_keys_repo.begin(key, fingerprint)
+        if result is not None:
+            self.logger.info("Command was processed already, returning its result.")
+            return result
+
+        try:
+            result = process()
+        except Exception:
+            self.idempotency_keys_repo.release(key)
+            raise
+
+        try:
+            self.idempotency_keys_repo.complete(key, fingerprint, result)
+        except Exception:
+            # Already logged. The command was processed, so its result is still returned;
+            # duplicates are refused until the key's lease expires.
+            pass
+        return result
+
+    def _apply_and_save(self, payment_request: PaymentRequest, apply_change) -> None:
+        """Applies a change to a PaymentRequest and saves it.
+
+        If another writer saved the PaymentRequest after it was loaded, it is reloaded and the
+        change is reapplied, up to MAX_CONCURRENCY_CONFLICT_ATTEMPTS times. apply_change must
+        therefore be safe to call more than once.
+
+        Args:
+            payment_request (PaymentRequest): the loaded PaymentRequest
+            apply_change (Callable[[PaymentRequest], None]): applies the change to a PaymentRequest
+
+        Raises:
+            ConcurrencyConflict: if the PaymentRequest is still being modified concurrently
+        """
+        attempt = 1
+        while True:
+            apply_change(payment_request)
+            try:
+                self.payment_requests_repo.update(payment_request)
+                break
+            except ConcurrencyConflict:
+                if attempt == MAX_CONCURRENCY_CONFLICT_ATTEMPTS:
+                    self.logger.error(
+                        f"PaymentRequest modified concurrently on {attempt} attempts, giving up."
+                    )
+                    raise
+                self.logger.info("PaymentRequest was modified concurrently, reapplying change.")
+                attempt += 1
+                payment_request = self.payment_requests_repo.get_by_aggregate_root_id(
+                    payment_request.id
+                )
+
+        self._save_status(payment_request)
+
+    def _flag_duplicates(self, payment_requests: List[PaymentRequest]) -> None:
+        """Flags new PaymentRequests that likely duplicate earlier ones, before they are saved.
+
+        Duplicates are flagged for review rather than refused, so a failure to check is logged
+        rather than raised.
+
+        Args:
+            payment_requests (List[PaymentRequest]): the new PaymentRequests
+        """
+        try:
+            duplicates_of = self.duplicate_detector.find_duplicates_of(payment_requests)
+        except Exception as e:
+            self.logger.error(
+                f"Failed to check for duplicate PaymentRequests: {e.__class__.__name__}"
+            )
+            self.logger.debug(f"Exception: {e}")
+            return
+        for payment_request, duplicate_of in zip(payment_requests, duplicates_of):
+            if duplicate_of is not None:
+                self.logger.warning(
+                    f"PaymentRequest likely duplicates PaymentRequest {duplicate_of}."
+                )
+                payment_request.flag_as_possible_duplicate_of(duplicate_of)
+
+    def _save_status(self, payment_request: PaymentRequest) -> None:
+        """Saves the status of a changed PaymentRequest, for GetPaymentRequestStatus.
+
+        The PaymentRequest is already saved, so a failure is logged rather than raised.
+        PaymentRequestStatusRepository rebuilds statuses that are missing or behind.
+
+        Args:
+            payment_request (PaymentRequest): the PaymentRequest, as saved
+        """
+        try:
+            self.status_repo.save(payment_request)
+        except Exception as e:
+            self.logger.error(f"Failed to save status of PaymentRequest: {e.__class__.__name__}")
+            self.logger.debug(f"Exception: {e}")
+
+    def _save_statuses(self, payment_requests: Iterable[PaymentRequest]) -> None:
+        """Saves the statuses of newly created PaymentRequests, as by _save_status.
+
+        Args:
+            payment_requests (Iterable[PaymentRequest]): the PaymentRequests, as saved
+        """
+        try:
+            self.status_repo.save_many(payment_requests)
+        except Exception as e:
+            self.logger.error(f"Failed to save statuses of PaymentRequests: {e.__class__.__name__}")
+            self.logger.debug(f"Exception: {e}")
+
+
+def _fingerprint_of(contents: dict) -> str:
+    return hashlib.sha256(Mapper.object_to_json_string(contents).encode()).hexdigest()
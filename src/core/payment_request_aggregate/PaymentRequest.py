@@ -1,3 +1,5 @@
+import time
+
 from core.commands.SubmitPaymentRequest import SubmitPaymentRequest
 from core.payment_request_aggregate.value_objects.AcquiringBankResponse import (
     AcquiringBankResponse,
@@ -16,6 +18,18 @@ class PaymentRequest(AggregateRoot):
     Aggregate for Payment
     """
 
+    __slots__ = (
+        "merchant_id",
+        "card_number",
+        "expiry_date",
+        "cvv",
+        "amount",
+        "is_sent_to_acquiring_bank",
+        "acquiring_bank_response",
+        "created_at",
+        "possible_duplicate_of",
+    )
+
     def __init__(self, submit_payment_request: SubmitPaymentRequest):
         super().__init__()
         try:
@@ -47,10 +61,17 @@ class PaymentRequest(AggregateRoot):
 
         self.is_sent_to_acquiring_bank = False
         self.acquiring_bank_response = None
+        # Seconds since the epoch.
+        self.created_at = int(time.time())
+        # ID of an earlier PaymentRequest that this one likely duplicates.
+        self.possible_duplicate_of = None
 
         if self.domain_exceptions_raised():
             self.raise_domain_exceptions()
 
+    def flag_as_possible_duplicate_of(self, payment_request_id: str):
+        self.possible_duplicate_of = payment_request_id
+
     def mark_as_forwarded_to_acquiring_bank(self):
         self.is_sent_to_acquiring_bank = True
 
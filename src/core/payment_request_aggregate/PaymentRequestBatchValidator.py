@@ -0,0 +1,203 @@
+from decimal import Decimal, InvalidOperation
+from itertools import compress, count
+from operator import and_, attrgetter, not_, or_
+from typing import List, Optional, Sequence
+
+from core.commands.SubmitPaymentRequest import SubmitPaymentRequest
+from core.payment_request_aggregate.value_objects.CardNumber import CardNumber
+from core.payment_request_aggregate.value_objects.Currency import Currency
+from core.payment_request_aggregate.value_objects.CVV import CVV
+from core.payment_request_aggregate.value_objects.ExpiryDate import ExpiryDate
+from core.payment_request_aggregate.value_objects.MerchantId import MerchantId
+from core.payment_request_aggregate.value_objects.MonetaryAmount import MonetaryAmount
+from shared_kernel.exceptions.DomainException import DomainException
+
+# Types of amount that are compared with 0 as they are, without parsing.
+_NUMBER_TYPES = (int, float, Decimal)
+_ZERO = Decimal(0)
+# Lengths of card number that CardNumber accepts.
+_CARD_NUMBER_LENGTHS = frozenset(range(8, 20))
+
+
+class PaymentRequestBatchValidator:
+    """Validates many SubmitPaymentRequests at once, a column at a time.
+
+    Each row is validated exactly as PaymentRequest validates a SubmitPaymentRequest, by the same
+    value objects, so it fails with the same messages, in the same order. But the value objects
+    are only constructed where needed:
+
+    - Merchant IDs, expiry dates and CVVs repeat within an upload, so each distinct value is
+      validated once, and the result shared by every row holding it.
+    - Card numbers and amounts rarely repeat, so the column is checked with the rules of
+      CardNumber and MonetaryAmount, by builtins mapped over it. Only rows that fail are
+      validated by the value object, for its message.
+
+    Only the rows that fail get a DomainException, so a mostly valid upload costs little more
+    than the few passes over each column.
+
+    Usage:
+        errors = PaymentRequestBatchValidator.validate_commands(commands)
+        valid_commands = [command for command, error in zip(commands, errors) if error is None]
+    """
+
+    @staticmethod
+    def validate(
+        merchant_ids: Sequence,
+        card_numbers: Sequence,
+        expiry_dates: Sequence,
+        amounts: Sequence,
+        currencies: Sequence,
+        cvvs: Sequence,
+    ) -> List[Optional[DomainException]]:
+        """Validates columns of SubmitPaymentRequest fields, a row per payment.
+
+        Args:
+            merchant_ids (Sequence): _
+            card_numbers (Sequence): _
+            expiry_dates (Sequence): _
+            amounts (Sequence): _
+            currencies (Sequence): _
+            cvvs (Sequence): _
+
+        Raises:
+            ValueError: If the columns are not all the same length
+
+        Returns:
+            List[Optional[DomainException]]: for each row, in order, None if it is valid, else
+                the DomainException that PaymentRequest raises for it
+        """
+        columns = (merchant_ids, card_numbers, expiry_dates, amounts, currencies, cvvs)
+        row_count = len(merchant_ids)
+        if any(len(column) != row_count for column in columns):
+            raise ValueError("Every column must have the same number of rows.")
+
+        # In the order PaymentRequest validates them.
+        failures_by_column = (
+            _failures_of_str_column(merchant_ids, _message_of(MerchantId)),
+            _failures_of_card_numbers(card_numbers),
+            _failures_of_str_column(expiry_dates, _message_of(ExpiryDate)),
+            _failures_of_str_column(cvvs, _message_of(CVV)),
+            _failures_of_amounts(amounts, currencies),
+        )
+        messages_by_row = {}
+        for failures in failures_by_column:
+            for row, message in failures.items():
+                messages_by_row.setdefault(row, []).append(message)
+
+        errors = [None] * row_count
+        for row, messages in messages_by_row.items():
+            errors[row] = DomainException.from_multiple_messages(messages)
+        return errors
+
+    @staticmethod
+    def validate_commands(
+        commands: Sequence[SubmitPaymentRequest],
+    ) -> List[Optional[DomainException]]:
+        """Validates SubmitPaymentRequests, as validate does.
+
+        Args:
+            commands (Sequence[SubmitPaymentRequest]): _
+
+        Returns:
+            List[Optional[DomainException]]: for each command, in order, None if it is valid,
+                else the DomainException that PaymentRequest raises for it
+        """
+        return PaymentRequestBatchValidator.validate(
+            *(
+                list(map(attrgetter(name), commands))
+                for name in (
+                    "merchant_id",
+                    "card_number",
+                    "expiry_date",
+                    "amount",
+                    "currency",
+                    "cvv",
+                )
+            )
+        )
+
+
+def _message_of(value_object_type: type):
+    """Returns a function that gives the message a value object fails with, or None if valid."""
+
+    def message_of(*values) -> Optional[str]:
+        try:
+            value_object_type(*values)
+        except DomainException as e:
+            return str(e)
+        return None
+
+    return message_of
+
+
+def _failures_of_each_row(message_of, *columns) -> dict:
+    return {
+        row: message for row, message in enumerate(map(message_of, *columns)) if message is not None
+    }
+
+
+def _failures_of_str_column(column: Sequence, message_of) -> dict:
+    try:
+        distinct_values = dict.fromkeys(column)
+    except TypeError:
+        # A value is not hashable.
+        return _failures_of_each_row(message_of, column)
+
+    # Values of other types can be equal but fail with different messages, e.g. 1 and True.
+    if any(type(value) is not str for value in distinct_values):
+        return _failures_of_each_row(message_of, column)
+
+    failing_values = {}
+    for value in distinct_values:
+        message = message_of(value)
+        if message is not None:
+            failing_values[value] = message
+    if not failing_values:
+        return {}
+    failing_rows = compress(count(), map(failing_values.__contains__, column))
+    return {row: failing_values[column[row]] for row in failing_rows}
+
+
+def _failures_of_card_numbers(card_numbers: Sequence) -> dict:
+    message_of = _message_of(CardNumber)
+    if any(type(card_number) is not str for card_number in card_numbers):
+        return _failures_of_each_row(message_of, card_numbers)
+
+    # As CardNumber checks a card number.
+    is_valid = map(
+        and_,
+        map(str.isnumeric, card_numbers),
+        map(_CARD_NUMBER_LENGTHS.__contains__, map(len, card_numbers)),
+    )
+    return {row: message_of(card_numbers[row]) for row in compress(count(), map(not_, is_valid))}
+
+
+def _failures_of_amounts(amounts: Sequence, currencies: Sequence) -> dict:
+    message_of = _message_of(MonetaryAmount)
+    # Amounts that are not numbers, e.g. strings, are validated by MonetaryAmount.
+    if not set(map(type, amounts)).issubset(_NUMBER_TYPES):
+        return _failures_of_each_row(message_of, amounts, currencies)
+    try:
+        unsupported_currencies = {
+            currency
+            for currency in dict.fromkeys(currencies)
+            if type(currency) is not str or currency not in Currency.INSTANCES
+        }
+    except TypeError:
+        # A currency is not hashable.
+        return _failures_of_each_row(message_of, amounts, currencies)
+
+    # As MonetaryAmount checks an amount that is a number.
+    try:
+        is_invalid = list(
+            map(
+                or_,
+                map(unsupported_currencies.__contains__, currencies),
+                map(_ZERO.__ge__, amounts),
+            )
+        )
+    except InvalidOperation:
+        # An amount is NaN, which MonetaryAmount fails to compare with 0, unless its currency
+        # is unsupported.
+        return _failures_of_each_row(message_of, amounts, currencies)
+    return {row: message_of(amounts[row], currencies[row]) for row in compress(count(), is_invalid)}
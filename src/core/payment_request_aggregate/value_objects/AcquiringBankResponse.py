@@ -1,16 +1,50 @@
+from types import MappingProxyType
+
 from shared_kernel.exceptions.DomainException import DomainException
 from shared_kernel.ValueObject import ValueObject
 
 
 class AcquiringBankResponse(ValueObject):
+    """A response from the Acquiring Bank.
+
+    There is one shared instance per response message, in INSTANCES, which
+    AcquiringBankResponse(...) returns, so instances must not be changed.
+    """
+
+    __slots__ = ("value",)
+
     PROCESSING = "Processing"
     PAID = "Paid into account"
     INSUFFICIENT_CREDIT = "Payment could not be reconciled - insufficient credit"
     FRAUD_DETECTED = "Payment could not be reconciled - fraud detected"
 
     _valid_statuses = [PROCESSING, PAID, INSUFFICIENT_CREDIT, FRAUD_DETECTED]
+    # Responses after which the Acquiring Bank will not update the PaymentRequest again.
+    TERMINAL_RESPONSES = frozenset([PAID, INSUFFICIENT_CREDIT, FRAUD_DETECTED])
+    # response message -> its shared instance, filled in below.
+    INSTANCES = MappingProxyType({})
+
+    def __new__(cls, response_message: str):
+        try:
+            return AcquiringBankResponse.INSTANCES[response_message]
+        except (KeyError, TypeError):
+            raise DomainException(
+                f"Response message: {response_message} is not supported."
+            ) from None
+
+    def __getnewargs__(self):
+        return (self.value,)
+
+
+def _new_acquiring_bank_response(response_message: str) -> AcquiringBankResponse:
+    instance = object.__new__(AcquiringBankResponse)
+    instance.value = response_message
+    return instance
+
 
-    def __init__(self, response_message: str):
-        if response_message not in AcquiringBankResponse._valid_statuses:
-            raise DomainException(f"Response message: {response_message} is not supported.")
-        self.value = response_message
+AcquiringBankResponse.INSTANCES = MappingProxyType(
+    {
+        response_message: _new_acquiring_bank_response(response_message)
+        for response_message in AcquiringBankResponse._valid_statuses
+    }
+)
@@ -3,6 +3,8 @@ from shared_kernel.ValueObject import ValueObject
 
 
 class CVV(ValueObject):
+    __slots__ = ("value",)
+
     def __init__(self, cvv):
         if len(cvv) != 3:
             raise DomainException(f"CVV must be of length three, not {len(cvv)}")
@@ -8,6 +8,8 @@ class CardNumber(ValueObject):
     Checksum computation, deducing the type, etc.
     """
 
+    __slots__ = ("value",)
+
     def __init__(self, card_number: str):
         length = len(card_number)
         if not card_number.isnumeric() or length < 8 or length > 19:
@@ -17,4 +19,9 @@ class CardNumber(ValueObject):
         self.value = card_number
 
     def to_masked_card_number(self):
-        return "*" * (len(self.value) - 4) + self.value[-4:]
+        return CardNumber.mask(self.value)
+
+    @staticmethod
+    def mask(card_number: str) -> str:
+        """Masks all but the last four digits of a card number, for display."""
+        return "*" * (len(card_number) - 4) + card_number[-4:]
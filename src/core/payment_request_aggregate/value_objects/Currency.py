@@ -1,16 +1,42 @@
+from types import MappingProxyType
+
 from shared_kernel.exceptions.DomainException import DomainException
 from shared_kernel.ValueObject import ValueObject
 
 
 class Currency(ValueObject):
+    """A supported currency.
+
+    There is one shared instance per currency, in INSTANCES, which Currency(...) returns, so
+    instances must not be changed.
+    """
+
+    __slots__ = ("value",)
+
     POUNDS = "POUNDS"
     EUROS = "EUROS"
     DOLLARS = "DOLLARS"
 
     _supported_currencies = [POUNDS, EUROS, DOLLARS]
+    # currency -> its shared instance, filled in below.
+    INSTANCES = MappingProxyType({})
+
+    def __new__(cls, currency: str):
+        try:
+            return Currency.INSTANCES[currency]
+        except (KeyError, TypeError):
+            raise DomainException(f"Currency type: {currency} is not supported.") from None
+
+    def __getnewargs__(self):
+        return (self.value,)
+
+
+def _new_currency(currency: str) -> Currency:
+    instance = object.__new__(Currency)
+    instance.value = currency
+    return instance
 
-    def __init__(self, currency: str):
-        if currency not in Currency._supported_currencies:
-            raise DomainException(f"Currency type: {currency} is not supported.")
 
-        self.value = currency
+Currency.INSTANCES = MappingProxyType(
+    {currency: _new_currency(currency) for currency in Currency._supported_currencies}
+)
@@ -11,6 +11,8 @@ class ExpiryDate(ValueObject):
         ValueObject (_type_): _description_
     """
 
+    __slots__ = ("month", "year")
+
     def __init__(self, expiry_date):
         if (
             len(expiry_date) != 5
@@ -4,6 +4,8 @@ from shared_kernel.ValueObject import ValueObject
 
 
 class MerchantId(ValueObject):
+    __slots__ = ("value",)
+
     def __init__(self, merchant_id: str):
         if not is_valid_uuid(merchant_id):
             raise DomainException("Merchant ID must be a UUID-4.")
@@ -6,6 +6,8 @@ from shared_kernel.ValueObject import ValueObject
 
 
 class MonetaryAmount(ValueObject):
+    __slots__ = ("currency", "amount")
+
     def __init__(self, amount, currency):
         # Note, I am aware this initialisation will not collect all errors, should currency and amount be invalid.
         # A similar pattern as is used in the command initialisation could support this.
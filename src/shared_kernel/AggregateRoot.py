@@ -4,8 +4,14 @@ from shared_kernel.exceptions.DomainException import DomainException
 
 
 class AggregateRoot:
+    # Subclasses declare their attributes in __slots__, so instances carry no __dict__. Weak
+    # references let repositories keep what they loaded for as long as the aggregate lives.
+    __slots__ = ("id", "version", "initialisation_domain_exceptions", "__weakref__")
+
     def __init__(self):
         self.id = str(uuid.uuid4())
+        # Incremented each time the aggregate is saved, used for optimistic concurrency.
+        self.version = 0
         self.initialisation_domain_exceptions = []
 
     def add_domain_exception(self, domain_exception: DomainException):
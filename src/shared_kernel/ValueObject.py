@@ -1,2 +1,3 @@
 class ValueObject:
-    pass
+    # Subclasses declare their attributes in __slots__, so instances carry no __dict__.
+    __slots__ = ()
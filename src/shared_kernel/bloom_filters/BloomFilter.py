@@ -0,0 +1,67 @@
+import hashlib
+import math
+
+
+class BloomFilter:
+    """A fixed size set of keys that can report false positives, but never false negatives.
+
+    Sized so that, holding capacity keys, a key that was never added is reported present with
+    probability false_positive_rate. Each key sets hash_count bits, whose positions are derived
+    from two 64 bit hashes of the key (Kirsch and Mitzenmacher's double hashing), so a key is
+    hashed once however many positions it sets. Not thread safe.
+
+    Usage:
+        bloom_filter = BloomFilter(capacity=1000, false_positive_rate=0.01)
+        bloom_filter.add(b"key")
+        b"key" in bloom_filter  # True
+    """
+
+    def __init__(self, capacity: int, false_positive_rate: float):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1.")
+        if not 0 < false_positive_rate < 1:
+            raise ValueError("false_positive_rate must be between 0 and 1.")
+        self.capacity = capacity
+        self.false_positive_rate = false_positive_rate
+        self.bit_count = max(
+            8, math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2)
+        )
+        self.hash_count = max(1, round(self.bit_count / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.bit_count + 7) // 8)
+
+    def __contains__(self, key: bytes) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def add(self, key: bytes) -> bool:
+        """Adds a key.
+
+        Args:
+            key (bytes): _
+
+        Returns:
+            bool: True if the key was (or may have been) added already
+        """
+        bits = self._bits
+        was_present = True
+        for position in self._positions(key):
+            mask = 1 << (position & 7)
+            if not bits[position >> 3] & mask:
+                bits[position >> 3] |= mask
+                was_present = False
+        if not was_present:
+            self.count += 1
+        return was_present
+
+    def _positions(self, key: bytes) -> list:
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        first_hash = int.from_bytes(digest[:8], "little")
+        # Forced odd, so the step between positions is never zero.
+        second_hash = int.from_bytes(digest[8:], "little") | 1
+        return [
+            (first_hash + index * second_hash) % self.bit_count for index in range(self.hash_count)
+        ]
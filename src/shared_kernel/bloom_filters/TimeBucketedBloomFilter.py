@@ -0,0 +1,86 @@
+import math
+import threading
+import time
+
+from shared_kernel.bloom_filters.BloomFilter import BloomFilter
+
+
+class TimeBucketedBloomFilter:
+    """Remembers keys for a sliding window of time, with a Bloom filter per bucket of time.
+
+    Keys are added to the filter of the current bucket, and looked up in the filters of every
+    bucket that overlaps the window. Filters that fall out of the window are dropped, so memory
+    stays bounded and a key is forgotten between window_seconds and window_seconds plus
+    bucket_seconds after it was last added. Thread safe.
+
+    A key that was never added is reported present if any live filter reports it, so with
+    every bucket filled to capacity_per_bucket the false positive rate is a little under the
+    number of live buckets (window_seconds / bucket_seconds, plus the current bucket) times
+    false_positive_rate.
+
+    Usage:
+        recent = TimeBucketedBloomFilter(window_seconds=600, bucket_seconds=60)
+        recent.add(b"key")  # False
+        recent.add(b"key")  # True, for the next 10 to 11 minutes
+    """
+
+    def __init__(
+        self,
+        window_seconds: float,
+        bucket_seconds: float,
+        capacity_per_bucket: int = 10000,
+        false_positive_rate: float = 0.001,
+    ):
+        if bucket_seconds <= 0:
+            raise ValueError("bucket_seconds must be positive.")
+        if window_seconds < bucket_seconds:
+            raise ValueError("window_seconds must be at least bucket_seconds.")
+        self.window_seconds = window_seconds
+        self.bucket_seconds = bucket_seconds
+        self.capacity_per_bucket = capacity_per_bucket
+        self.false_positive_rate = false_positive_rate
+        # Buckets before the current one that still overlap the window.
+        self._previous_bucket_count = math.ceil(window_seconds / bucket_seconds)
+        self._lock = threading.Lock()
+        # bucket number -> BloomFilter, oldest first.
+        self._filters = {}
+
+    def __contains__(self, key: bytes) -> bool:
+        with self._lock:
+            self._drop_expired_filters(self._current_bucket())
+            return any(key in bloom_filter for bloom_filter in self._filters.values())
+
+    def add(self, key: bytes) -> bool:
+        """Adds a key to the current bucket.
+
+        Args:
+            key (bytes): _
+
+        Returns:
+            bool: True if the key was (or may have been) added within the window already
+        """
+        with self._lock:
+            current_bucket = self._current_bucket()
+            self._drop_expired_filters(current_bucket)
+            was_present = any(
+                key in bloom_filter
+                for bucket, bloom_filter in self._filters.items()
+                if bucket != current_bucket
+            )
+            current_filter = self._filters.get(current_bucket)
+            if current_filter is None:
+                current_filter = BloomFilter(self.capacity_per_bucket, self.false_positive_rate)
+                self._filters[current_bucket] = current_filter
+            return current_filter.add(key) or was_present
+
+    def clear(self) -> None:
+        with self._lock:
+            self._filters.clear()
+
+    def _current_bucket(self) -> int:
+        return int(time.monotonic() // self.bucket_seconds)
+
+    def _drop_expired_filters(self, current_bucket: int) -> None:
+        oldest_live_bucket = current_bucket - self._previous_bucket_count
+        for bucket in [bucket for bucket in self._filters if bucket < oldest_live_bucket]:
+            del self._filters[bucket]
@@ -0,0 +1,85 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+
+class LRUCache:
+    """A bounded, thread safe cache whose entries each expire after their own TTL.
+
+    When full, adding an entry evicts the least recently used one. Expired entries are
+    dropped when next read. Hits, misses and evictions are counted, so a cache's
+    effectiveness can be logged.
+
+    Usage:
+        cache = LRUCache(max_size=1000)
+        cache.put(key, value, ttl_seconds=60)
+        cache.get(key)  # value, or None once expired or evicted
+    """
+
+    def __init__(self, max_size: int):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1.")
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # key -> (value, expires_at), least recently used first.
+        self._entries = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[object]:
+        """Gets a cached value, marking it as the most recently used.
+
+        Args:
+            key (Hashable): _
+
+        Returns:
+            Optional[object]: the value, or None if it is not cached or has expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[1] <= time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: object, ttl_seconds: float) -> None:
+        """Caches a value, evicting the least recently used value if the cache is full.
+
+        Args:
+            key (Hashable): _
+            value (object): _
+            ttl_seconds (float): seconds until the value expires
+        """
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl_seconds)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Removes every entry and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -1,9 +1,11 @@
 import os
-from unittest.mock import patch
+import threading
+from unittest.mock import ANY, patch
 
 import boto3
+from botocore.config import Config
 
-from application.clients.AWSClient import AWSClient
+from application.clients.AWSClient import DEFAULT_CONFIG, AWSClient
 
 
 @patch.object(boto3, "resource")
@@ -12,12 +14,12 @@ def test_AWSClient_get_dynamodb_resource_adds_endpoint_url_when_in_localstack(
 ):
     AWSClient.get_dynamodb_resource()
     mock_boto3_resource_method.assert_called_with(
-        "dynamodb", endpoint_url=f"http://{os.environ['LOCALSTACK_HOSTNAME']}:4566"
+        "dynamodb", endpoint_url=f"http://{os.environ['LOCALSTACK_HOSTNAME']}:4566", config=ANY
     )
 
     del os.environ["LOCALSTACK_HOSTNAME"]
     AWSClient.get_dynamodb_resource()
-    mock_boto3_resource_method.assert_called_with("dynamodb")
+    mock_boto3_resource_method.assert_called_with("dynamodb", config=ANY)
 
 
 @patch.object(boto3, "resource")
@@ -26,12 +28,12 @@ def test_AWSClient_get_sqs_resource_adds_endpoint_url_when_in_localstack(
 ):
     AWSClient.get_sqs_resource()
     mock_boto3_resource_method.assert_called_with(
-        "sqs", endpoint_url=f"http://{os.environ['LOCALSTACK_HOSTNAME']}:4566"
+        "sqs", endpoint_url=f"http://{os.environ['LOCALSTACK_HOSTNAME']}:4566", config=ANY
     )
 
     del os.environ["LOCALSTACK_HOSTNAME"]
     AWSClient.get_sqs_resource()
-    mock_boto3_resource_method.assert_called_with("sqs")
+    mock_boto3_resource_method.assert_called_with("sqs", config=ANY)
 
 
 @patch.object(boto3, "client")
@@ -43,10 +45,69 @@ def test_AWSClient_get_secretsmanager_client_adds_endpoint_url_when_in_localstac
         service_name="secretsmanager",
         region_name="eu-west-2",
         endpoint_url=f"http://{os.environ['LOCALSTACK_HOSTNAME']}:4566",
+        config=ANY,
     )
 
     del os.environ["LOCALSTACK_HOSTNAME"]
     AWSClient.get_secretsmanager_client()
     mock_boto3_resource_method.assert_called_with(
-        service_name="secretsmanager", region_name="eu-west-2"
+        service_name="secretsmanager", region_name="eu-west-2", config=ANY
     )
+
+
+def test_AWSClient_returns_the_same_resources_and_clients_on_every_call():
+    assert AWSClient.get_dynamodb_resource() is AWSClient.get_dynamodb_resource()
+    assert AWSClient.get_sqs_resource() is AWSClient.get_sqs_resource()
+    assert AWSClient.get_secretsmanager_client() is AWSClient.get_secretsmanager_client()
+
+
+def test_AWSClient_returns_new_resources_when_region_changes():
+    dynamodb_resource = AWSClient.get_dynamodb_resource()
+
+    os.environ["AWS_DEFAULT_REGION"] = "eu-west-1"
+
+    assert AWSClient.get_dynamodb_resource() is not dynamodb_resource
+    assert AWSClient.get_dynamodb_resource().meta.client.meta.region_name == "eu-west-1"
+
+
+def test_AWSClient_shares_clients_between_threads_but_not_resources():
+    resources_and_clients = {}
+
+    def get_resource_and_client():
+        resources_and_clients["thread"] = (
+            AWSClient.get_dynamodb_resource(),
+            AWSClient.get_secretsmanager_client(),
+        )
+
+    thread = threading.Thread(target=get_resource_and_client)
+    thread.start()
+    thread.join()
+
+    thread_resource, thread_client = resources_and_clients["thread"]
+    assert thread_resource is not AWSClient.get_dynamodb_resource()
+    assert thread_client is AWSClient.get_secretsmanager_client()
+
+
+def test_AWSClient_clear_cache_discards_cached_resources_and_clients():
+    dynamodb_resource = AWSClient.get_dynamodb_resource()
+    secretsmanager_client = AWSClient.get_secretsmanager_client()
+
+    AWSClient.clear_cache()
+
+    assert AWSClient.get_dynamodb_resource() is not dynamodb_resource
+    assert AWSClient.get_secretsmanager_client() is not secretsmanager_client
+
+
+def test_AWSClient_uses_configured_botocore_config():
+    try:
+        AWSClient.configure(Config(max_pool_connections=50, read_timeout=10))
+
+        client_config = AWSClient.get_dynamodb_resource().meta.client.meta.config
+        assert client_config.max_pool_connections == 50
+        assert client_config.read_timeout == 10
+    finally:
+        AWSClient.configure(DEFAULT_CONFIG)
+
+    client_config = AWSClient.get_secretsmanager_client().meta.config
+    assert client_config.max_pool_connections == DEFAULT_CONFIG.max_pool_connections
+    assert client_config.retries["mode"] == "standard"
@@ -1,11 +1,17 @@
 import os
+import threading
 from unittest.mock import ANY, patch
 
 import pytest
 import requests
 from requests import Response
 
-from application.clients.AcquiringBankClient import AcquiringBankClient
+from application.clients.AcquiringBankClient import (
+    CONNECT_TIMEOUT_SECONDS,
+    READ_TIMEOUT_SECONDS,
+    AcquiringBankClient,
+)
+from application.clients.AWSClient import AWSClient
 from application.mapping.mapper import Mapper
 
 
@@ -25,7 +31,7 @@ def test_if_ACQUIRING_BANK_POST_PAYMENT_REQUEST_URL_is_not_set_client_raises_Key
         AcquiringBankClient()
 
 
-@patch.object(requests, "post")
+@patch.object(requests.Session, "post")
 def test_post_payment_request_does_not_call_over_http_when_in_localstack(
     mock_post_payment_request, payment_request, localstack_environment_variable
 ):
@@ -37,7 +43,7 @@ def test_post_payment_request_does_not_call_over_http_when_in_localstack(
     mock_post_payment_request.assert_not_called()
 
 
-@patch.object(requests, "post")
+@patch.object(requests.Session, "post")
 def test_post_payment_request_happy_path(
     mock_post, payment_request, api_key_secret_in_secretsmanager
 ):
@@ -52,14 +58,14 @@ def test_post_payment_request_happy_path(
     mock_post.assert_called_once()
     mock_post.assert_called_with(
         ANY,
-        timeout=30,
+        timeout=(CONNECT_TIMEOUT_SECONDS, READ_TIMEOUT_SECONDS),
         json=Mapper.object_to_json_string(payment_request),
         headers={"x-api-key": ANY},
     )
 
 
 @pytest.mark.parametrize("failure_code", [400, 404, 403, 500, 502])
-@patch.object(requests, "post")
+@patch.object(requests.Session, "post")
 def test_post_payment_request_non_2xx_response(
     mock_post, failure_code, payment_request, api_key_secret_in_secretsmanager
 ):
@@ -72,3 +78,106 @@ def test_post_payment_request_non_2xx_response(
     # When, then raises
     with pytest.raises(Exception):
         acquiring_bank_client.post_payment_request(payment_request)
+
+
+def test_post_payment_request_reuses_one_kept_alive_connection(
+    payment_request, api_key_secret_in_secretsmanager, stand_in_bank
+):
+    # When
+    for _ in range(20):
+        AcquiringBankClient().post_payment_request(payment_request)
+
+    # Then
+    assert stand_in_bank.request_count == 20
+    assert stand_in_bank.connection_count == 1
+
+
+def test_post_payment_request_opens_at_most_POOL_SIZE_connections_when_called_concurrently(
+    payment_request, api_key_secret_in_secretsmanager, stand_in_bank
+):
+    # Given
+    stand_in_bank.delay_seconds = 0.05
+    acquiring_bank_client = AcquiringBankClient()
+
+    def post_payment_requests():
+        for _ in range(3):
+            acquiring_bank_client.post_payment_request(payment_request)
+
+    threads = [threading.Thread(target=post_payment_requests) for _ in range(4)]
+
+    # When
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Then
+    assert stand_in_bank.request_count == 12
+    assert stand_in_bank.connection_count <= 4
+
+
+def test_post_payment_request_raises_if_bank_does_not_respond_within_read_timeout(
+    payment_request, api_key_secret_in_secretsmanager, stand_in_bank
+):
+    # Given
+    stand_in_bank.delay_seconds = 0.5
+    acquiring_bank_client = AcquiringBankClient()
+
+    # When, then raises
+    with patch("application.clients.AcquiringBankClient.READ_TIMEOUT_SECONDS", 0.1):
+        with pytest.raises(requests.exceptions.ReadTimeout):
+            acquiring_bank_client.post_payment_request(payment_request)
+
+
+def test_get_session_returns_the_same_session_until_closed():
+    session = AcquiringBankClient.get_session()
+
+    assert AcquiringBankClient.get_session() is session
+
+    AcquiringBankClient.close_session()
+
+    assert AcquiringBankClient.get_session() is not session
+
+
+def test_constructing_clients_fetches_api_key_from_secretsmanager_once(
+    api_key_secret_in_secretsmanager,
+):
+    # Given
+    client = AWSClient.get_secretsmanager_client()
+
+    # When
+    with patch.object(client, "get_secret_value", wraps=client.get_secret_value) as spy:
+        for _ in range(10):
+            AcquiringBankClient()
+
+    # Then
+    assert spy.call_count == 1
+
+
+def test_post_payment_request_retries_with_rotated_api_key_when_bank_responds_401(
+    payment_request, api_key_secret_in_secretsmanager, secretsmanager, stand_in_bank
+):
+    # Given
+    acquiring_bank_client = AcquiringBankClient()
+    secretsmanager.put_secret_value(SecretId="api_key_secret_id", SecretString="rotated")
+    stand_in_bank.accepted_api_key = "rotated"
+
+    # When
+    acquiring_bank_client.post_payment_request(payment_request)
+
+    # Then
+    assert stand_in_bank.api_keys_received == ["178s3290vds", "rotated"]
+
+
+def test_post_payment_request_does_not_retry_on_401_if_api_key_was_not_rotated(
+    payment_request, api_key_secret_in_secretsmanager, stand_in_bank
+):
+    # Given
+    acquiring_bank_client = AcquiringBankClient()
+    stand_in_bank.accepted_api_key = "some other key"
+
+    # When, then raises
+    with pytest.raises(requests.exceptions.HTTPError):
+        acquiring_bank_client.post_payment_request(payment_request)
+
+    assert stand_in_bank.api_keys_received == ["178s3290vds"]
@@ -0,0 +1,145 @@
+import json
+import uuid
+from unittest.mock import patch
+
+from botocore.exceptions import ClientError
+
+from application.clients.AWSClient import AWSClient
+from application.clients.CommandQueue import CommandQueue
+from core.commands.ForwardPaymentRequestToAcquiringBank import (
+    ForwardPaymentRequestToAcquiringBank,
+)
+
+QUEUE_NAME = "payment_requests_to_forward"
+
+
+def make_commands(number_of_commands: int) -> list:
+    return [
+        ForwardPaymentRequestToAcquiringBank(str(uuid.uuid4()), str(uuid.uuid4()))
+        for _ in range(number_of_commands)
+    ]
+
+
+def receive_all_payment_request_ids(queue) -> list:
+    payment_request_ids = []
+    while True:
+        messages = queue.receive_messages(MaxNumberOfMessages=10)
+        if not messages:
+            return payment_request_ids
+        for message in messages:
+            payment_request_ids.append(json.loads(message.body)["payment_request_id"])
+            message.delete()
+
+
+def test_send_publishes_command_as_json(payment_requests_to_forward_queue):
+    # Given
+    command = make_commands(1)[0]
+
+    # When
+    CommandQueue(QUEUE_NAME).send(command)
+
+    # Then
+    assert receive_all_payment_request_ids(payment_requests_to_forward_queue) == [
+        command.payment_request_id
+    ]
+
+
+def test_queue_url_is_resolved_once_per_container(payment_requests_to_forward_queue):
+    # Given
+    sqs_client = AWSClient.get_sqs_resource().meta.client
+
+    # When
+    with patch.object(sqs_client, "get_queue_url", wraps=sqs_client.get_queue_url) as spy:
+        for command in make_commands(5):
+            CommandQueue(QUEUE_NAME).send(command)
+
+    # Then
+    assert spy.call_count == 1
+    assert len(receive_all_payment_request_ids(payment_requests_to_forward_queue)) == 5
+
+
+def test_send_many_publishes_commands_in_batches_of_10(payment_requests_to_forward_queue):
+    # Given
+    commands = make_commands(25)
+    sqs_client = AWSClient.get_sqs_resource().meta.client
+
+    # When
+    with patch.object(sqs_client, "send_message_batch", wraps=sqs_client.send_message_batch) as spy:
+        failures = CommandQueue(QUEUE_NAME).send_many(commands)
+
+    # Then
+    assert failures == {}
+    assert [len(call.kwargs["Entries"]) for call in spy.mock_calls] == [10, 10, 5]
+    assert sorted(receive_all_payment_request_ids(payment_requests_to_forward_queue)) == sorted(
+        command.payment_request_id for command in commands
+    )
+
+
+@patch("application.repositories.batching.time.sleep")
+def test_send_many_retries_only_entries_that_failed_because_of_sqs(
+    mock_sleep, payment_requests_to_forward_queue
+):
+    # Given
+    commands = make_commands(3)
+    sqs_client = AWSClient.get_sqs_resource().meta.client
+    send_message_batch = sqs_client.send_message_batch
+    calls = []
+
+    def fail_first_two_entries_once(**kwargs):
+        calls.append([entry["Id"] for entry in kwargs["Entries"]])
+        if len(calls) > 1:
+            return send_message_batch(**kwargs)
+        response = send_message_batch(**{**kwargs, "Entries": kwargs["Entries"][2:]})
+        response["Failed"] = [
+            {"Id": "0", "SenderFault": False, "Code": "InternalError"},
+            {"Id": "1", "SenderFault": True, "Code": "InvalidMessageContents"},
+        ]
+        return response
+
+    # When
+    with patch.object(sqs_client, "send_message_batch", side_effect=fail_first_two_entries_once):
+        failures = CommandQueue(QUEUE_NAME).send_many(commands)
+
+    # Then
+    assert calls == [["0", "1", "2"], ["0"]]
+    assert failures == {1: "InvalidMessageContents"}
+    assert sorted(receive_all_payment_request_ids(payment_requests_to_forward_queue)) == sorted(
+        [commands[0].payment_request_id, commands[2].payment_request_id]
+    )
+
+
+@patch("application.repositories.batching.time.sleep")
+def test_send_many_gives_up_on_entries_after_max_attempts(
+    mock_sleep, payment_requests_to_forward_queue
+):
+    # Given
+    sqs_client = AWSClient.get_sqs_resource().meta.client
+    always_failing_response = {
+        "Successful": [],
+        "Failed": [{"Id": "0", "SenderFault": False, "Code": "InternalError"}],
+    }
+
+    # When
+    with patch.object(sqs_client, "send_message_batch", return_value=always_failing_response):
+        failures = CommandQueue(QUEUE_NAME).send_many(make_commands(1))
+
+    # Then
+    assert failures == {0: "Unprocessed after 5 attempts."}
+    assert mock_sleep.call_count == 4
+
+
+def test_send_many_reports_every_entry_of_a_batch_that_raised(
+    payment_requests_to_forward_queue,
+):
+    # Given
+    sqs_client = AWSClient.get_sqs_resource().meta.client
+    error = ClientError({"Error": {"Code": "AccessDenied"}}, "SendMessageBatch")
+
+    # When
+    with patch.object(
+        sqs_client, "send_message_batch", side_effect=[{"Successful": [], "Failed": []}, error]
+    ):
+        failures = CommandQueue(QUEUE_NAME).send_many(make_commands(12))
+
+    # Then
+    assert failures == {10: "AccessDenied", 11: "AccessDenied"}
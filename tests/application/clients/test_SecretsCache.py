@@ -0,0 +1,72 @@
+from unittest.mock import patch
+
+import pytest
+from botocore.exceptions import ClientError
+
+from application.clients.AWSClient import AWSClient
+from application.clients.SecretsCache import SecretsCache
+
+SECRET_NAME = "api_key_secret_id"
+
+
+@pytest.fixture
+def get_secret_value_spy(api_key_secret_in_secretsmanager):
+    client = AWSClient.get_secretsmanager_client()
+    with patch.object(client, "get_secret_value", wraps=client.get_secret_value) as spy:
+        yield spy
+
+
+def test_get_fetches_secret_once_while_cached_value_is_fresh(get_secret_value_spy):
+    # When
+    values = [SecretsCache.get(SECRET_NAME) for _ in range(10)]
+
+    # Then
+    assert values == ["178s3290vds"] * 10
+    assert get_secret_value_spy.call_count == 1
+
+
+def test_get_fetches_secret_again_once_ttl_has_expired(get_secret_value_spy):
+    # Given
+    SecretsCache.get(SECRET_NAME)
+
+    # When
+    with patch("application.clients.SecretsCache.TTL_SECONDS", 0):
+        SecretsCache.get(SECRET_NAME)
+
+    # Then
+    assert get_secret_value_spy.call_count == 2
+
+
+def test_get_with_force_refresh_fetches_rotated_secret(get_secret_value_spy, secretsmanager):
+    # Given
+    SecretsCache.get(SECRET_NAME)
+    secretsmanager.put_secret_value(SecretId=SECRET_NAME, SecretString="rotated")
+
+    # When
+    cached_value = SecretsCache.get(SECRET_NAME)
+    refreshed_value = SecretsCache.get(SECRET_NAME, force_refresh=True)
+
+    # Then
+    assert cached_value == "178s3290vds"
+    assert refreshed_value == "rotated"
+    assert get_secret_value_spy.call_count == 2
+
+
+def test_get_serves_stale_value_if_refresh_fails(get_secret_value_spy):
+    # Given
+    SecretsCache.get(SECRET_NAME)
+    get_secret_value_spy.side_effect = ClientError(
+        {"Error": {"Code": "InternalServiceError"}}, "GetSecretValue"
+    )
+
+    # When
+    with patch("application.clients.SecretsCache.TTL_SECONDS", 0):
+        value = SecretsCache.get(SECRET_NAME)
+
+    # Then
+    assert value == "178s3290vds"
+
+
+def test_get_raises_if_secret_cannot_be_fetched_and_nothing_is_cached(secretsmanager):
+    with pytest.raises(ClientError):
+        SecretsCache.get(SECRET_NAME)
@@ -10,27 +10,71 @@ from application.lambdas.ForwardPaymentRequestToAcquiringBank.lambda_function im
 from application.services.PaymentRequestService import PaymentRequestService
 
 
+def make_sqs_record(body: dict) -> dict:
+    return {"messageId": str(uuid.uuid4()), "body": json.dumps(body)}
+
+
+def make_forward_command_body() -> dict:
+    return {"payment_request_id": str(uuid.uuid4()), "merchant_id": str(uuid.uuid4())}
+
+
 @patch.object(PaymentRequestService, "forward_payment_request_to_acquiring_bank")
 def test_lambda_parses_event_and_calls_forward_payment_request_to_acquiring_bank_service_method(
     mock_forward_to_bank_service_method, make_lambda_context_object
 ):
-    payment_request_id = str(uuid.uuid4())
-    merchant_id = str(uuid.uuid4())
-    sqs_lambda_event = {
-        "Records": [
-            {
-                "body": json.dumps(
-                    {"payment_request_id": payment_request_id, "merchant_id": merchant_id}
-                )
-            }
-        ]
-    }
+    sqs_lambda_event = {"Records": [make_sqs_record(make_forward_command_body())]}
 
-    lambda_handler(
+    response = lambda_handler(
         sqs_lambda_event, make_lambda_context_object("ForwardPaymentRequestToAcquiringBank")
     )
 
     mock_forward_to_bank_service_method.assert_called_once()
+    assert response == {"batchItemFailures": []}
+
+
+@patch.object(PaymentRequestService, "forward_payment_request_to_acquiring_bank")
+def test_lambda_forwards_every_message_in_the_batch(
+    mock_forward_to_bank_service_method, make_lambda_context_object
+):
+    # Given
+    bodies = [make_forward_command_body() for _ in range(10)]
+    sqs_lambda_event = {"Records": [make_sqs_record(body) for body in bodies]}
+
+    # When
+    response = lambda_handler(
+        sqs_lambda_event, make_lambda_context_object("ForwardPaymentRequestToAcquiringBank")
+    )
+
+    # Then
+    forwarded_ids = [
+        call.args[0].payment_request_id for call in mock_forward_to_bank_service_method.mock_calls
+    ]
+    assert sorted(forwarded_ids) == sorted(body["payment_request_id"] for body in bodies)
+    assert response == {"batchItemFailures": []}
+
+
+@patch.object(PaymentRequestService, "forward_payment_request_to_acquiring_bank")
+def test_lambda_reports_only_the_messages_that_failed(
+    mock_forward_to_bank_service_method, make_lambda_context_object
+):
+    # Given
+    bodies = [make_forward_command_body() for _ in range(3)]
+    records = [make_sqs_record(body) for body in bodies]
+
+    def fail_for_second_payment_request(command):
+        if command.payment_request_id == bodies[1]["payment_request_id"]:
+            raise Exception("Bank unavailable")
+
+    mock_forward_to_bank_service_method.side_effect = fail_for_second_payment_request
+
+    # When
+    response = lambda_handler(
+        {"Records": records}, make_lambda_context_object("ForwardPaymentRequestToAcquiringBank")
+    )
+
+    # Then
+    assert mock_forward_to_bank_service_method.call_count == 3
+    assert response == {"batchItemFailures": [{"itemIdentifier": records[1]["messageId"]}]}
 
 
 @pytest.mark.parametrize(
@@ -42,12 +86,32 @@ def test_lambda_parses_event_and_calls_forward_payment_request_to_acquiring_bank
         {"hello": "world"},
     ],
 )
-def test_lambda_does_not_handle_key_error_so_message_would_be_DLQd(
-    body_with_missing_key, make_lambda_context_object
+@patch.object(PaymentRequestService, "forward_payment_request_to_acquiring_bank")
+def test_lambda_reports_messages_with_missing_keys_as_failures_so_they_would_be_DLQd(
+    mock_forward_to_bank_service_method, body_with_missing_key, make_lambda_context_object
 ):
-    unprocessable_sqs_lambda_event = {"Records": [{"body": json.dumps(body_with_missing_key)}]}
-    with pytest.raises(KeyError):
-        lambda_handler(
-            unprocessable_sqs_lambda_event,
-            make_lambda_context_object("ForwardPaymentRequestToAcquiringBank"),
-        )
+    # Given
+    unprocessable_record = make_sqs_record(body_with_missing_key)
+    processable_record = make_sqs_record(make_forward_command_body())
+
+    # When
+    response = lambda_handler(
+        {"Records": [unprocessable_record, processable_record]},
+        make_lambda_context_object("ForwardPaymentRequestToAcquiringBank"),
+    )
+
+    # Then
+    mock_forward_to_bank_service_method.assert_called_once()
+    assert response == {
+        "batchItemFailures": [{"itemIdentifier": unprocessable_record["messageId"]}]
+    }
+
+
+def test_lambda_reports_malformed_json_as_a_failure(make_lambda_context_object):
+    record = {"messageId": str(uuid.uuid4()), "body": "not json"}
+
+    response = lambda_handler(
+        {"Records": [record]}, make_lambda_context_object("ForwardPaymentRequestToAcquiringBank")
+    )
+
+    assert response == {"batchItemFailures": [{"itemIdentifier": record["messageId"]}]}
@@ -1,9 +1,17 @@
+import time
 import uuid
+from unittest.mock import patch
 
 import pytest
 
-from application.lambdas.GetPaymentRequestStatus.lambda_function import lambda_handler
+from application.lambdas.GetPaymentRequestStatus.lambda_function import (
+    lambda_handler,
+    status_cache,
+)
 from application.repositories.PaymentRequestsRepository import PaymentRequestsRepository
+from application.repositories.PaymentRequestStatusRepository import (
+    PaymentRequestStatusRepository,
+)
 from core.commands.SubmitPaymentRequest import SubmitPaymentRequest
 from core.payment_request_aggregate.PaymentRequest import PaymentRequest
 from core.payment_request_aggregate.value_objects.AcquiringBankResponse import (
@@ -11,10 +19,31 @@ from core.payment_request_aggregate.value_objects.AcquiringBankResponse import (
 )
 
 
+@pytest.fixture(autouse=True, scope="function")
+def clear_status_cache():
+    status_cache.clear()
+    yield
+    status_cache.clear()
+
+
+def save_payment_request(response: str = None) -> PaymentRequest:
+    payment_request = PaymentRequest(
+        SubmitPaymentRequest(
+            str(uuid.uuid4()), "1234123412341234", "01-24", "15.75", "POUNDS", "321"
+        )
+    )
+    if response is not None:
+        payment_request.mark_as_forwarded_to_acquiring_bank()
+        payment_request.process_acquiring_bank_response(AcquiringBankResponse(response))
+    PaymentRequestsRepository().upsert(payment_request)
+    return payment_request
+
+
 def test_GetPaymentRequestStatus_returns_200_if_PaymentRequest_is_not_sent_to_acquiring_bank(
     make_lambda_context_object,
     make_api_gateway_event_get_payment_request_status,
     payment_requests_table,
+    payment_request_statuses_table,
 ):
     # Given
     merchant_id = str(uuid.uuid4())
@@ -59,6 +88,7 @@ def test_GetPaymentRequestStatus_returns_200_if_PaymentRequest_is_sent_to_acquir
     make_lambda_context_object,
     make_api_gateway_event_get_payment_request_status,
     payment_requests_table,
+    payment_request_statuses_table,
     payment_request: PaymentRequest,
 ):
     # Given
@@ -86,6 +116,7 @@ def test_GetPaymentRequestStatus_returns_200_if_PaymentRequest_is_sent_to_acquir
     make_lambda_context_object,
     make_api_gateway_event_get_payment_request_status,
     payment_requests_table,
+    payment_request_statuses_table,
     payment_request,
     valid_response_from_bank,
 ):
@@ -114,6 +145,7 @@ def test_GetPaymentRequestStatus_returns_404_if_PaymentRequest_not_found(
     make_lambda_context_object,
     make_api_gateway_event_get_payment_request_status,
     payment_requests_table,
+    payment_request_statuses_table,
     payment_request,
 ):
     get_payment_request_status_event = make_api_gateway_event_get_payment_request_status(
@@ -133,6 +165,7 @@ def test_GetPaymentRequestStatus_returns_404_if_PaymentRequest_belongs_to_a_diff
     make_lambda_context_object,
     make_api_gateway_event_get_payment_request_status,
     payment_requests_table,
+    payment_request_statuses_table,
     payment_request,
 ):
     # Given
@@ -162,6 +195,7 @@ def test_GetPaymentRequestStatus_returns_500_if_API_gateway_event_has_incorrect_
     make_lambda_context_object,
     make_api_gateway_event_get_payment_request_status,
     payment_requests_table,
+    payment_request_statuses_table,
     payment_request,
 ):
     # Given
@@ -194,6 +228,7 @@ def test_GetPaymentRequestStatus_returns_400_if_invalid_IDs_provided(
     make_lambda_context_object,
     make_api_gateway_event_get_payment_request_status,
     payment_requests_table,
+    payment_request_statuses_table,
     payment_request,
     payment_request_id,
     merchant_id,
@@ -214,3 +249,212 @@ def test_GetPaymentRequestStatus_returns_400_if_invalid_IDs_provided(
     # Then
     assert response["statusCode"] == 400
     assert "is not valid uuid", "are not valid uuids" in response["body"]
+
+
+@pytest.mark.parametrize("response_from_bank", AcquiringBankResponse.TERMINAL_RESPONSES)
+def test_GetPaymentRequestStatus_serves_terminal_status_from_cache(
+    make_lambda_context_object,
+    make_api_gateway_event_get_payment_request_status,
+    payment_requests_table,
+    payment_request_statuses_table,
+    response_from_bank,
+):
+    # Given
+    payment_request = save_payment_request(response_from_bank)
+    event = make_api_gateway_event_get_payment_request_status(
+        {"payment_request_id": payment_request.id, "merchant_id": payment_request.merchant_id.value}
+    )
+    context = make_lambda_context_object("GetPaymentRequestStatus")
+    first_response = lambda_handler(event, context)
+
+    # When
+    with patch.object(PaymentRequestStatusRepository, "get_status") as get_status:
+        response = lambda_handler(event, context)
+
+    # Then
+    get_status.assert_not_called()
+    assert response == first_response
+    assert response["body"]["status"] == response_from_bank
+    assert status_cache.hits == 1
+
+
+def test_GetPaymentRequestStatus_refetches_non_terminal_status_once_cached_status_expires(
+    make_lambda_context_object,
+    make_api_gateway_event_get_payment_request_status,
+    payment_requests_table,
+    payment_request_statuses_table,
+):
+    # Given
+    payment_request = save_payment_request()
+    event = make_api_gateway_event_get_payment_request_status(
+        {"payment_request_id": payment_request.id, "merchant_id": payment_request.merchant_id.value}
+    )
+    context = make_lambda_context_object("GetPaymentRequestStatus")
+    now = time.monotonic()
+    with patch("shared_kernel.caching.LRUCache.time.monotonic", return_value=now):
+        lambda_handler(event, context)
+
+    payment_request.mark_as_forwarded_to_acquiring_bank()
+    PaymentRequestsRepository().update(payment_request)
+    PaymentRequestStatusRepository().save(payment_request)
+
+    # When
+    with patch("shared_kernel.caching.LRUCache.time.monotonic", return_value=now + 1):
+        cached_response = lambda_handler(event, context)
+    with patch("shared_kernel.caching.LRUCache.time.monotonic", return_value=now + 60):
+        response = lambda_handler(event, context)
+
+    # Then
+    assert cached_response["body"]["status"] == "Processing - In Payment Gateway"
+    assert response["body"]["status"] == "Processing - Awaiting response from acquiring bank"
+
+
+def test_GetPaymentRequestStatus_does_not_serve_cached_status_to_a_different_merchant(
+    make_lambda_context_object,
+    make_api_gateway_event_get_payment_request_status,
+    payment_requests_table,
+    payment_request_statuses_table,
+):
+    # Given
+    payment_request = save_payment_request(AcquiringBankResponse.PAID)
+    context = make_lambda_context_object("GetPaymentRequestStatus")
+    owner_response = lambda_handler(
+        make_api_gateway_event_get_payment_request_status(
+            {
+                "payment_request_id": payment_request.id,
+                "merchant_id": payment_request.merchant_id.value,
+            }
+        ),
+        context,
+    )
+
+    # When
+    response = lambda_handler(
+        make_api_gateway_event_get_payment_request_status(
+            {"payment_request_id": payment_request.id, "merchant_id": str(uuid.uuid4())}
+        ),
+        context,
+    )
+
+    # Then
+    assert owner_response["statusCode"] == 200
+    assert response == {"statusCode": 404, "body": "Not Found"}
+    assert len(status_cache) == 1
+
+
+def make_event_with_headers(make_event, payment_request: PaymentRequest, headers: dict) -> dict:
+    event = make_event(
+        {"payment_request_id": payment_request.id, "merchant_id": payment_request.merchant_id.value}
+    )
+    event["headers"] = headers
+    return event
+
+
+def test_GetPaymentRequestStatus_returns_version_of_PaymentRequest_as_ETag(
+    make_lambda_context_object,
+    make_api_gateway_event_get_payment_request_status,
+    payment_requests_table,
+    payment_request_statuses_table,
+):
+    # Given
+    payment_request = save_payment_request()
+    event = make_event_with_headers(
+        make_api_gateway_event_get_payment_request_status, payment_request, {}
+    )
+
+    # When
+    response = lambda_handler(event, make_lambda_context_object("GetPaymentRequestStatus"))
+
+    # Then
+    assert response["statusCode"] == 200
+    assert response["headers"] == {"ETag": '"1"'}
+
+
+@pytest.mark.parametrize(
+    "header_name, if_none_match",
+    [
+        ("If-None-Match", '"1"'),
+        ("if-none-match", '"1"'),
+        ("If-None-Match", 'W/"1"'),
+        ("If-None-Match", '"0", "1"'),
+        ("If-None-Match", "*"),
+    ],
+)
+@pytest.mark.parametrize("is_cached", [False, True])
+def test_GetPaymentRequestStatus_returns_304_without_body_if_ETag_matches(
+    make_lambda_context_object,
+    make_api_gateway_event_get_payment_request_status,
+    payment_requests_table,
+    payment_request_statuses_table,
+    header_name,
+    if_none_match,
+    is_cached,
+):
+    # Given
+    payment_request = save_payment_request()
+    context = make_lambda_context_object("GetPaymentRequestStatus")
+    if is_cached:
+        lambda_handler(
+            make_event_with_headers(
+                make_api_gateway_event_get_payment_request_status, payment_request, {}
+            ),
+            context,
+        )
+    event = make_event_with_headers(
+        make_api_gateway_event_get_payment_request_status,
+        payment_request,
+        {header_name: if_none_match},
+    )
+
+    # When
+    response = lambda_handler(event, context)
+
+    # Then
+    assert response == {"statusCode": 304, "headers": {"ETag": '"1"'}}
+    assert status_cache.hits == (1 if is_cached else 0)
+
+
+def test_GetPaymentRequestStatus_returns_200_with_new_ETag_once_PaymentRequest_changes(
+    make_lambda_context_object,
+    make_api_gateway_event_get_payment_request_status,
+    payment_requests_table,
+    payment_request_statuses_table,
+):
+    # Given
+    payment_request = save_payment_request()
+    payment_request.mark_as_forwarded_to_acquiring_bank()
+    PaymentRequestsRepository().update(payment_request)
+    PaymentRequestStatusRepository().save(payment_request)
+    event = make_event_with_headers(
+        make_api_gateway_event_get_payment_request_status,
+        payment_request,
+        {"If-None-Match": '"1"'},
+    )
+
+    # When
+    response = lambda_handler(event, make_lambda_context_object("GetPaymentRequestStatus"))
+
+    # Then
+    assert response["statusCode"] == 200
+    assert response["headers"] == {"ETag": '"2"'}
+    assert response["body"]["status"] == "Processing - Awaiting response from acquiring bank"
+
+
+def test_GetPaymentRequestStatus_returns_404_to_a_different_merchant_even_if_ETag_matches(
+    make_lambda_context_object,
+    make_api_gateway_event_get_payment_request_status,
+    payment_requests_table,
+    payment_request_statuses_table,
+):
+    # Given
+    payment_request = save_payment_request()
+    event = make_api_gateway_event_get_payment_request_status(
+        {"payment_request_id": payment_request.id, "merchant_id": str(uuid.uuid4())}
+    )
+    event["headers"] = {"If-None-Match": "*"}
+
+    # When
+    response = lambda_handler(event, make_lambda_context_object("GetPaymentRequestStatus"))
+
+    # Then
+    assert response == {"statusCode": 404, "body": "Not Found"}
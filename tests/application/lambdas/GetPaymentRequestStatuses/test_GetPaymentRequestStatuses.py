@@ -0,0 +1,185 @@
+import json
+import uuid
+from unittest.mock import patch
+
+import pytest
+
+from application.lambdas.GetPaymentRequestStatuses.lambda_function import lambda_handler
+from application.repositories.exceptions.UnprocessedKeys import UnprocessedKeys
+from application.repositories.PaymentRequestsRepository import PaymentRequestsRepository
+from core.commands.SubmitPaymentRequest import SubmitPaymentRequest
+from core.payment_request_aggregate.PaymentRequest import PaymentRequest
+from core.payment_request_aggregate.value_objects.AcquiringBankResponse import (
+    AcquiringBankResponse,
+)
+
+
+def make_event(merchant_id: str, payment_request_ids) -> dict:
+    return {
+        "pathParameters": {"merchant_id": merchant_id},
+        "body": json.dumps({"payment_request_ids": payment_request_ids}),
+    }
+
+
+def save_payment_request(merchant_id: str) -> PaymentRequest:
+    payment_request = PaymentRequest(
+        SubmitPaymentRequest(merchant_id, "12345671234567", "08-32", "1192.34", "POUNDS", "999")
+    )
+    PaymentRequestsRepository().upsert(payment_request)
+    return payment_request
+
+
+def test_GetPaymentRequestStatuses_returns_status_of_each_PaymentRequest(
+    make_lambda_context_object, payment_requests_table
+):
+    # Given
+    merchant_id = str(uuid.uuid4())
+    in_gateway = save_payment_request(merchant_id)
+    paid = save_payment_request(merchant_id)
+    paid.mark_as_forwarded_to_acquiring_bank()
+    paid.process_acquiring_bank_response(AcquiringBankResponse(AcquiringBankResponse.PAID))
+    PaymentRequestsRepository().upsert(paid)
+
+    # When
+    response = lambda_handler(
+        make_event(merchant_id, [in_gateway.id, paid.id]),
+        make_lambda_context_object("GetPaymentRequestStatuses"),
+    )
+
+    # Then
+    assert response["statusCode"] == 200
+    assert response["body"][in_gateway.id]["status"] == "Processing - In Payment Gateway"
+    assert response["body"][paid.id]["status"] == AcquiringBankResponse.PAID
+    assert response["body"][paid.id]["payment_details"]["card_number"] == "**********4567"
+
+
+def test_GetPaymentRequestStatuses_returns_errors_for_unknown_foreign_and_invalid_ids(
+    make_lambda_context_object, payment_requests_table
+):
+    # Given
+    merchant_id = str(uuid.uuid4())
+    own = save_payment_request(merchant_id)
+    foreign = save_payment_request(str(uuid.uuid4()))
+    unknown_id = str(uuid.uuid4())
+
+    # When
+    response = lambda_handler(
+        make_event(merchant_id, [own.id, foreign.id, unknown_id, "not_an_id"]),
+        make_lambda_context_object("GetPaymentRequestStatuses"),
+    )
+
+    # Then
+    assert response["statusCode"] == 200
+    assert response["body"][own.id]["status"] == "Processing - In Payment Gateway"
+    assert response["body"][foreign.id] == {"error": "Not Found"}
+    assert response["body"][unknown_id] == {"error": "Not Found"}
+    assert response["body"]["not_an_id"] == {"error": "payment_request_id is not a valid uuid"}
+
+
+def test_GetPaymentRequestStatuses_fetches_PaymentRequests_with_one_batch_get(
+    make_lambda_context_object, payment_requests_table
+):
+    # Given
+    merchant_id = str(uuid.uuid4())
+    payment_request_ids = [save_payment_request(merchant_id).id for _ in range(50)]
+    dynamodb_resource = PaymentRequestsRepository().dynamodb_resource
+
+    # When
+    with patch.object(
+        dynamodb_resource, "batch_get_item", wraps=dynamodb_resource.batch_get_item
+    ) as batch_get_item_spy:
+        response = lambda_handler(
+            make_event(merchant_id, payment_request_ids),
+            make_lambda_context_object("GetPaymentRequestStatuses"),
+        )
+
+    # Then
+    assert batch_get_item_spy.call_count == 1
+    assert set(response["body"]) == set(payment_request_ids)
+
+
+def test_GetPaymentRequestStatuses_fetches_each_requested_id_once(
+    make_lambda_context_object, payment_requests_table
+):
+    # Given
+    merchant_id = str(uuid.uuid4())
+    payment_request = save_payment_request(merchant_id)
+    unknown_id = str(uuid.uuid4())
+
+    # When
+    with patch.object(
+        PaymentRequestsRepository,
+        "get_many_by_aggregate_root_ids",
+        autospec=True,
+        side_effect=PaymentRequestsRepository.get_many_by_aggregate_root_ids,
+    ) as get_many_spy:
+        response = lambda_handler(
+            make_event(merchant_id, [payment_request.id, unknown_id, payment_request.id]),
+            make_lambda_context_object("GetPaymentRequestStatuses"),
+        )
+
+    # Then
+    assert get_many_spy.call_args.args[1] == [payment_request.id, unknown_id]
+    assert response["body"][payment_request.id]["status"] == "Processing - In Payment Gateway"
+    assert response["body"][unknown_id] == {"error": "Not Found"}
+
+
+@patch.object(PaymentRequestsRepository, "get_many_by_aggregate_root_ids")
+def test_GetPaymentRequestStatuses_reports_ids_that_could_not_be_fetched_as_unavailable(
+    mock_get_many, make_lambda_context_object
+):
+    # Given
+    payment_request_id = str(uuid.uuid4())
+    mock_get_many.side_effect = UnprocessedKeys([payment_request_id])
+
+    # When
+    response = lambda_handler(
+        make_event(str(uuid.uuid4()), [payment_request_id]),
+        make_lambda_context_object("GetPaymentRequestStatuses"),
+    )
+
+    # Then
+    assert response["body"][payment_request_id] == {
+        "error": "Status could not be retrieved, please retry."
+    }
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        "not json",
+        json.dumps({"ids": []}),
+        json.dumps({"payment_request_ids": "not a list"}),
+        json.dumps(["not an object"]),
+    ],
+)
+def test_GetPaymentRequestStatuses_returns_400_if_body_is_invalid(body, make_lambda_context_object):
+    event = {"pathParameters": {"merchant_id": str(uuid.uuid4())}, "body": body}
+
+    response = lambda_handler(event, make_lambda_context_object("GetPaymentRequestStatuses"))
+
+    assert response["statusCode"] == 400
+
+
+def test_GetPaymentRequestStatuses_returns_400_if_merchant_id_is_invalid(
+    make_lambda_context_object,
+):
+    response = lambda_handler(
+        make_event("not_an_id", [str(uuid.uuid4())]),
+        make_lambda_context_object("GetPaymentRequestStatuses"),
+    )
+
+    assert response["statusCode"] == 400
+    assert response["body"] == "merchant_id is not a valid uuid"
+
+
+@patch("application.lambdas.GetPaymentRequestStatuses.lambda_function.MAX_IDS_PER_REQUEST", 2)
+def test_GetPaymentRequestStatuses_returns_400_if_too_many_ids_are_requested(
+    make_lambda_context_object,
+):
+    response = lambda_handler(
+        make_event(str(uuid.uuid4()), [str(uuid.uuid4()) for _ in range(3)]),
+        make_lambda_context_object("GetPaymentRequestStatuses"),
+    )
+
+    assert response["statusCode"] == 400
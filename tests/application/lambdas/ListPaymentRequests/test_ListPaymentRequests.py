@@ -0,0 +1,131 @@
+import base64
+import json
+import uuid
+
+import pytest
+
+from application.lambdas.ListPaymentRequests.lambda_function import lambda_handler
+from application.repositories.PaymentRequestsRepository import PaymentRequestsRepository
+from core.commands.SubmitPaymentRequest import SubmitPaymentRequest
+from core.payment_request_aggregate.PaymentRequest import PaymentRequest
+
+
+def make_event(merchant_id: str, query: dict = None) -> dict:
+    return {"pathParameters": {"merchant_id": merchant_id}, "queryStringParameters": query}
+
+
+def save_payment_requests(merchant_id: str, created_ats: list) -> list:
+    payment_requests = []
+    for created_at in created_ats:
+        payment_request = PaymentRequest(
+            SubmitPaymentRequest(merchant_id, "12345671234567", "08-32", "1192.34", "POUNDS", "999")
+        )
+        payment_request.created_at = created_at
+        payment_requests.append(payment_request)
+    PaymentRequestsRepository().upsert_many(payment_requests)
+    return payment_requests
+
+
+def test_ListPaymentRequests_returns_every_PaymentRequest_of_merchant_across_pages(
+    make_lambda_context_object, payment_requests_table
+):
+    # Given
+    merchant_id = str(uuid.uuid4())
+    payment_requests = save_payment_requests(merchant_id, [1, 2, 3, 4, 5])
+    save_payment_requests(str(uuid.uuid4()), [3])
+    context = make_lambda_context_object("ListPaymentRequests")
+
+    # When
+    listed_ids = []
+    query = {"limit": "2"}
+    pages = 0
+    while True:
+        response = lambda_handler(make_event(merchant_id, query), context)
+        assert response["statusCode"] == 200
+        pages += 1
+        listed_ids += [
+            entry["payment_details"]["id"] for entry in response["body"]["payment_requests"]
+        ]
+        if response["body"]["next_cursor"] is None:
+            break
+        query = {"limit": "2", "cursor": response["body"]["next_cursor"]}
+
+    # Then
+    assert listed_ids == [payment_request.id for payment_request in payment_requests]
+    assert pages == 3
+
+
+def test_ListPaymentRequests_returns_status_DTO_of_each_PaymentRequest_created_in_range(
+    make_lambda_context_object, payment_requests_table
+):
+    # Given
+    merchant_id = str(uuid.uuid4())
+    payment_requests = save_payment_requests(merchant_id, [100, 200, 300])
+
+    # When
+    response = lambda_handler(
+        make_event(merchant_id, {"since": "150", "until": "250"}),
+        make_lambda_context_object("ListPaymentRequests"),
+    )
+
+    # Then
+    assert response["statusCode"] == 200
+    assert response["body"]["next_cursor"] is None
+    [entry] = response["body"]["payment_requests"]
+    assert entry["payment_details"]["id"] == payment_requests[1].id
+    assert entry["payment_details"]["card_number"] == "**********4567"
+    assert entry["status"] == "Processing - In Payment Gateway"
+
+
+@pytest.mark.parametrize(
+    "query, message",
+    [
+        ({"since": "yesterday"}, "since must be an integer."),
+        ({"until": "1.5"}, "until must be an integer."),
+        ({"limit": "0"}, "limit must be between 1 and 100."),
+        ({"limit": "101"}, "limit must be between 1 and 100."),
+        ({"since": "1700000001", "until": "1700000000"}, "since must not be after until."),
+        ({"cursor": "not a cursor"}, "cursor is not valid."),
+    ],
+)
+def test_ListPaymentRequests_returns_400_for_invalid_query_parameters(
+    make_lambda_context_object, payment_requests_table, query, message
+):
+    response = lambda_handler(
+        make_event(str(uuid.uuid4()), query), make_lambda_context_object("ListPaymentRequests")
+    )
+
+    assert response == {"statusCode": 400, "body": message}
+
+
+def test_ListPaymentRequests_returns_400_for_cursor_of_another_merchant(
+    make_lambda_context_object, payment_requests_table
+):
+    # Given
+    other_merchant_id = str(uuid.uuid4())
+    save_payment_requests(other_merchant_id, [1, 2])
+    context = make_lambda_context_object("ListPaymentRequests")
+    other_merchants_cursor = lambda_handler(make_event(other_merchant_id, {"limit": "1"}), context)[
+        "body"
+    ]["next_cursor"]
+
+    # When
+    response = lambda_handler(
+        make_event(str(uuid.uuid4()), {"cursor": other_merchants_cursor}), context
+    )
+
+    # Then
+    assert json.loads(base64.urlsafe_b64decode(other_merchants_cursor))["merchant_key"] == (
+        other_merchant_id
+    )
+    assert response == {"statusCode": 400, "body": "cursor is not valid."}
+
+
+def test_ListPaymentRequests_returns_400_if_merchant_id_is_not_valid_uuid(
+    make_lambda_context_object, payment_requests_table
+):
+    response = lambda_handler(
+        make_event("not_an_id"), make_lambda_context_object("ListPaymentRequests")
+    )
+
+    assert response == {"statusCode": 400, "body": "merchant_id is not a valid uuid"}
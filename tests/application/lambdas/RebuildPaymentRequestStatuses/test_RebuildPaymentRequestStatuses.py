@@ -0,0 +1,126 @@
+import uuid
+from unittest.mock import patch
+
+from boto3.dynamodb.types import TypeSerializer
+
+from application.lambdas.RebuildPaymentRequestStatuses.lambda_function import (
+    lambda_handler,
+)
+from application.repositories.PaymentRequestsRepository import PaymentRequestsRepository
+from application.repositories.PaymentRequestStatusRepository import (
+    PaymentRequestStatusRepository,
+)
+from core.commands.SubmitPaymentRequest import SubmitPaymentRequest
+from core.payment_request_aggregate.PaymentRequest import PaymentRequest
+
+
+def make_payment_request() -> PaymentRequest:
+    return PaymentRequest(
+        SubmitPaymentRequest(
+            str(uuid.uuid4()), "1234123412341234", "01-24", "15.75", "POUNDS", "321"
+        )
+    )
+
+
+def make_stream_record(event_name: str, sequence_number: str, item: dict) -> dict:
+    serializer = TypeSerializer()
+    image = {name: serializer.serialize(value) for name, value in item.items()}
+    record = {
+        "eventName": event_name,
+        "dynamodb": {"Keys": {"id": image["id"]}, "SequenceNumber": sequence_number},
+    }
+    if event_name != "REMOVE":
+        record["dynamodb"]["NewImage"] = image
+    return record
+
+
+@patch.object(PaymentRequestStatusRepository, "rebuild_all", return_value=2)
+def test_lambda_rebuilds_statuses(mock_rebuild_all, make_lambda_context_object):
+    response = lambda_handler({}, make_lambda_context_object("RebuildPaymentRequestStatuses"))
+
+    mock_rebuild_all.assert_called_once()
+    assert response == {"rebuilt": 2}
+
+
+def test_lambda_rebuilds_status_of_each_PaymentRequest_in_the_stream(
+    make_lambda_context_object, payment_requests_table, payment_request_statuses_table
+):
+    # Given
+    payment_requests_repo = PaymentRequestsRepository()
+    stale = make_payment_request()
+    payment_requests_repo.upsert(stale)
+    PaymentRequestStatusRepository().save(stale)
+    stale.mark_as_forwarded_to_acquiring_bank()
+    payment_requests_repo.update(stale)
+    missing = make_payment_request()
+    payment_requests_repo.upsert(missing)
+    records = [
+        make_stream_record(
+            event_name, sequence_number, payment_requests_table.get_item(Key=key)["Item"]
+        )
+        for event_name, sequence_number, key in (
+            ("MODIFY", "1", {"id": stale.id}),
+            ("INSERT", "2", {"id": missing.id}),
+        )
+    ]
+
+    # When
+    with patch.object(PaymentRequestStatusRepository, "rebuild_all") as rebuild_all_spy:
+        response = lambda_handler(
+            {"Records": records}, make_lambda_context_object("RebuildPaymentRequestStatuses")
+        )
+
+    # Then
+    assert response == {"batchItemFailures": []}
+    rebuild_all_spy.assert_not_called()
+    saved = payment_request_statuses_table.get_item(Key={"id": stale.id})["Item"]
+    assert saved["version"] == 2
+    assert saved["status"] == "Processing - Awaiting response from acquiring bank"
+    assert payment_request_statuses_table.get_item(Key={"id": missing.id})["Item"]["version"] == 1
+
+
+def test_lambda_reports_records_whose_status_could_not_be_rebuilt(
+    make_lambda_context_object, payment_requests_table, payment_request_statuses_table
+):
+    # Given
+    payment_requests = [make_payment_request() for _ in range(3)]
+    for payment_request in payment_requests:
+        PaymentRequestsRepository().upsert(payment_request)
+    records = [
+        make_stream_record(
+            "INSERT",
+            str(number),
+            payment_requests_table.get_item(Key={"id": payment_request.id})["Item"],
+        )
+        for number, payment_request in enumerate(payment_requests)
+    ]
+
+    # When
+    with patch.object(
+        PaymentRequestStatusRepository,
+        "rebuild_from_item",
+        side_effect=[None, Exception("Failed to save status"), None],
+    ):
+        response = lambda_handler(
+            {"Records": records}, make_lambda_context_object("RebuildPaymentRequestStatuses")
+        )
+
+    # Then
+    assert response == {"batchItemFailures": [{"itemIdentifier": "1"}]}
+
+
+@patch.object(PaymentRequestStatusRepository, "rebuild_from_item")
+def test_lambda_ignores_records_of_deleted_PaymentRequests(
+    mock_rebuild_from_item, make_lambda_context_object
+):
+    # Given
+    record = make_stream_record("REMOVE", "1", {"id": str(uuid.uuid4())})
+
+    # When
+    response = lambda_handler(
+        {"Records": [record]}, make_lambda_context_object("RebuildPaymentRequestStatuses")
+    )
+
+    # Then
+    mock_rebuild_from_item.assert_not_called()
+    assert response == {"batchItemFailures": []}
@@ -0,0 +1,48 @@
+from unittest.mock import patch
+
+from application.lambdas.RelayOutbox.lambda_function import lambda_handler
+from application.services.OutboxRelayService import OutboxRelayService
+
+
+def make_stream_record(event_name: str, entry_id: str) -> dict:
+    return {"eventName": event_name, "dynamodb": {"Keys": {"id": {"S": entry_id}}}}
+
+
+@patch.object(OutboxRelayService, "relay_entries", return_value=2)
+@patch.object(OutboxRelayService, "relay_outbox")
+def test_lambda_relays_only_entries_inserted_when_triggered_by_stream(
+    mock_relay_outbox, mock_relay_entries, make_lambda_context_object
+):
+    # Given
+    event = {
+        "Records": [
+            make_stream_record("INSERT", "first"),
+            make_stream_record("REMOVE", "deleted"),
+            make_stream_record("INSERT", "second"),
+        ]
+    }
+
+    # When
+    response = lambda_handler(event, make_lambda_context_object("RelayOutbox"))
+
+    # Then
+    mock_relay_entries.assert_called_once_with(["first", "second"])
+    mock_relay_outbox.assert_not_called()
+    assert response == {"relayed": 2}
+
+
+@patch.object(OutboxRelayService, "relay_entries")
+@patch.object(OutboxRelayService, "relay_outbox", return_value=3)
+def test_lambda_sweeps_the_outbox_when_triggered_by_schedule(
+    mock_relay_outbox, mock_relay_entries, make_lambda_context_object
+):
+    # Given an EventBridge scheduled event
+    event = {"source": "aws.events", "detail-type": "Scheduled Event", "detail": {}}
+
+    # When
+    response = lambda_handler(event, make_lambda_context_object("RelayOutbox"))
+
+    # Then
+    mock_relay_outbox.assert_called_once()
+    mock_relay_entries.assert_not_called()
+    assert response == {"relayed": 3}
@@ -1,12 +1,14 @@
 import uuid
 
 from application.lambdas.SubmitPaymentRequest.lambda_function import lambda_handler
+from application.services.OutboxRelayService import OutboxRelayService
 
 
-def test_SubmitPaymentRequest_creates_item_in_database_and_publishes_message_to_queue(
+def test_SubmitPaymentRequest_creates_item_in_database_and_publishes_message_to_queue_via_outbox(
     make_api_gateway_event_post_payment,
     make_lambda_context_object,
     payment_requests_table,
+    payment_requests_outbox_table,
     payment_requests_to_forward_queue,
 ):
     # Given
@@ -26,5 +28,69 @@ def test_SubmitPaymentRequest_creates_item_in_database_and_publishes_message_to_
     )["Item"]
     assert payment_request_item["merchant_id"]["value"] == merchant_id
 
+    assert payment_requests_to_forward_queue.receive_messages() == []
+    assert payment_requests_outbox_table.scan()["Count"] == 1
+
+    # When
+    OutboxRelayService().relay_outbox()
+
+    # Then
     messages_on_queue = payment_requests_to_forward_queue.receive_messages()
     assert len(messages_on_queue) == 1
+    assert payment_requests_outbox_table.scan()["Count"] == 0
+
+
+def test_SubmitPaymentRequest_returns_the_same_id_when_retried_with_an_Idempotency_Key(
+    make_api_gateway_event_post_payment,
+    make_lambda_context_object,
+    payment_requests_table,
+    payment_requests_outbox_table,
+    idempotency_keys_table,
+):
+    # Given
+    event = make_api_gateway_event_post_payment(path_parameters={"merchant_id": str(uuid.uuid4())})
+    event["headers"] = {"idempotency-key": "order-1234"}
+    context = make_lambda_context_object("SubmitPaymentRequest")
+
+    # When
+    first_response = lambda_handler(event, context)
+    retried_response = lambda_handler(event, context)
+
+    # Then
+    assert first_response["statusCode"] == 201
+    assert retried_response == first_response
+    assert payment_requests_table.scan()["Count"] == 1
+
+
+def test_SubmitPaymentRequest_returns_422_if_Idempotency_Key_is_reused_for_a_different_request(
+    make_api_gateway_event_post_payment,
+    make_lambda_context_object,
+    payment_requests_table,
+    payment_requests_outbox_table,
+    idempotency_keys_table,
+):
+    # Given
+    path_parameters = {"merchant_id": str(uuid.uuid4())}
+    event = make_api_gateway_event_post_payment(path_parameters=path_parameters)
+    event["headers"] = {"Idempotency-Key": "order-1234"}
+    context = make_lambda_context_object("SubmitPaymentRequest")
+    lambda_handler(event, context)
+
+    different_event = make_api_gateway_event_post_payment(
+        payload={
+            "card_number": "123456123456",
+            "cvv": "374",
+            "expiry_date": "12-26",
+            "amount": 10.00,
+            "currency": "POUNDS",
+        },
+        path_parameters=path_parameters,
+    )
+    different_event["headers"] = {"Idempotency-Key": "order-1234"}
+
+    # When
+    response = lambda_handler(different_event, context)
+
+    # Then
+    assert response["statusCode"] == 422
+    assert payment_requests_table.scan()["Count"] == 1
@@ -4,6 +4,7 @@ from unittest.mock import patch
 import pytest
 
 from application.lambdas.SubmitPaymentRequest.lambda_function import lambda_handler
+from application.repositories.exceptions.IdempotencyKeyInUse import IdempotencyKeyInUse
 from application.services.PaymentRequestService import PaymentRequestService
 from core.commands.SubmitPaymentRequest import SubmitPaymentRequest
 from shared_kernel.exceptions.DomainException import DomainException
@@ -66,6 +67,29 @@ def test_SubmitPaymentRequest_returns_400_if_required_fields_missing(
     assert response["body"] == f"Missing required field: '{required_field}'"
 
 
+@patch.object(PaymentRequestService, "submit_payment_request")
+def test_SubmitPaymentRequest_returns_400_if_fields_are_not_strings(
+    mock_service_submit_payment_request,
+    make_api_gateway_event_post_payment,
+    make_lambda_context_object,
+):
+    payload = {
+        "card_number": 123456123456,
+        "cvv": 374,
+        "expiry_date": "12-26",
+        "amount": 99.99,
+        "currency": "POUNDS",
+    }
+    event = make_api_gateway_event_post_payment(payload=payload)
+    context = make_lambda_context_object("SubmitPaymentRequest")
+
+    response = lambda_handler(event, context)
+
+    assert response["statusCode"] == 400
+    assert response["body"] == ["card_number must be a string.", "cvv must be a string."]
+    mock_service_submit_payment_request.assert_not_called()
+
+
 @patch.object(PaymentRequestService, "submit_payment_request")
 @patch.object(SubmitPaymentRequest, "__init__")
 def test_SubmitPaymentRequest_returns_201_and_new_payment_request_id_if_successful(
@@ -89,3 +113,42 @@ def test_SubmitPaymentRequest_returns_201_and_new_payment_request_id_if_successf
     assert response["body"] == new_payment_request_id
     mock_service_submit_payment_request.assert_called_once()
     mock_command_init.assert_called_once()
+
+
+@patch.object(PaymentRequestService, "submit_payment_request")
+def test_SubmitPaymentRequest_returns_409_if_Idempotency_Key_is_in_use(
+    mock_service_submit_payment_request,
+    make_api_gateway_event_post_payment,
+    make_lambda_context_object,
+):
+    # Given
+    mock_service_submit_payment_request.side_effect = IdempotencyKeyInUse()
+    event = make_api_gateway_event_post_payment()
+    event["headers"] = {"Idempotency-Key": "order-1234"}
+
+    # When
+    response = lambda_handler(event, make_lambda_context_object("SubmitPaymentRequest"))
+
+    # Then
+    assert response["statusCode"] == 409
+    assert mock_service_submit_payment_request.call_args.args[1] == "order-1234"
+
+
+@pytest.mark.parametrize("idempotency_key", ["", "k" * 256])
+@patch.object(PaymentRequestService, "submit_payment_request")
+def test_SubmitPaymentRequest_returns_400_if_Idempotency_Key_is_not_valid(
+    mock_service_submit_payment_request,
+    idempotency_key,
+    make_api_gateway_event_post_payment,
+    make_lambda_context_object,
+):
+    # Given
+    event = make_api_gateway_event_post_payment()
+    event["headers"] = {"Idempotency-Key": idempotency_key}
+
+    # When
+    response = lambda_handler(event, make_lambda_context_object("SubmitPaymentRequest"))
+
+    # Then
+    assert response["statusCode"] == 400
+    mock_service_submit_payment_request.assert_not_called()
@@ -0,0 +1,176 @@
+import json
+import uuid
+from unittest.mock import patch
+
+from application.lambdas.SubmitPaymentRequests.lambda_function import lambda_handler
+from application.repositories.exceptions.NotSaved import NotSaved
+from application.services.OutboxRelayService import OutboxRelayService
+from application.services.PaymentRequestService import PaymentRequestService
+from shared_kernel.exceptions.DomainException import DomainException
+
+VALID_PAYMENT = {
+    "card_number": "123456123456",
+    "cvv": "374",
+    "expiry_date": "12-26",
+    "amount": 99.99,
+    "currency": "POUNDS",
+}
+
+
+def make_event(payments, merchant_id: str = None) -> dict:
+    return {
+        "pathParameters": {"merchant_id": merchant_id or str(uuid.uuid4())},
+        "body": json.dumps(payments),
+    }
+
+
+def test_SubmitPaymentRequests_creates_items_and_outbox_entries_for_valid_payments(
+    make_lambda_context_object,
+    payment_requests_table,
+    payment_requests_outbox_table,
+    payment_requests_to_forward_queue,
+):
+    # Given
+    merchant_id = str(uuid.uuid4())
+    invalid_payment = {**VALID_PAYMENT, "cvv": "37"}
+    payments = [VALID_PAYMENT] * 20 + [invalid_payment] + [VALID_PAYMENT] * 9
+    context = make_lambda_context_object("SubmitPaymentRequests")
+
+    # When
+    response = lambda_handler(make_event(payments, merchant_id), context)
+
+    # Then
+    assert response["statusCode"] == 207
+    results = response["body"]
+    assert len(results) == 30
+    assert results[20] == {"errors": ["CVV must be of length three, not 2"]}
+
+    payment_request_ids = [results[i]["payment_request_id"] for i in range(30) if i != 20]
+    for payment_request_id in payment_request_ids:
+        item = payment_requests_table.get_item(Key={"id": payment_request_id})["Item"]
+        assert item["merchant_id"]["value"] == merchant_id
+    assert payment_requests_outbox_table.scan()["Count"] == 29
+
+    # When
+    OutboxRelayService().relay_outbox()
+
+    # Then
+    messages_on_queue = []
+    while messages := payment_requests_to_forward_queue.receive_messages(MaxNumberOfMessages=10):
+        messages_on_queue.extend(messages)
+        for message in messages:
+            message.delete()
+    assert len(messages_on_queue) == 29
+
+
+def test_SubmitPaymentRequests_creates_valid_payments_of_batch_with_fields_of_invalid_types(
+    make_lambda_context_object, payment_requests_table, payment_requests_outbox_table
+):
+    # Given
+    payments = [
+        VALID_PAYMENT,
+        {**VALID_PAYMENT, "card_number": 123456123456},
+        {**VALID_PAYMENT, "expiry_date": None, "cvv": ["374"]},
+        VALID_PAYMENT,
+    ]
+
+    # When
+    response = lambda_handler(
+        make_event(payments), make_lambda_context_object("SubmitPaymentRequests")
+    )
+
+    # Then
+    assert response["statusCode"] == 207
+    results = response["body"]
+    assert results[1] == {"errors": ["card_number must be a string."]}
+    assert results[2] == {"errors": ["expiry_date must be a string.", "cvv must be a string."]}
+    for result in (results[0], results[3]):
+        item = payment_requests_table.get_item(Key={"id": result["payment_request_id"]})["Item"]
+        assert item["card_number"]["value"] == VALID_PAYMENT["card_number"]
+
+
+@patch.object(PaymentRequestService, "submit_payment_requests")
+def test_SubmitPaymentRequests_returns_201_if_every_payment_was_created(
+    mock_submit_payment_requests, make_lambda_context_object
+):
+    # Given
+    payment_request_ids = [str(uuid.uuid4()), str(uuid.uuid4())]
+    mock_submit_payment_requests.return_value = payment_request_ids
+
+    # When
+    response = lambda_handler(
+        make_event([VALID_PAYMENT, VALID_PAYMENT]),
+        make_lambda_context_object("SubmitPaymentRequests"),
+    )
+
+    # Then
+    assert response["statusCode"] == 201
+    assert response["body"] == [
+        {"payment_request_id": payment_request_id} for payment_request_id in payment_request_ids
+    ]
+
+
+@patch.object(PaymentRequestService, "submit_payment_requests")
+def test_SubmitPaymentRequests_returns_errors_for_each_payment_in_the_order_given(
+    mock_submit_payment_requests, make_lambda_context_object
+):
+    # Given
+    payment_request_id = str(uuid.uuid4())
+    mock_submit_payment_requests.return_value = [
+        DomainException.from_multiple_messages(["Invalid card number.", "Invalid CVV."]),
+        payment_request_id,
+        NotSaved("TransactionCanceledException"),
+    ]
+    payment_without_cvv = {key: value for key, value in VALID_PAYMENT.items() if key != "cvv"}
+    payments = [VALID_PAYMENT, payment_without_cvv, "not a payment", VALID_PAYMENT, VALID_PAYMENT]
+
+    # When
+    response = lambda_handler(
+        make_event(payments), make_lambda_context_object("SubmitPaymentRequests")
+    )
+
+    # Then
+    assert len(mock_submit_payment_requests.call_args.args[0]) == 3
+    assert response["statusCode"] == 207
+    assert response["body"] == [
+        {"errors": ["Invalid card number.", "Invalid CVV."]},
+        {"errors": ["Missing required field: 'cvv'"]},
+        {"errors": ["Payment must be a JSON object."]},
+        {"payment_request_id": payment_request_id},
+        {"errors": ["Payment could not be saved, please retry."]},
+    ]
+
+
+@patch.object(PaymentRequestService, "submit_payment_requests")
+def test_SubmitPaymentRequests_returns_400_if_body_is_not_an_array(
+    mock_submit_payment_requests, make_lambda_context_object
+):
+    response = lambda_handler(
+        make_event(VALID_PAYMENT), make_lambda_context_object("SubmitPaymentRequests")
+    )
+
+    assert response["statusCode"] == 400
+    mock_submit_payment_requests.assert_not_called()
+
+
+@patch("application.lambdas.SubmitPaymentRequests.lambda_function.MAX_PAYMENTS_PER_REQUEST", 2)
+@patch.object(PaymentRequestService, "submit_payment_requests")
+def test_SubmitPaymentRequests_returns_400_if_too_many_payments_are_submitted(
+    mock_submit_payment_requests, make_lambda_context_object
+):
+    response = lambda_handler(
+        make_event([VALID_PAYMENT] * 3), make_lambda_context_object("SubmitPaymentRequests")
+    )
+
+    assert response["statusCode"] == 400
+    assert response["body"] == "At most 2 payments can be submitted per request."
+    mock_submit_payment_requests.assert_not_called()
+
+
+def test_SubmitPaymentRequests_returns_500_if_event_is_invalid(make_lambda_context_object):
+    event = make_event([VALID_PAYMENT])
+    del event["pathParameters"]
+
+    response = lambda_handler(event, make_lambda_context_object("SubmitPaymentRequests"))
+
+    assert response["statusCode"] == 500
@@ -23,5 +23,18 @@ class Book:
         self.chapters = chapters
 
 
+class Page:
+    __slots__ = ("number", "author")
+
+    def __init__(self, number, author: Author = None):
+        self.number = number
+        if author is not None:
+            self.author = author
+
+
+class AnnotatedPage(Page):
+    """Inherits Page's slots, but declares none of its own, so also has a __dict__."""
+
+
 def map_object_to_dict(obj):
     return json.loads(json.dumps(obj, default=lambda o: getattr(o, "__dict__", str(o))))
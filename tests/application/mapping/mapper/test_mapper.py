@@ -1,8 +1,19 @@
+import uuid
+from decimal import Decimal
+
 import pytest
 
 from application.mapping.mapper import Mapper
 
-from .fixtures import Author, Book, Chapter, Publisher, map_object_to_dict
+from .fixtures import (
+    AnnotatedPage,
+    Author,
+    Book,
+    Chapter,
+    Page,
+    Publisher,
+    map_object_to_dict,
+)
 
 
 @pytest.fixture(scope="function")
@@ -78,3 +89,178 @@ def test_value_error_raised_if_list_expected_but_non_list_received(not_a_list, b
 def test_from_json_raises_TypeError_if_not_provided_with_dict(not_a_dict):
     with pytest.raises(TypeError):
         Mapper().from_json(not_a_dict)
+
+
+def test_compiled_mapper_converts_book_json_into_same_book_as_uncompiled_mapper(book_json):
+    def make_book_mapper():
+        return Mapper.for_type(Book).with_attribute_mappings(
+            author=Mapper.for_type(Author),
+            publisher=Mapper.for_type(Publisher),
+            chapters=Mapper.for_list_of(Chapter),
+        )
+
+    mapped_book = make_book_mapper().from_json(book_json)
+    compiled_mapped_book = make_book_mapper().compile().from_json(book_json)
+
+    assert type(compiled_mapped_book) == Book
+    assert type(compiled_mapped_book.author) == Author
+    assert type(compiled_mapped_book.publisher) == Publisher
+    assert type(compiled_mapped_book.chapters) == list
+    assert type(compiled_mapped_book.chapters[0]) == Chapter
+    assert map_object_to_dict(compiled_mapped_book) == map_object_to_dict(mapped_book)
+
+
+def test_compiled_mapper_calls_target_type_for_non_dict_values_and_keeps_none_values(book_json):
+    book_mapper = (
+        Mapper.for_type(Book)
+        .with_attribute_mappings(
+            author=Mapper.for_type(Author), publisher=Mapper.for_type(Publisher)
+        )
+        .compile()
+    )
+    book_json["author"] = "Alice"
+    book_json["publisher"] = None
+
+    mapped_book = book_mapper.from_json(book_json)
+
+    assert type(mapped_book.author) == Author
+    assert mapped_book.author.name == "Alice"
+    assert mapped_book.publisher is None
+
+
+@pytest.mark.parametrize("not_a_list", [1, "abc", {"key": "value"}])
+def test_compiled_mapper_raises_value_error_if_list_expected_but_non_list_received(
+    not_a_list, book_json
+):
+    book_mapper = (
+        Mapper.for_type(Book)
+        .with_attribute_mappings(chapters=Mapper.for_list_of(Chapter))
+        .compile()
+    )
+    book_json["chapters"] = not_a_list
+    with pytest.raises(ValueError) as e:
+        _ = book_mapper.from_json(book_json)
+
+    assert "The mapper was configured to process a list, but" in str(e.value)
+
+
+@pytest.mark.parametrize("not_a_dict", [1, "abc", ("hi", "bye")])
+def test_compiled_mapper_from_json_raises_TypeError_if_not_provided_with_dict(not_a_dict):
+    with pytest.raises(TypeError):
+        Mapper.for_type(Book).compile().from_json(not_a_dict)
+
+
+def test_object_to_dict_matches_json_representation_of_object(book):
+    assert Mapper.object_to_dict(book) == map_object_to_dict(book)
+
+
+def test_object_to_dict_keeps_decimals_as_numbers():
+    author = Author(Decimal("15.75"))
+
+    assert Mapper.object_to_dict(author) == {"name": Decimal("15.75")}
+
+
+def test_object_to_dict_stores_decimals_too_precise_for_dynamodb_as_strings():
+    too_precise = Decimal(12.94)
+    author = Author(too_precise)
+
+    assert Mapper.object_to_dict(author) == {"name": str(too_precise)}
+    assert Decimal(Mapper.object_to_dict(author)["name"]) == too_precise
+
+
+def test_object_to_dict_converts_floats_to_decimals():
+    assert Mapper.object_to_dict(Chapter(1.5)) == {"number": Decimal("1.5")}
+
+
+def test_object_to_dict_maps_nested_objects_lists_and_none():
+    book = Book(Author("Bob"), None, [Chapter(1), Chapter(2)])
+
+    assert Mapper.object_to_dict(book) == {
+        "author": {"name": "Bob"},
+        "publisher": None,
+        "chapters": [{"number": 1}, {"number": 2}],
+    }
+
+
+@pytest.mark.parametrize("compile", [False, True])
+def test_mapper_sets_slots_and_drops_keys_slotted_type_cannot_hold(compile):
+    page_mapper = Mapper.for_type(Page).with_attribute_mappings(author=Mapper.for_type(Author))
+    if compile:
+        page_mapper.compile()
+
+    page = page_mapper.from_json({"number": 7, "author": {"name": "Bob"}, "legacy": True})
+
+    assert type(page) == Page
+    assert page.number == 7
+    assert type(page.author) == Author
+    assert page.author.name == "Bob"
+    assert not hasattr(page, "legacy")
+
+
+@pytest.mark.parametrize("compile", [False, True])
+def test_mapper_keeps_keys_that_are_not_slots_if_type_also_has_a_dict(compile):
+    page_mapper = Mapper.for_type(AnnotatedPage).with_attribute_mappings(
+        author=Mapper.for_type(Author)
+    )
+    if compile:
+        page_mapper.compile()
+
+    page = page_mapper.from_json({"number": 7, "note": "dog-eared"})
+
+    assert page.number == 7
+    assert page.note == "dog-eared"
+    assert page.__dict__ == {"note": "dog-eared"}
+
+
+def test_object_to_dict_maps_slots_and_skips_slots_that_are_not_set():
+    assert Mapper.object_to_dict(Page(7)) == {"number": 7}
+    assert Mapper.object_to_dict(Page(7, Author("Bob"))) == {
+        "number": 7,
+        "author": {"name": "Bob"},
+    }
+
+
+def test_object_to_dict_maps_slots_and_dict_of_type_with_both():
+    page = AnnotatedPage(7)
+    page.note = "dog-eared"
+
+    assert Mapper.object_to_dict(page) == {"number": 7, "note": "dog-eared"}
+
+
+def test_object_to_json_string_maps_slots():
+    assert Mapper.object_to_json_string(Page(7, Author("Bob"))) == (
+        '{"number": 7, "author": {"name": "Bob"}}'
+    )
+
+
+def test_slotted_types_that_define_their_own_state_are_serialized_with_str():
+    value = uuid.UUID("0b20e14d-0122-4b60-824a-fcc4c2a3b52a")
+
+    assert Mapper.object_to_dict(Author(value)) == {"name": str(value)}
+    assert Mapper.object_to_json_string(Author(value)) == f'{{"name": "{value}"}}'
+
+
+@pytest.mark.parametrize("compile", [False, True])
+def test_mapper_maps_json_naming_an_interned_instance_to_that_instance(compile):
+    # Given
+    oxford = Publisher("Oxford University Press")
+    book_mapper = Mapper.for_type(Book).with_attribute_mappings(
+        publisher=Mapper.for_type(Publisher).with_interned_instances(
+            {oxford.company_name: oxford}, key="company_name"
+        )
+    )
+    if compile:
+        book_mapper.compile()
+
+    # When
+    interned = book_mapper.from_json({"publisher": {"company_name": "Oxford University Press"}})
+    not_interned = book_mapper.from_json({"publisher": {"company_name": "Penguin"}})
+    with_other_keys = book_mapper.from_json(
+        {"publisher": {"company_name": "Oxford University Press", "city": "Oxford"}}
+    )
+
+    # Then
+    assert interned.publisher is oxford
+    assert not_interned.publisher.company_name == "Penguin"
+    assert with_other_keys.publisher is not oxford
+    assert with_other_keys.publisher.city == "Oxford"
@@ -0,0 +1,131 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+
+from application.repositories.exceptions.IdempotencyKeyInUse import IdempotencyKeyInUse
+from application.repositories.exceptions.IdempotencyKeyReused import (
+    IdempotencyKeyReused,
+)
+from application.repositories.IdempotencyKeysRepository import IdempotencyKeysRepository
+
+
+def test_begin_takes_a_new_key(idempotency_keys_table):
+    # When
+    result = IdempotencyKeysRepository().begin("key", "fingerprint")
+
+    # Then
+    assert result is None
+    item = idempotency_keys_table.get_item(Key={"key": "key"})["Item"]
+    assert item["status"] == "IN_PROGRESS"
+    assert item["fingerprint"] == "fingerprint"
+
+
+def test_begin_raises_IdempotencyKeyInUse_while_key_is_held(idempotency_keys_table):
+    # Given
+    repository = IdempotencyKeysRepository()
+    repository.begin("key", "fingerprint")
+
+    # When / Then
+    with pytest.raises(IdempotencyKeyInUse):
+        repository.begin("key", "fingerprint")
+
+
+def test_begin_returns_result_once_key_is_completed(idempotency_keys_table):
+    # Given
+    repository = IdempotencyKeysRepository()
+    repository.begin("key", "fingerprint")
+    repository.complete("key", "fingerprint", {"payment_request_id": "id"})
+    IdempotencyKeysRepository.clear_cache()
+
+    # When
+    result = IdempotencyKeysRepository().begin("key", "fingerprint")
+
+    # Then
+    assert result == {"payment_request_id": "id"}
+
+
+def test_begin_returns_cached_result_without_reading_dynamodb(idempotency_keys_table):
+    # Given
+    repository = IdempotencyKeysRepository()
+    repository.begin("key", "fingerprint")
+    repository.complete("key", "fingerprint", {"payment_request_id": "id"})
+
+    # When
+    with patch.object(repository.table, "put_item") as mock_put_item, patch.object(
+        repository.table, "get_item"
+    ) as mock_get_item:
+        result = repository.begin("key", "fingerprint")
+
+    # Then
+    assert result == {"payment_request_id": "id"}
+    mock_put_item.assert_not_called()
+    mock_get_item.assert_not_called()
+
+
+@pytest.mark.parametrize("complete", [False, True])
+def test_begin_raises_IdempotencyKeyReused_if_fingerprint_differs(idempotency_keys_table, complete):
+    # Given
+    repository = IdempotencyKeysRepository()
+    repository.begin("key", "fingerprint")
+    if complete:
+        repository.complete("key", "fingerprint", {})
+
+    # When / Then
+    with pytest.raises(IdempotencyKeyReused):
+        repository.begin("key", "another fingerprint")
+
+
+def test_released_key_can_be_taken_again(idempotency_keys_table):
+    # Given
+    repository = IdempotencyKeysRepository()
+    repository.begin("key", "fingerprint")
+
+    # When
+    repository.release("key")
+
+    # Then
+    assert repository.begin("key", "fingerprint") is None
+
+
+def test_key_can_be_taken_again_once_its_lease_expires(idempotency_keys_table):
+    # Given
+    repository = IdempotencyKeysRepository()
+    with patch("application.repositories.IdempotencyKeysRepository.LEASE_SECONDS", -1):
+        repository.begin("key", "fingerprint")
+
+    # When
+    result = repository.begin("key", "fingerprint")
+
+    # Then
+    assert result is None
+
+
+def test_release_does_not_remove_a_completed_key(idempotency_keys_table):
+    # Given
+    repository = IdempotencyKeysRepository()
+    repository.begin("key", "fingerprint")
+    repository.complete("key", "fingerprint", {})
+
+    # When
+    repository.release("key")
+
+    # Then
+    assert idempotency_keys_table.get_item(Key={"key": "key"})["Item"]["status"] == "COMPLETED"
+
+
+def test_only_one_of_many_concurrent_begins_takes_a_key(idempotency_keys_table):
+    # Given
+    def begin(_):
+        try:
+            return IdempotencyKeysRepository().begin("key", "fingerprint")
+        except IdempotencyKeyInUse as e:
+            return e
+
+    # When
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        outcomes = list(executor.map(begin, range(8)))
+
+    # Then
+    assert outcomes.count(None) == 1
+    assert sum(isinstance(outcome, IdempotencyKeyInUse) for outcome in outcomes) == 7
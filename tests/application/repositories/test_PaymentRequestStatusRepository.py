@@ -0,0 +1,262 @@
+import os
+import uuid
+from unittest.mock import patch
+
+import pytest
+
+from application.dtos.GetPaymentRequestStatusDTO import GetPaymentRequestStatusDTO
+from application.repositories.exceptions.NotFound import NotFound
+from application.repositories.PaymentRequestsRepository import PaymentRequestsRepository
+from application.repositories.PaymentRequestStatusRepository import (
+    PaymentRequestStatusRepository,
+)
+from core.commands.SubmitPaymentRequest import SubmitPaymentRequest
+from core.payment_request_aggregate.PaymentRequest import PaymentRequest
+from core.payment_request_aggregate.value_objects.AcquiringBankResponse import (
+    AcquiringBankResponse,
+)
+
+
+def make_payment_request(amount="15.75") -> PaymentRequest:
+    return PaymentRequest(
+        SubmitPaymentRequest(
+            str(uuid.uuid4()), "1234123412341234", "01-24", amount, "POUNDS", "321"
+        )
+    )
+
+
+@pytest.mark.parametrize(
+    "env_variable",
+    ["PAYMENT_REQUESTS_DYNAMODB_TABLE_NAME", "PAYMENT_REQUEST_STATUSES_DYNAMODB_TABLE_NAME"],
+)
+def test_PaymentRequestStatusRepository_raises_KeyError_if_table_name_env_variable_is_not_set(
+    payment_requests_table, payment_request_statuses_table, env_variable
+):
+    del os.environ[env_variable]
+    with pytest.raises(KeyError):
+        PaymentRequestStatusRepository()
+
+
+def test_PaymentRequestStatusRepository_rebuild_reads_only_the_attributes_a_status_needs(
+    payment_requests_table,
+    payment_request_statuses_table,
+):
+    # Given
+    payment_request = make_payment_request()
+    PaymentRequestsRepository().upsert(payment_request)
+    repo = PaymentRequestStatusRepository()
+
+    # When
+    with patch.object(
+        repo.payment_requests_table, "get_item", wraps=repo.payment_requests_table.get_item
+    ) as get_item_spy:
+        repo.rebuild(payment_request.id)
+
+    # Then
+    read_attributes = set(get_item_spy.call_args.kwargs["ExpressionAttributeNames"].values())
+    assert "cvv" not in read_attributes
+    assert read_attributes < set(
+        payment_requests_table.get_item(Key={"id": payment_request.id})["Item"]
+    )
+
+
+def test_PaymentRequestStatusRepository_rebuild_raises_NotFound_if_PaymentRequest_does_not_exist(
+    payment_requests_table,
+    payment_request_statuses_table,
+):
+    with pytest.raises(NotFound):
+        PaymentRequestStatusRepository().rebuild(str(uuid.uuid4()))
+
+
+@pytest.mark.parametrize(
+    "amount, is_sent, response",
+    [
+        ("15.75", False, None),
+        (1192.34, True, None),
+        ("15.75", True, AcquiringBankResponse(AcquiringBankResponse.INSUFFICIENT_CREDIT)),
+    ],
+)
+def test_PaymentRequestStatusRepository_rebuild_matches_status_formed_from_PaymentRequest(
+    payment_requests_table, payment_request_statuses_table, amount, is_sent, response
+):
+    # Given
+    payment_request = make_payment_request(amount)
+    payment_request.is_sent_to_acquiring_bank = is_sent
+    payment_request.acquiring_bank_response = response
+    PaymentRequestsRepository().upsert(payment_request)
+    repo = PaymentRequestStatusRepository()
+
+    # When
+    repo.rebuild(payment_request.id)
+
+    # Then
+    stored = PaymentRequestsRepository().get_by_aggregate_root_id(payment_request.id)
+    assert (
+        GetPaymentRequestStatusDTO.from_status_item(repo.get_status(payment_request.id)).json
+        == GetPaymentRequestStatusDTO.from_payment_request(stored).json
+    )
+
+
+@pytest.mark.parametrize("amount", ["15.75", 1192.34])
+def test_PaymentRequestStatusRepository_get_status_returns_saved_status_with_one_batch_get(
+    payment_requests_table, payment_request_statuses_table, amount
+):
+    # Given
+    payment_request = make_payment_request(amount)
+    PaymentRequestsRepository().upsert(payment_request)
+    repo = PaymentRequestStatusRepository()
+    repo.save(payment_request)
+
+    # When
+    with patch.object(
+        repo.payment_requests_table, "get_item", wraps=repo.payment_requests_table.get_item
+    ) as get_payment_request_item, patch.object(
+        repo.dynamodb_resource, "batch_get_item", wraps=repo.dynamodb_resource.batch_get_item
+    ) as batch_get_item_spy:
+        status_item = repo.get_status(payment_request.id)
+
+    # Then
+    get_payment_request_item.assert_not_called()
+    batch_get_item_spy.assert_called_once()
+    assert status_item["merchant_id"] == payment_request.merchant_id.value
+    assert status_item["version"] == 1
+    assert (
+        GetPaymentRequestStatusDTO.from_status_item(status_item).json
+        == GetPaymentRequestStatusDTO.from_payment_request(payment_request).json
+    )
+
+
+def test_PaymentRequestStatusRepository_get_status_rebuilds_missing_status(
+    payment_requests_table,
+    payment_request_statuses_table,
+):
+    # Given
+    payment_request = make_payment_request()
+    PaymentRequestsRepository().upsert(payment_request)
+
+    # When
+    status_item = PaymentRequestStatusRepository().get_status(payment_request.id)
+
+    # Then
+    assert status_item["status"] == "Processing - In Payment Gateway"
+    saved = payment_request_statuses_table.get_item(Key={"id": payment_request.id})["Item"]
+    assert saved["version"] == 1
+    assert saved["status"] == status_item["status"]
+
+
+def test_PaymentRequestStatusRepository_does_not_store_cvv(
+    payment_requests_table,
+    payment_request_statuses_table,
+):
+    # Given
+    payment_requests_repo = PaymentRequestsRepository()
+    repo = PaymentRequestStatusRepository()
+    saved, saved_in_batch, rebuilt = [make_payment_request() for _ in range(3)]
+    for payment_request in (saved, saved_in_batch, rebuilt):
+        payment_requests_repo.upsert(payment_request)
+
+    # When
+    repo.save(saved)
+    repo.save_many([saved_in_batch])
+    status_item = repo.get_status(rebuilt.id)
+
+    # Then
+    assert status_item["payment_details"]["cvv"] == "321"
+    for status_item in payment_request_statuses_table.scan()["Items"]:
+        assert "cvv" not in status_item["payment_details"]
+
+
+def test_PaymentRequestStatusRepository_get_status_raises_NotFound_if_PaymentRequest_does_not_exist(
+    payment_requests_table,
+    payment_request_statuses_table,
+):
+    with pytest.raises(NotFound):
+        PaymentRequestStatusRepository().get_status(str(uuid.uuid4()))
+
+
+def test_PaymentRequestStatusRepository_save_does_not_replace_a_later_version(
+    payment_requests_table,
+    payment_request_statuses_table,
+):
+    # Given
+    payment_request = make_payment_request()
+    repo = PaymentRequestStatusRepository()
+    payment_request.version = 2
+    payment_request.is_sent_to_acquiring_bank = True
+    repo.save(payment_request)
+
+    # When
+    payment_request.version = 1
+    payment_request.is_sent_to_acquiring_bank = False
+    repo.save(payment_request)
+
+    # Then
+    saved = payment_request_statuses_table.get_item(Key={"id": payment_request.id})["Item"]
+    assert saved["version"] == 2
+    assert saved["status"] == "Processing - Awaiting response from acquiring bank"
+
+
+def test_PaymentRequestStatusRepository_save_many_saves_every_status(
+    payment_requests_table,
+    payment_request_statuses_table,
+):
+    # Given
+    payment_requests = [make_payment_request() for _ in range(30)]
+
+    # When
+    PaymentRequestStatusRepository().save_many(payment_requests)
+
+    # Then
+    assert payment_request_statuses_table.scan()["Count"] == 30
+
+
+def test_PaymentRequestStatusRepository_rebuild_all_rebuilds_only_missing_and_stale_statuses(
+    payment_requests_table,
+    payment_request_statuses_table,
+):
+    # Given
+    payment_requests_repo = PaymentRequestsRepository()
+    repo = PaymentRequestStatusRepository()
+    up_to_date, stale, missing = [make_payment_request() for _ in range(3)]
+    for payment_request in (up_to_date, stale, missing):
+        payment_requests_repo.upsert(payment_request)
+    repo.save(up_to_date)
+    repo.save(stale)
+    stale.mark_as_forwarded_to_acquiring_bank()
+    payment_requests_repo.update(stale)
+
+    # When
+    with patch.object(repo, "_put_if_newer", wraps=repo._put_if_newer) as put_if_newer:
+        number_rebuilt = repo.rebuild_all()
+
+    # Then
+    assert number_rebuilt == 2
+    assert {call.args[0]["id"] for call in put_if_newer.call_args_list} == {stale.id, missing.id}
+    saved = payment_request_statuses_table.get_item(Key={"id": stale.id})["Item"]
+    assert saved["version"] == 2
+    assert saved["status"] == "Processing - Awaiting response from acquiring bank"
+    assert payment_request_statuses_table.get_item(Key={"id": missing.id})["Item"]["version"] == 1
+
+
+def test_PaymentRequestStatusRepository_rebuild_from_item_does_not_replace_a_later_status(
+    payment_requests_table,
+    payment_request_statuses_table,
+):
+    # Given
+    payment_requests_repo = PaymentRequestsRepository()
+    repo = PaymentRequestStatusRepository()
+    payment_request = make_payment_request()
+    payment_requests_repo.upsert(payment_request)
+    first_item = payment_requests_table.get_item(Key={"id": payment_request.id})["Item"]
+    payment_request.mark_as_forwarded_to_acquiring_bank()
+    payment_requests_repo.update(payment_request)
+    second_item = payment_requests_table.get_item(Key={"id": payment_request.id})["Item"]
+
+    # When
+    repo.rebuild_from_item(second_item)
+    repo.rebuild_from_item(first_item)
+
+    # Then
+    saved = payment_request_statuses_table.get_item(Key={"id": payment_request.id})["Item"]
+    assert saved["version"] == 2
+    assert saved["status"] == "Processing - Awaiting response from acquiring bank"
@@ -1,15 +1,30 @@
+import gc
 import os
+import time
 import uuid
+from decimal import Decimal
 from unittest.mock import patch
 
 import boto3
 import pytest
+from botocore.exceptions import ClientError
 
+from application.mapping.mapper import Mapper
+from application.repositories.exceptions.ConcurrencyConflict import ConcurrencyConflict
 from application.repositories.exceptions.NotFound import NotFound
+from application.repositories.exceptions.UnprocessedKeys import UnprocessedKeys
+from application.repositories.OutboxRepository import OutboxRepository
 from application.repositories.PaymentRequestsRepository import PaymentRequestsRepository
+from core.commands.ForwardPaymentRequestToAcquiringBank import (
+    ForwardPaymentRequestToAcquiringBank,
+)
 from core.commands.SubmitPaymentRequest import SubmitPaymentRequest
 from core.payment_request_aggregate.PaymentRequest import PaymentRequest
+from core.payment_request_aggregate.value_objects.AcquiringBankResponse import (
+    AcquiringBankResponse,
+)
 from core.payment_request_aggregate.value_objects.CardNumber import CardNumber
+from core.payment_request_aggregate.value_objects.Currency import Currency
 from core.payment_request_aggregate.value_objects.CVV import CVV
 from tests.conftest import property_values_are_equal
 
@@ -45,6 +60,7 @@ def test_PaymentRequestRepository_upsert_inserts_item_in_db(payment_requests_tab
     assert payment_request_db_object["Item"]["id"] == id
     assert payment_request_db_object["Item"]["merchant_id"]["value"] == merchant_id
     assert payment_request_db_object["Item"]["is_sent_to_acquiring_bank"] is False
+    assert payment_request_db_object["Item"]["amount"]["amount"] == Decimal("15.75")
 
 
 def test_PaymentRequestRepository_upsert_updates_item_in_db(payment_requests_table):
@@ -125,6 +141,699 @@ def test_PaymentRequestRepository_get_by_aggregate_root_id_returns_what_was_save
     assert type(payment_request_from_repo) == PaymentRequest
     assert type(payment_request_from_repo.card_number) == CardNumber
     assert type(payment_request_from_repo.cvv) == CVV
+    assert payment_request_from_repo.amount.currency is Currency(Currency.POUNDS)
+
+
+def test_PaymentRequestRepository_update_only_writes_changed_attributes(payment_requests_table):
+    # Given
+    repo = PaymentRequestsRepository()
+    [payment_request] = make_payment_requests(1)
+    repo.upsert(payment_request)
+    payment_request_from_repo = repo.get_by_aggregate_root_id(payment_request.id)
+    payment_request_from_repo.process_acquiring_bank_response(
+        AcquiringBankResponse(AcquiringBankResponse.PAID)
+    )
+
+    # Another writer changes a different attribute after the PaymentRequest was loaded
+    payment_requests_table.update_item(
+        Key={"id": payment_request.id},
+        UpdateExpression="SET is_sent_to_acquiring_bank = :true",
+        ExpressionAttributeValues={":true": True},
+    )
+
+    # When
+    with patch.object(
+        repo.payment_requests_table,
+        "update_item",
+        wraps=repo.payment_requests_table.update_item,
+    ) as spy_update_item:
+        repo.update(payment_request_from_repo)
+
+    # Then
+    assert set(spy_update_item.call_args.kwargs["ExpressionAttributeNames"].values()) == {
+        "id",
+        "acquiring_bank_response",
+        "version",
+    }
+    item = payment_requests_table.get_item(Key={"id": payment_request.id})["Item"]
+    assert item["acquiring_bank_response"]["value"] == AcquiringBankResponse.PAID
+    assert item["is_sent_to_acquiring_bank"] is True
+
+
+def test_PaymentRequestRepository_update_does_not_write_if_nothing_changed(payment_requests_table):
+    # Given
+    repo = PaymentRequestsRepository()
+    [payment_request] = make_payment_requests(1)
+    repo.upsert(payment_request)
+    payment_request_from_repo = repo.get_by_aggregate_root_id(payment_request.id)
+
+    # When
+    with patch.object(repo.payment_requests_table, "update_item") as mock_update_item:
+        repo.update(payment_request_from_repo)
+
+    # Then
+    mock_update_item.assert_not_called()
+
+
+def test_PaymentRequestRepository_update_upserts_if_PaymentRequest_was_not_loaded_by_repository(
+    payment_requests_table,
+):
+    # Given
+    repo = PaymentRequestsRepository()
+    [payment_request] = make_payment_requests(1)
+
+    # When
+    repo.update(payment_request)
+
+    # Then
+    assert "Item" in payment_requests_table.get_item(Key={"id": payment_request.id})
+
+
+def test_PaymentRequestRepository_forgets_loaded_items_of_PaymentRequests_no_longer_in_use(
+    payment_requests_table,
+):
+    # Given
+    repo = PaymentRequestsRepository()
+    payment_requests = make_payment_requests(3)
+    for payment_request in payment_requests:
+        repo.upsert(payment_request)
+    loaded = [
+        repo.get_by_aggregate_root_id(payment_request.id) for payment_request in payment_requests
+    ]
+
+    # When
+    del payment_requests, payment_request, loaded
+    gc.collect()
+
+    # Then
+    assert len(repo._loaded_items) == 0
+
+
+def test_PaymentRequestRepository_update_raises_NotFound_if_item_was_deleted_since_it_was_loaded(
+    payment_requests_table,
+):
+    # Given
+    repo = PaymentRequestsRepository()
+    [payment_request] = make_payment_requests(1)
+    repo.upsert(payment_request)
+    payment_request_from_repo = repo.get_by_aggregate_root_id(payment_request.id)
+    payment_request_from_repo.mark_as_forwarded_to_acquiring_bank()
+    payment_requests_table.delete_item(Key={"id": payment_request.id})
+
+    # When
+    with pytest.raises(NotFound):
+        repo.update(payment_request_from_repo)
+
+    # Then
+    assert "Item" not in payment_requests_table.get_item(Key={"id": payment_request.id})
+
+
+@pytest.mark.parametrize("not_a_payment_request", [123, "abc", {"do": "re"}, ("me",)])
+def test_PaymentRequestRepository_update_raises_TypeError_if_passed_something_other_than_PaymentRequest_object(
+    payment_requests_table, not_a_payment_request
+):
+    # Given
+    repo = PaymentRequestsRepository()
+
+    # When
+    with pytest.raises(TypeError):
+        repo.update(not_a_payment_request)
+
+
+def test_PaymentRequestRepository_upsert_and_update_increment_version(payment_requests_table):
+    # Given
+    repo = PaymentRequestsRepository()
+    [payment_request] = make_payment_requests(1)
+
+    # When
+    repo.upsert(payment_request)
+    payment_request_from_repo = repo.get_by_aggregate_root_id(payment_request.id)
+    payment_request_from_repo.mark_as_forwarded_to_acquiring_bank()
+    repo.update(payment_request_from_repo)
+
+    # Then
+    assert payment_request.version == 1
+    assert payment_request_from_repo.version == 2
+    item = payment_requests_table.get_item(Key={"id": payment_request.id})["Item"]
+    assert item["version"] == 2
+
+
+@pytest.mark.parametrize("save_method_name", ["upsert", "update"])
+def test_PaymentRequestRepository_raises_ConcurrencyConflict_if_PaymentRequest_was_saved_since_it_was_loaded(
+    payment_requests_table, save_method_name
+):
+    # Given
+    [payment_request] = make_payment_requests(1)
+    PaymentRequestsRepository().upsert(payment_request)
+
+    repo = PaymentRequestsRepository()
+    another_writers_repo = PaymentRequestsRepository()
+    payment_request_from_repo = repo.get_by_aggregate_root_id(payment_request.id)
+    another_writers_payment_request = another_writers_repo.get_by_aggregate_root_id(
+        payment_request.id
+    )
+
+    another_writers_payment_request.mark_as_forwarded_to_acquiring_bank()
+    another_writers_repo.update(another_writers_payment_request)
+
+    payment_request_from_repo.process_acquiring_bank_response(
+        AcquiringBankResponse(AcquiringBankResponse.PAID)
+    )
+
+    # When
+    with pytest.raises(ConcurrencyConflict):
+        getattr(repo, save_method_name)(payment_request_from_repo)
+
+    # Then
+    item = payment_requests_table.get_item(Key={"id": payment_request.id})["Item"]
+    assert item["version"] == 2
+    assert item["is_sent_to_acquiring_bank"] is True
+    assert item["acquiring_bank_response"] is None
+
+
+def test_PaymentRequestRepository_loads_items_saved_before_versioning_as_version_0(
+    payment_requests_table,
+):
+    # Given
+    repo = PaymentRequestsRepository()
+    [payment_request] = make_payment_requests(1)
+    item = Mapper.object_to_dict(payment_request)
+    del item["version"]
+    payment_requests_table.put_item(Item=item)
+
+    # When
+    payment_request_from_repo = repo.get_by_aggregate_root_id(payment_request.id)
+    payment_request_from_repo.mark_as_forwarded_to_acquiring_bank()
+    repo.update(payment_request_from_repo)
+
+    # Then
+    item = payment_requests_table.get_item(Key={"id": payment_request.id})["Item"]
+    assert item["version"] == 1
+    assert item["is_sent_to_acquiring_bank"] is True
+
+
+def test_PaymentRequestRepository_upsert_writes_outbox_entries_in_the_same_transaction(
+    payment_requests_table, payment_requests_outbox_table
+):
+    # Given
+    [payment_request] = make_payment_requests(1)
+    outbox_entry = OutboxRepository().make_entry(
+        "payment_requests_to_forward",
+        ForwardPaymentRequestToAcquiringBank(payment_request.id, payment_request.merchant_id.value),
+    )
+
+    # When
+    PaymentRequestsRepository().upsert(payment_request, outbox_entries=[outbox_entry])
+
+    # Then
+    item = payment_requests_table.get_item(Key={"id": payment_request.id})["Item"]
+    assert item["version"] == 1
+    assert item["amount"]["amount"] == Decimal("15.75")
+    assert payment_request.version == 1
+    [outbox_item] = payment_requests_outbox_table.scan()["Items"]
+    assert outbox_item == outbox_entry["Put"]["Item"]
+
+
+def test_PaymentRequestRepository_upsert_with_outbox_entries_raises_ConcurrencyConflict_and_writes_nothing(
+    payment_requests_table, payment_requests_outbox_table
+):
+    # Given
+    [payment_request] = make_payment_requests(1)
+    PaymentRequestsRepository().upsert(payment_request)
+    stale_payment_request = PaymentRequestsRepository().get_by_aggregate_root_id(payment_request.id)
+    PaymentRequestsRepository().upsert(payment_request)
+    outbox_entry = OutboxRepository().make_entry(
+        "payment_requests_to_forward",
+        ForwardPaymentRequestToAcquiringBank(payment_request.id, payment_request.merchant_id.value),
+    )
+
+    # When
+    with pytest.raises(ConcurrencyConflict):
+        PaymentRequestsRepository().upsert(stale_payment_request, outbox_entries=[outbox_entry])
+
+    # Then
+    assert payment_requests_table.get_item(Key={"id": payment_request.id})["Item"]["version"] == 2
+    assert payment_requests_outbox_table.scan()["Count"] == 0
+
+
+def make_outbox_entries(payment_request):
+    command = ForwardPaymentRequestToAcquiringBank(
+        payment_request.id, payment_request.merchant_id.value
+    )
+    return [OutboxRepository().make_entry("payment_requests_to_forward", command)]
+
+
+def test_PaymentRequestRepository_insert_many_with_outbox_entries_writes_in_transactions(
+    payment_requests_table, payment_requests_outbox_table
+):
+    # Given
+    payment_requests = make_payment_requests(30)
+    client = PaymentRequestsRepository().dynamodb_resource.meta.client
+
+    # When
+    with patch.object(
+        client, "transact_write_items", wraps=client.transact_write_items
+    ) as transact_write_items_spy:
+        failures = PaymentRequestsRepository().insert_many_with_outbox_entries(
+            (payment_request, make_outbox_entries(payment_request))
+            for payment_request in payment_requests
+        )
+
+    # Then
+    assert failures == {}
+    assert [len(call.kwargs["TransactItems"]) for call in transact_write_items_spy.mock_calls] == [
+        24,
+        24,
+        12,
+    ]
+    for payment_request in payment_requests:
+        item = payment_requests_table.get_item(Key={"id": payment_request.id})["Item"]
+        assert item["version"] == 1
+        assert payment_request.version == 1
+    assert payment_requests_outbox_table.scan()["Count"] == 30
+
+
+def test_PaymentRequestRepository_insert_many_with_outbox_entries_reports_cancelled_transactions(
+    payment_requests_table, payment_requests_outbox_table
+):
+    # Given one PaymentRequest in the first transaction already exists
+    payment_requests = make_payment_requests(14)
+    PaymentRequestsRepository().upsert(payment_requests[3])
+
+    # When
+    failures = PaymentRequestsRepository().insert_many_with_outbox_entries(
+        (payment_request, make_outbox_entries(payment_request))
+        for payment_request in payment_requests
+    )
+
+    # Then
+    assert failures == {
+        payment_request.id: "TransactionCanceledException"
+        for payment_request in payment_requests[:12]
+    }
+    assert payment_requests_table.scan()["Count"] == 3
+    assert payment_requests_outbox_table.scan()["Count"] == 2
+
+
+def test_PaymentRequestRepository_insert_many_with_outbox_entries_raises_TypeError_for_non_PaymentRequests(
+    payment_requests_table,
+):
+    with pytest.raises(TypeError):
+        PaymentRequestsRepository().insert_many_with_outbox_entries([("not a PaymentRequest", [])])
+
+
+def make_payment_requests(number_of_payment_requests):
+    return [
+        PaymentRequest(
+            SubmitPaymentRequest(
+                str(uuid.uuid4()), "1234123412341234", "01-24", "15.75", "POUNDS", "321"
+            )
+        )
+        for _ in range(number_of_payment_requests)
+    ]
+
+
+def test_PaymentRequestRepository_upsert_many_inserts_items_in_db_in_batches(
+    payment_requests_table,
+):
+    # Given
+    repo = PaymentRequestsRepository()
+    payment_requests = make_payment_requests(60)
+
+    # When
+    with patch.object(
+        repo.dynamodb_resource,
+        "batch_write_item",
+        wraps=repo.dynamodb_resource.batch_write_item,
+    ) as spy_batch_write_item:
+        failures = repo.upsert_many(payment_request for payment_request in payment_requests)
+
+    # Then
+    assert failures == {}
+    assert spy_batch_write_item.call_count == 3
+    for payment_request in payment_requests:
+        item = payment_requests_table.get_item(Key={"id": payment_request.id})["Item"]
+        assert item["merchant_id"]["value"] == payment_request.merchant_id.value
+
+
+def test_PaymentRequestRepository_upsert_many_writes_last_version_of_duplicates_in_a_batch(
+    payment_requests_table,
+):
+    # Given
+    repo = PaymentRequestsRepository()
+    [payment_request] = make_payment_requests(1)
+
+    def submitted_then_forwarded():
+        yield payment_request
+        payment_request.mark_as_forwarded_to_acquiring_bank()
+        yield payment_request
+
+    # When
+    failures = repo.upsert_many(submitted_then_forwarded())
+
+    # Then
+    assert failures == {}
+    item = payment_requests_table.get_item(Key={"id": payment_request.id})["Item"]
+    assert item["is_sent_to_acquiring_bank"] is True
+
+
+@patch.object(time, "sleep")
+def test_PaymentRequestRepository_upsert_many_retries_unprocessed_items(
+    mock_sleep, payment_requests_table
+):
+    # Given
+    repo = PaymentRequestsRepository()
+    payment_requests = make_payment_requests(5)
+    batch_write_item = repo.dynamodb_resource.batch_write_item
+
+    def leave_first_item_unprocessed_once(RequestItems):
+        if mock_batch_write_item.call_count > 1:
+            return batch_write_item(RequestItems=RequestItems)
+        [(table_name, write_requests)] = RequestItems.items()
+        batch_write_item(RequestItems={table_name: write_requests[1:]})
+        return {"UnprocessedItems": {table_name: write_requests[:1]}}
+
+    # When
+    with patch.object(
+        repo.dynamodb_resource, "batch_write_item", side_effect=leave_first_item_unprocessed_once
+    ) as mock_batch_write_item:
+        failures = repo.upsert_many(payment_requests)
+
+    # Then
+    assert failures == {}
+    assert mock_batch_write_item.call_count == 2
+    mock_sleep.assert_called_once()
+    assert "Item" in payment_requests_table.get_item(Key={"id": payment_requests[0].id})
+
+
+@patch.object(time, "sleep")
+def test_PaymentRequestRepository_upsert_many_reports_items_that_remain_unprocessed(
+    mock_sleep, payment_requests_table
+):
+    # Given
+    repo = PaymentRequestsRepository()
+    payment_requests = make_payment_requests(3)
+    batch_write_item = repo.dynamodb_resource.batch_write_item
+
+    def never_process_first_item(RequestItems):
+        [(table_name, write_requests)] = RequestItems.items()
+        unprocessed = [
+            request
+            for request in write_requests
+            if request["PutRequest"]["Item"]["id"] == payment_requests[0].id
+        ]
+        processed = [request for request in write_requests if request not in unprocessed]
+        if processed:
+            batch_write_item(RequestItems={table_name: processed})
+        return {"UnprocessedItems": {table_name: unprocessed}}
+
+    # When
+    with patch.object(
+        repo.dynamodb_resource, "batch_write_item", side_effect=never_process_first_item
+    ) as mock_batch_write_item:
+        failures = repo.upsert_many(payment_requests)
+
+    # Then
+    assert failures == {payment_requests[0].id: "Unprocessed after 5 attempts."}
+    assert mock_batch_write_item.call_count == 5
+    assert mock_sleep.call_count == 4
+    assert "Item" not in payment_requests_table.get_item(Key={"id": payment_requests[0].id})
+    assert "Item" in payment_requests_table.get_item(Key={"id": payment_requests[1].id})
+
+
+def test_PaymentRequestRepository_upsert_many_reports_every_item_of_a_rejected_batch(
+    payment_requests_table,
+):
+    # Given
+    repo = PaymentRequestsRepository()
+    payment_requests = make_payment_requests(30)
+    batch_write_item = repo.dynamodb_resource.batch_write_item
+
+    def reject_second_batch(RequestItems):
+        if mock_batch_write_item.call_count == 2:
+            raise ClientError(
+                {"Error": {"Code": "ProvisionedThroughputExceededException"}}, "BatchWriteItem"
+            )
+        return batch_write_item(RequestItems=RequestItems)
+
+    # When
+    with patch.object(
+        repo.dynamodb_resource, "batch_write_item", side_effect=reject_second_batch
+    ) as mock_batch_write_item:
+        failures = repo.upsert_many(payment_requests)
+
+    # Then
+    assert failures == {
+        payment_request.id: "ProvisionedThroughputExceededException"
+        for payment_request in payment_requests[25:]
+    }
+
+
+def test_PaymentRequestRepository_upsert_many_raises_TypeError_if_passed_something_other_than_PaymentRequest_objects(
+    payment_requests_table,
+):
+    # Given
+    repo = PaymentRequestsRepository()
+
+    # When
+    with pytest.raises(TypeError):
+        repo.upsert_many(make_payment_requests(1) + ["not a payment request"])
+
+
+def test_PaymentRequestRepository_get_many_by_aggregate_root_ids_returns_what_was_saved_in_batches(
+    payment_requests_table,
+):
+    # Given
+    repo = PaymentRequestsRepository()
+    payment_requests = make_payment_requests(250)
+    repo.upsert_many(payment_requests)
+    ids = [payment_request.id for payment_request in payment_requests]
+
+    # When
+    with patch.object(
+        repo.dynamodb_resource,
+        "batch_get_item",
+        wraps=repo.dynamodb_resource.batch_get_item,
+    ) as spy_batch_get_item:
+        payment_requests_from_repo = list(repo.get_many_by_aggregate_root_ids(iter(ids)))
+
+    # Then
+    assert spy_batch_get_item.call_count == 3
+    assert sorted(payment_request.id for payment_request in payment_requests_from_repo) == sorted(
+        ids
+    )
+    payment_requests_by_id = {
+        payment_request.id: payment_request for payment_request in payment_requests
+    }
+    for payment_request_from_repo in payment_requests_from_repo:
+        assert type(payment_request_from_repo) == PaymentRequest
+        assert type(payment_request_from_repo.card_number) == CardNumber
+        assert property_values_are_equal(
+            payment_request_from_repo, payment_requests_by_id[payment_request_from_repo.id]
+        )
+
+
+def test_PaymentRequestRepository_get_many_by_aggregate_root_ids_skips_missing_and_repeated_ids(
+    payment_requests_table,
+):
+    # Given
+    repo = PaymentRequestsRepository()
+    payment_requests = make_payment_requests(2)
+    repo.upsert_many(payment_requests)
+    ids = [
+        payment_requests[0].id,
+        str(uuid.uuid4()),
+        payment_requests[1].id,
+        payment_requests[0].id,
+    ]
+
+    # When
+    payment_requests_from_repo = list(repo.get_many_by_aggregate_root_ids(ids))
+
+    # Then
+    assert sorted(payment_request.id for payment_request in payment_requests_from_repo) == sorted(
+        payment_request.id for payment_request in payment_requests
+    )
+
+
+def test_PaymentRequestRepository_get_many_by_aggregate_root_ids_is_lazy(payment_requests_table):
+    # Given
+    repo = PaymentRequestsRepository()
+
+    # When
+    with patch.object(repo.dynamodb_resource, "batch_get_item") as mock_batch_get_item:
+        payment_requests_from_repo = repo.get_many_by_aggregate_root_ids([str(uuid.uuid4())])
+
+    # Then
+    mock_batch_get_item.assert_not_called()
+    assert payment_requests_from_repo is not None
+
+
+@patch.object(time, "sleep")
+def test_PaymentRequestRepository_get_many_by_aggregate_root_ids_retries_unprocessed_keys(
+    mock_sleep, payment_requests_table
+):
+    # Given
+    repo = PaymentRequestsRepository()
+    payment_requests = make_payment_requests(3)
+    repo.upsert_many(payment_requests)
+    batch_get_item = repo.dynamodb_resource.batch_get_item
+
+    def leave_first_key_unprocessed_once(RequestItems):
+        if mock_batch_get_item.call_count > 1:
+            return batch_get_item(RequestItems=RequestItems)
+        [(table_name, request)] = RequestItems.items()
+        response = batch_get_item(RequestItems={table_name: {"Keys": request["Keys"][1:]}})
+        response["UnprocessedKeys"] = {table_name: {"Keys": request["Keys"][:1]}}
+        return response
+
+    # When
+    with patch.object(
+        repo.dynamodb_resource, "batch_get_item", side_effect=leave_first_key_unprocessed_once
+    ) as mock_batch_get_item:
+        payment_requests_from_repo = list(
+            repo.get_many_by_aggregate_root_ids(
+                payment_request.id for payment_request in payment_requests
+            )
+        )
+
+    # Then
+    assert mock_batch_get_item.call_count == 2
+    mock_sleep.assert_called_once()
+    assert sorted(payment_request.id for payment_request in payment_requests_from_repo) == sorted(
+        payment_request.id for payment_request in payment_requests
+    )
+
+
+@patch.object(time, "sleep")
+def test_PaymentRequestRepository_get_many_by_aggregate_root_ids_raises_UnprocessedKeys_if_retries_are_exhausted(
+    mock_sleep, payment_requests_table
+):
+    # Given
+    repo = PaymentRequestsRepository()
+    payment_request_id = str(uuid.uuid4())
+
+    def never_process_keys(RequestItems):
+        [(table_name, request)] = RequestItems.items()
+        return {"Responses": {table_name: []}, "UnprocessedKeys": {table_name: request}}
+
+    # When
+    with patch.object(
+        repo.dynamodb_resource, "batch_get_item", side_effect=never_process_keys
+    ) as mock_batch_get_item:
+        with pytest.raises(UnprocessedKeys) as e:
+            list(repo.get_many_by_aggregate_root_ids([payment_request_id]))
+
+    # Then
+    assert e.value.payment_request_ids == [payment_request_id]
+    assert mock_batch_get_item.call_count == 5
+    assert mock_sleep.call_count == 4
+
+
+def save_merchant_payment_requests(merchant_id, created_ats):
+    payment_requests = []
+    for created_at in created_ats:
+        payment_request = PaymentRequest(
+            SubmitPaymentRequest(merchant_id, "1234123412341234", "01-24", "15.75", "POUNDS", "321")
+        )
+        payment_request.created_at = created_at
+        payment_requests.append(payment_request)
+    PaymentRequestsRepository().upsert_many(payment_requests)
+    return payment_requests
+
+
+def test_PaymentRequestRepository_iter_by_merchant_returns_only_merchants_PaymentRequests_oldest_first(
+    payment_requests_table,
+):
+    # Given
+    merchant_id = str(uuid.uuid4())
+    payment_requests = save_merchant_payment_requests(merchant_id, [300, 100, 200])
+    save_merchant_payment_requests(str(uuid.uuid4()), [150])
+
+    # When
+    payment_requests_from_repo = list(PaymentRequestsRepository().iter_by_merchant(merchant_id))
+
+    # Then
+    assert [payment_request.id for payment_request in payment_requests_from_repo] == [
+        payment_requests[1].id,
+        payment_requests[2].id,
+        payment_requests[0].id,
+    ]
+    assert all(
+        not hasattr(payment_request, "merchant_key")
+        for payment_request in payment_requests_from_repo
+    )
+
+
+@pytest.mark.parametrize(
+    "since, until, expected_created_ats",
+    [
+        (200, None, [200, 300]),
+        (None, 200, [100, 200]),
+        (150, 250, [200]),
+        (400, 500, []),
+    ],
+)
+def test_PaymentRequestRepository_iter_by_merchant_filters_by_created_at(
+    payment_requests_table, since, until, expected_created_ats
+):
+    # Given
+    merchant_id = str(uuid.uuid4())
+    save_merchant_payment_requests(merchant_id, [100, 200, 300])
+
+    # When
+    payment_requests_from_repo = PaymentRequestsRepository().iter_by_merchant(
+        merchant_id, since, until
+    )
+
+    # Then
+    assert [
+        payment_request.created_at for payment_request in payment_requests_from_repo
+    ] == expected_created_ats
+
+
+@patch("application.repositories.PaymentRequestsRepository.QUERY_PAGE_SIZE", 2)
+def test_PaymentRequestRepository_iter_by_merchant_fetches_pages_as_they_are_consumed(
+    payment_requests_table,
+):
+    # Given
+    merchant_id = str(uuid.uuid4())
+    save_merchant_payment_requests(merchant_id, [1, 2, 3, 4, 5])
+    repo = PaymentRequestsRepository()
+
+    # When
+    with patch.object(
+        repo.payment_requests_table, "query", wraps=repo.payment_requests_table.query
+    ) as query:
+        payment_requests_from_repo = repo.iter_by_merchant(merchant_id)
+        first_two = [next(payment_requests_from_repo), next(payment_requests_from_repo)]
+        queries_after_first_page = query.call_count
+        rest = list(payment_requests_from_repo)
+
+    # Then
+    assert queries_after_first_page == 1
+    assert query.call_count == 3
+    assert [payment_request.created_at for payment_request in first_two + rest] == [1, 2, 3, 4, 5]
+
+
+def test_PaymentRequestRepository_update_keeps_PaymentRequest_in_merchant_index(
+    payment_requests_table,
+):
+    # Given
+    merchant_id = str(uuid.uuid4())
+    [payment_request] = save_merchant_payment_requests(merchant_id, [100])
+    repo = PaymentRequestsRepository()
+    loaded = repo.get_by_aggregate_root_id(payment_request.id)
+
+    # When
+    loaded.mark_as_forwarded_to_acquiring_bank()
+    repo.update(loaded)
+
+    # Then
+    [listed] = list(repo.iter_by_merchant(merchant_id))
+    assert listed.is_sent_to_acquiring_bank is True
+    item = payment_requests_table.get_item(Key={"id": payment_request.id})["Item"]
+    assert item["merchant_key"] == merchant_id
 
 
 class BrokenDynamoDBResource:
@@ -0,0 +1,142 @@
+import uuid
+from unittest.mock import patch
+
+from application.repositories.PaymentRequestsRepository import PaymentRequestsRepository
+from application.services.DuplicatePaymentRequestDetector import (
+    DuplicatePaymentRequestDetector,
+)
+from core.commands.SubmitPaymentRequest import SubmitPaymentRequest
+from core.payment_request_aggregate.PaymentRequest import PaymentRequest
+
+
+def make_payment_request(merchant_id: str, amount: str = "15.75") -> PaymentRequest:
+    return PaymentRequest(
+        SubmitPaymentRequest(merchant_id, "1234123412341234", "01-24", amount, "POUNDS", "321")
+    )
+
+
+def test_find_duplicate_of_does_not_query_for_a_payment_request_not_seen_before(
+    payment_requests_table,
+):
+    # Given
+    repository = PaymentRequestsRepository()
+    detector = DuplicatePaymentRequestDetector(repository)
+
+    # When
+    with patch.object(repository, "iter_by_merchant") as mock_iter_by_merchant:
+        duplicate_of = detector.find_duplicate_of(make_payment_request(str(uuid.uuid4())))
+
+    # Then
+    assert duplicate_of is None
+    mock_iter_by_merchant.assert_not_called()
+
+
+def test_find_duplicate_of_returns_earlier_payment_request_with_the_same_details(
+    payment_requests_table,
+):
+    # Given
+    repository = PaymentRequestsRepository()
+    detector = DuplicatePaymentRequestDetector(repository)
+    merchant_id = str(uuid.uuid4())
+    earlier_payment_request = make_payment_request(merchant_id, amount="15.75")
+    repository.upsert(earlier_payment_request)
+    detector.remember([earlier_payment_request])
+
+    # When
+    duplicate_of = detector.find_duplicate_of(make_payment_request(merchant_id, amount="15.750"))
+
+    # Then
+    assert duplicate_of == earlier_payment_request.id
+
+
+def test_find_duplicate_of_ignores_payment_requests_with_other_details(payment_requests_table):
+    # Given
+    repository = PaymentRequestsRepository()
+    detector = DuplicatePaymentRequestDetector(repository)
+    merchant_id = str(uuid.uuid4())
+    earlier_payment_request = make_payment_request(merchant_id)
+    repository.upsert(earlier_payment_request)
+    detector.remember([earlier_payment_request])
+
+    # When
+    duplicates_of = [
+        detector.find_duplicate_of(make_payment_request(merchant_id, amount="20.00")),
+        detector.find_duplicate_of(make_payment_request(str(uuid.uuid4()))),
+    ]
+
+    # Then
+    assert duplicates_of == [None, None]
+
+
+def test_find_duplicate_of_does_not_remember_payment_requests_it_checks(payment_requests_table):
+    # Given
+    repository = PaymentRequestsRepository()
+    detector = DuplicatePaymentRequestDetector(repository)
+    merchant_id = str(uuid.uuid4())
+    detector.find_duplicate_of(make_payment_request(merchant_id))
+
+    # When
+    with patch.object(repository, "iter_by_merchant") as mock_iter_by_merchant:
+        duplicate_of = detector.find_duplicate_of(make_payment_request(merchant_id))
+
+    # Then
+    assert duplicate_of is None
+    mock_iter_by_merchant.assert_not_called()
+
+
+def test_find_duplicates_of_finds_duplicates_within_the_batch_without_querying(
+    payment_requests_table,
+):
+    # Given
+    repository = PaymentRequestsRepository()
+    detector = DuplicatePaymentRequestDetector(repository)
+    merchant_id = str(uuid.uuid4())
+    payment_requests = [
+        make_payment_request(merchant_id, amount="15.75"),
+        make_payment_request(merchant_id, amount="20.00"),
+        make_payment_request(merchant_id, amount="15.750"),
+        make_payment_request(merchant_id, amount="15.75"),
+    ]
+
+    # When
+    with patch.object(repository, "iter_by_merchant") as mock_iter_by_merchant:
+        duplicates_of = detector.find_duplicates_of(payment_requests)
+
+    # Then
+    assert duplicates_of == [None, None, payment_requests[0].id, payment_requests[0].id]
+    mock_iter_by_merchant.assert_not_called()
+
+
+def test_find_duplicates_of_queries_each_merchant_once_and_points_copies_at_saved_duplicate(
+    payment_requests_table,
+):
+    # Given
+    repository = PaymentRequestsRepository()
+    detector = DuplicatePaymentRequestDetector(repository)
+    merchant_id = str(uuid.uuid4())
+    saved_payment_requests = [
+        make_payment_request(merchant_id, amount="15.75"),
+        make_payment_request(merchant_id, amount="20.00"),
+    ]
+    for payment_request in saved_payment_requests:
+        repository.upsert(payment_request)
+    detector.remember(saved_payment_requests)
+    payment_requests = [
+        make_payment_request(merchant_id, amount="15.75"),
+        make_payment_request(merchant_id, amount="20.00"),
+        make_payment_request(merchant_id, amount="15.75"),
+    ]
+
+    # When
+    with patch.object(
+        repository, "iter_by_merchant", wraps=repository.iter_by_merchant
+    ) as spy_iter_by_merchant:
+        duplicates_of = detector.find_duplicates_of(payment_requests)
+
+    # Then
+    spy_iter_by_merchant.assert_called_once()
+    assert duplicates_of == [
+        saved_payment_requests[0].id,
+        saved_payment_requests[1].id,
+        saved_payment_requests[0].id,
+    ]
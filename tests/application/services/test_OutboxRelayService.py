@@ -0,0 +1,167 @@
+import json
+import time
+import uuid
+from unittest.mock import patch
+
+from application.clients.CommandQueue import CommandQueue
+from application.repositories.OutboxRepository import CLAIM_SECONDS, OutboxRepository
+from application.services.OutboxRelayService import OutboxRelayService
+from core.commands.ForwardPaymentRequestToAcquiringBank import (
+    ForwardPaymentRequestToAcquiringBank,
+)
+
+QUEUE_NAME = "payment_requests_to_forward"
+
+
+def add_commands_to_outbox(outbox_table, number_of_commands: int) -> list:
+    return [command for command, _ in add_entries_to_outbox(outbox_table, number_of_commands)]
+
+
+def add_entries_to_outbox(outbox_table, number_of_entries: int) -> list:
+    """Returns (command, entry ID) for each entry added."""
+    outbox_repo = OutboxRepository()
+    commands_with_entry_ids = []
+    for _ in range(number_of_entries):
+        command = ForwardPaymentRequestToAcquiringBank(str(uuid.uuid4()), str(uuid.uuid4()))
+        item = outbox_repo.make_entry(QUEUE_NAME, command)["Put"]["Item"]
+        outbox_table.put_item(Item=item)
+        commands_with_entry_ids.append((command, item["id"]))
+    return commands_with_entry_ids
+
+
+def receive_all_payment_request_ids(queue) -> list:
+    payment_request_ids = []
+    while True:
+        messages = queue.receive_messages(MaxNumberOfMessages=10)
+        if not messages:
+            return payment_request_ids
+        for message in messages:
+            payment_request_ids.append(json.loads(message.body)["payment_request_id"])
+            message.delete()
+
+
+def test_relay_outbox_publishes_every_entry_and_empties_the_outbox(
+    payment_requests_outbox_table, payment_requests_to_forward_queue
+):
+    # Given more entries than fit in a page of the scan
+    commands = add_commands_to_outbox(payment_requests_outbox_table, 150)
+
+    # When
+    number_relayed = OutboxRelayService().relay_outbox()
+
+    # Then
+    assert number_relayed == 150
+    assert sorted(receive_all_payment_request_ids(payment_requests_to_forward_queue)) == sorted(
+        command.payment_request_id for command in commands
+    )
+    assert payment_requests_outbox_table.scan()["Count"] == 0
+
+
+def test_relay_outbox_leaves_entries_that_could_not_be_published_in_the_outbox(
+    payment_requests_outbox_table, payment_requests_to_forward_queue
+):
+    # Given
+    add_commands_to_outbox(payment_requests_outbox_table, 3)
+    send_message_bodies = CommandQueue.send_message_bodies
+
+    def fail_to_publish_first_entry(command_queue, message_bodies):
+        message_bodies = list(message_bodies)
+        send_message_bodies(command_queue, message_bodies[1:])
+        return {0: "InternalError"}
+
+    # When
+    with patch.object(CommandQueue, "send_message_bodies", fail_to_publish_first_entry):
+        number_relayed = OutboxRelayService().relay_outbox()
+
+    # Then
+    assert number_relayed == 2
+    assert len(receive_all_payment_request_ids(payment_requests_to_forward_queue)) == 2
+    assert payment_requests_outbox_table.scan()["Count"] == 1
+
+    # When relayed again
+    assert OutboxRelayService().relay_outbox() == 1
+
+    # Then
+    assert len(receive_all_payment_request_ids(payment_requests_to_forward_queue)) == 1
+    assert payment_requests_outbox_table.scan()["Count"] == 0
+
+
+def test_relay_outbox_does_nothing_when_outbox_is_empty(
+    payment_requests_outbox_table, payment_requests_to_forward_queue
+):
+    assert OutboxRelayService().relay_outbox() == 0
+
+
+def test_relay_entries_publishes_only_the_entries_given(
+    payment_requests_outbox_table, payment_requests_to_forward_queue
+):
+    # Given
+    [(first_command, first_entry_id), _, (third_command, third_entry_id)] = add_entries_to_outbox(
+        payment_requests_outbox_table, 3
+    )
+
+    # When
+    with patch.object(
+        OutboxRepository, "iter_unclaimed_entries", side_effect=AssertionError("scanned")
+    ):
+        number_relayed = OutboxRelayService().relay_entries([first_entry_id, third_entry_id])
+
+    # Then
+    assert number_relayed == 2
+    assert sorted(receive_all_payment_request_ids(payment_requests_to_forward_queue)) == sorted(
+        [first_command.payment_request_id, third_command.payment_request_id]
+    )
+    assert payment_requests_outbox_table.scan()["Count"] == 1
+
+
+def test_relay_entries_skips_entries_already_relayed(
+    payment_requests_outbox_table, payment_requests_to_forward_queue
+):
+    # Given
+    [(_, entry_id)] = add_entries_to_outbox(payment_requests_outbox_table, 1)
+    assert OutboxRelayService().relay_entries([entry_id]) == 1
+
+    # When the entry's record is delivered again
+    number_relayed = OutboxRelayService().relay_entries([entry_id])
+
+    # Then
+    assert number_relayed == 0
+    assert len(receive_all_payment_request_ids(payment_requests_to_forward_queue)) == 1
+
+
+def test_relays_that_overlap_do_not_publish_entries_claimed_by_each_other(
+    payment_requests_outbox_table, payment_requests_to_forward_queue
+):
+    # Given another relay has claimed one of the entries, and not yet published it
+    [(_, claimed_entry_id), _, _] = add_entries_to_outbox(payment_requests_outbox_table, 3)
+    assert OutboxRepository().claim(claimed_entry_id) is not None
+
+    # When
+    swept = OutboxRelayService().relay_outbox()
+    relayed = OutboxRelayService().relay_entries([claimed_entry_id])
+
+    # Then
+    assert swept == 2
+    assert relayed == 0
+    assert len(receive_all_payment_request_ids(payment_requests_to_forward_queue)) == 2
+    assert [item["id"] for item in payment_requests_outbox_table.scan()["Items"]] == [
+        claimed_entry_id
+    ]
+
+
+def test_relay_outbox_relays_entries_whose_claim_ran_out(
+    payment_requests_outbox_table, payment_requests_to_forward_queue
+):
+    # Given a relay claimed an entry, then failed before publishing it
+    [(_, entry_id)] = add_entries_to_outbox(payment_requests_outbox_table, 1)
+    OutboxRepository().claim(entry_id)
+
+    # When the claim has run out
+    later = time.time() + CLAIM_SECONDS + 1
+    with patch("application.repositories.OutboxRepository.time.time", return_value=later):
+        number_relayed = OutboxRelayService().relay_outbox()
+
+    # Then
+    assert number_relayed == 1
+    assert len(receive_all_payment_request_ids(payment_requests_to_forward_queue)) == 1
+    assert payment_requests_outbox_table.scan()["Count"] == 0
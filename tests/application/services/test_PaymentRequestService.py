@@ -1,12 +1,28 @@
+import json
+import threading
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch
 
+import boto3
 import pytest
 import requests
+from botocore.exceptions import ClientError
 from requests import Response
 
 from application.mapping.mapper import Mapper
+from application.repositories.exceptions.ConcurrencyConflict import ConcurrencyConflict
+from application.repositories.exceptions.IdempotencyKeyInUse import IdempotencyKeyInUse
+from application.repositories.exceptions.IdempotencyKeyReused import (
+    IdempotencyKeyReused,
+)
 from application.repositories.exceptions.NotFound import NotFound
+from application.repositories.exceptions.NotSaved import NotSaved
+from application.repositories.PaymentRequestsRepository import PaymentRequestsRepository
+from application.repositories.PaymentRequestStatusRepository import (
+    PaymentRequestStatusRepository,
+)
 from application.services.PaymentRequestService import PaymentRequestService
 from core.commands.ForwardPaymentRequestToAcquiringBank import (
     ForwardPaymentRequestToAcquiringBank,
@@ -17,10 +33,11 @@ from core.payment_request_aggregate.PaymentRequest import PaymentRequest
 from core.payment_request_aggregate.value_objects.AcquiringBankResponse import (
     AcquiringBankResponse,
 )
+from shared_kernel.exceptions.DomainException import DomainException
 
 
-def test_submit_payment_request_adds_payment_request_to_dynamodb_and_sends_command_message_to_sqs(
-    payment_requests_table, payment_requests_to_forward_queue
+def test_submit_payment_request_adds_payment_request_and_command_to_outbox_in_dynamodb(
+    payment_requests_table, payment_requests_outbox_table, payment_requests_to_forward_queue
 ):
     # Given
     service = PaymentRequestService()
@@ -39,17 +56,40 @@ def test_submit_payment_request_adds_payment_request_to_dynamodb_and_sends_comma
     assert payment_request_db_object["Item"]["merchant_id"]["value"] == merchant_id
     assert payment_request_db_object["Item"]["is_sent_to_acquiring_bank"] is False
 
-    messages_on_queue = payment_requests_to_forward_queue.receive_messages()
+    outbox_entries = payment_requests_outbox_table.scan()["Items"]
+    assert len(outbox_entries) == 1
+    assert outbox_entries[0]["queue_name"] == "payment_requests_to_forward"
+    assert json.loads(outbox_entries[0]["message_body"]) == {
+        "payment_request_id": payment_request_id,
+        "merchant_id": merchant_id,
+    }
 
-    assert len(messages_on_queue) == 1
+    assert payment_requests_to_forward_queue.receive_messages() == []
 
 
-@patch.object(requests, "post")
+def test_submit_payment_request_saves_neither_payment_request_nor_command_if_outbox_write_fails(
+    payment_requests_table, payment_requests_to_forward_queue
+):
+    # Given no outbox table, so the transaction is cancelled
+    service = PaymentRequestService()
+    command = SubmitPaymentRequest(
+        str(uuid.uuid4()), "1234123412341234", "01-24", "15.75", "POUNDS", "321"
+    )
+
+    # When, then raises
+    with pytest.raises(ClientError):
+        service.submit_payment_request(command)
+
+    assert payment_requests_table.scan()["Count"] == 0
+
+
+@patch.object(requests.Session, "post")
 def test_forward_payment_request_to_acquiring_bank_calls_AcquiringBankClient_and_updates_payment_reqeuest_aggregate(
     mock_post,
     payment_requests_table,
+    idempotency_keys_table,
+    payment_requests_outbox_table,
     api_key_secret_in_secretsmanager,
-    payment_requests_to_forward_queue,
 ):
     # Given
     post_response = Response()
@@ -76,12 +116,13 @@ def test_forward_payment_request_to_acquiring_bank_calls_AcquiringBankClient_and
     assert payment_request_db_object["Item"]["is_sent_to_acquiring_bank"] is True
 
 
-@patch.object(requests, "post")
-def test_forward_payment_request_to_acquiring_bank_is_mostly_idempotent(
+@patch.object(requests.Session, "post")
+def test_forward_payment_request_to_acquiring_bank_is_idempotent(
     mock_post,
     payment_requests_table,
+    idempotency_keys_table,
+    payment_requests_outbox_table,
     api_key_secret_in_secretsmanager,
-    payment_requests_to_forward_queue,
 ):
     # Given
     post_response = Response()
@@ -108,6 +149,165 @@ def test_forward_payment_request_to_acquiring_bank_is_mostly_idempotent(
     mock_post.assert_called_once()
 
 
+def test_submit_payment_requests_creates_valid_payment_requests_and_returns_outcome_of_each(
+    payment_requests_table, payment_requests_outbox_table
+):
+    # Given
+    merchant_id = str(uuid.uuid4())
+    valid_command = SubmitPaymentRequest(
+        merchant_id, "1234123412341234", "01-24", "15.75", "POUNDS", "321"
+    )
+    invalid_command = SubmitPaymentRequest(
+        merchant_id, "1234123412341234", "01-24", "15.75", "POUNDS", "32"
+    )
+
+    # When
+    outcomes = PaymentRequestService().submit_payment_requests(
+        [valid_command, invalid_command, valid_command]
+    )
+
+    # Then
+    assert type(outcomes[0]) is str
+    assert isinstance(outcomes[1], DomainException)
+    assert type(outcomes[2]) is str
+    assert outcomes[0] != outcomes[2]
+    assert payment_requests_table.scan()["Count"] == 2
+    outbox_entries = payment_requests_outbox_table.scan()["Items"]
+    assert sorted(
+        json.loads(entry["message_body"])["payment_request_id"] for entry in outbox_entries
+    ) == sorted([outcomes[0], outcomes[2]])
+
+
+def test_submit_payment_requests_only_builds_PaymentRequests_from_valid_commands(
+    payment_requests_table, payment_requests_outbox_table
+):
+    # Given
+    merchant_id = str(uuid.uuid4())
+    valid_command = SubmitPaymentRequest(
+        merchant_id, "1234123412341234", "01-24", "15.75", "POUNDS", "321"
+    )
+    invalid_command = SubmitPaymentRequest(merchant_id, "1234", "13-24", "-15.75", "POUNDS", "321")
+
+    # When
+    with patch(
+        "application.services.PaymentRequestService.PaymentRequest", wraps=PaymentRequest
+    ) as payment_request_spy:
+        outcomes = PaymentRequestService().submit_payment_requests([invalid_command, valid_command])
+
+    # Then
+    payment_request_spy.assert_called_once_with(valid_command)
+    assert type(outcomes[0]) is DomainException
+    assert len(outcomes[0].messages) == 3
+    assert type(outcomes[1]) is str
+
+
+def test_submit_payment_requests_returns_NotSaved_for_payment_requests_that_could_not_be_saved(
+    payment_requests_table, payment_requests_outbox_table
+):
+    # Given
+    command = SubmitPaymentRequest(
+        str(uuid.uuid4()), "1234123412341234", "01-24", "15.75", "POUNDS", "321"
+    )
+
+    # When
+    with patch.object(
+        PaymentRequestsRepository,
+        "insert_many_with_outbox_entries",
+        side_effect=lambda pairs: {pairs[1][0].id: "ThrottlingException"},
+    ):
+        outcomes = PaymentRequestService().submit_payment_requests([command, command])
+
+    # Then
+    assert type(outcomes[0]) is str
+    assert isinstance(outcomes[1], NotSaved)
+    assert outcomes[1].reason == "ThrottlingException"
+
+
+def test_submit_payment_request_saves_status(
+    payment_requests_table, payment_requests_outbox_table, payment_request_statuses_table
+):
+    # Given
+    command = SubmitPaymentRequest(
+        str(uuid.uuid4()), "1234123412341234", "01-24", "15.75", "POUNDS", "321"
+    )
+
+    # When
+    payment_request_id = PaymentRequestService().submit_payment_request(command)
+
+    # Then
+    status_item = payment_request_statuses_table.get_item(Key={"id": payment_request_id})["Item"]
+    assert status_item["merchant_id"] == command.merchant_id
+    assert status_item["version"] == 1
+    assert status_item["status"] == "Processing - In Payment Gateway"
+    assert status_item["payment_details"]["card_number"] == "************1234"
+
+
+def test_submit_payment_request_returns_id_if_status_could_not_be_saved(
+    payment_requests_table, payment_requests_outbox_table
+):
+    # Given: no statuses table, so saving the status fails
+    command = SubmitPaymentRequest(
+        str(uuid.uuid4()), "1234123412341234", "01-24", "15.75", "POUNDS", "321"
+    )
+
+    # When
+    payment_request_id = PaymentRequestService().submit_payment_request(command)
+
+    # Then
+    assert "Item" in payment_requests_table.get_item(Key={"id": payment_request_id})
+
+
+def test_submit_payment_requests_saves_statuses_of_created_payment_requests(
+    payment_requests_table, payment_requests_outbox_table, payment_request_statuses_table
+):
+    # Given
+    merchant_id = str(uuid.uuid4())
+    valid_command = SubmitPaymentRequest(
+        merchant_id, "1234123412341234", "01-24", "15.75", "POUNDS", "321"
+    )
+    invalid_command = SubmitPaymentRequest(
+        merchant_id, "1234123412341234", "01-24", "15.75", "POUNDS", "32"
+    )
+
+    # When
+    with patch.object(
+        PaymentRequestsRepository,
+        "insert_many_with_outbox_entries",
+        side_effect=lambda pairs: {pairs[1][0].id: "ThrottlingException"},
+    ):
+        outcomes = PaymentRequestService().submit_payment_requests(
+            [valid_command, invalid_command, valid_command]
+        )
+
+    # Then
+    status_items = payment_request_statuses_table.scan()["Items"]
+    assert [status_item["id"] for status_item in status_items] == [outcomes[0]]
+
+
+def test_process_acquiring_bank_response_updates_status(
+    payment_requests_table, payment_request_statuses_table
+):
+    # Given
+    payment_request = PaymentRequest(
+        SubmitPaymentRequest(
+            str(uuid.uuid4()), "1234123412341234", "01-24", "15.75", "POUNDS", "321"
+        )
+    )
+    payment_request.mark_as_forwarded_to_acquiring_bank()
+    PaymentRequestsRepository().upsert(payment_request)
+    PaymentRequestStatusRepository().save(payment_request)
+
+    # When
+    PaymentRequestService().process_acquiring_bank_response(
+        ProcessAcquiringBankResponse(payment_request.id, AcquiringBankResponse.PAID)
+    )
+
+    # Then
+    status_item = payment_request_statuses_table.get_item(Key={"id": payment_request.id})["Item"]
+    assert status_item["version"] == 2
+    assert status_item["status"] == AcquiringBankResponse.PAID
+
+
 def test_process_acquiring_bank_response_raises_NotFound_if_PaymentRequest_does_not_exist(
     payment_requests_table,
 ):
@@ -162,3 +362,450 @@ def test_process_acquiring_bank_response_updates_PaymentRequest(payment_requests
         payment_request_db_object["Item"]["acquiring_bank_response"]["value"]
         == AcquiringBankResponse.PAID
     )
+
+
+def test_process_acquiring_bank_response_reapplies_response_if_PaymentRequest_is_modified_concurrently(
+    payment_requests_table,
+):
+    # Given
+    payment_request = PaymentRequest(
+        SubmitPaymentRequest(
+            str(uuid.uuid4()), "1234123412341234", "01-24", "15.75", "POUNDS", "321"
+        )
+    )
+    PaymentRequestsRepository().upsert(payment_request)
+    service = PaymentRequestService()
+    get_by_aggregate_root_id = service.payment_requests_repo.get_by_aggregate_root_id
+
+    def load_then_another_writer_marks_as_forwarded(payment_request_id):
+        loaded_payment_request = get_by_aggregate_root_id(payment_request_id)
+        if mock_get_by_aggregate_root_id.call_count == 1:
+            another_writers_repo = PaymentRequestsRepository()
+            another_writers_payment_request = another_writers_repo.get_by_aggregate_root_id(
+                payment_request_id
+            )
+            another_writers_payment_request.mark_as_forwarded_to_acquiring_bank()
+            another_writers_repo.update(another_writers_payment_request)
+        return loaded_payment_request
+
+    # When
+    with patch.object(
+        service.payment_requests_repo,
+        "get_by_aggregate_root_id",
+        side_effect=load_then_another_writer_marks_as_forwarded,
+    ) as mock_get_by_aggregate_root_id:
+        service.process_acquiring_bank_response(
+            ProcessAcquiringBankResponse(payment_request.id, AcquiringBankResponse.PAID)
+        )
+
+    # Then
+    assert mock_get_by_aggregate_root_id.call_count == 2
+    item = payment_requests_table.get_item(Key={"id": payment_request.id})["Item"]
+    assert item["is_sent_to_acquiring_bank"] is True
+    assert item["acquiring_bank_response"]["value"] == AcquiringBankResponse.PAID
+    assert item["version"] == 3
+
+
+def test_process_acquiring_bank_response_raises_ConcurrencyConflict_if_conflicts_persist(
+    payment_requests_table, payment_request
+):
+    # Given
+    PaymentRequestsRepository().upsert(payment_request)
+    service = PaymentRequestService()
+
+    # When
+    with patch.object(
+        service.payment_requests_repo, "update", side_effect=ConcurrencyConflict()
+    ) as mock_update:
+        with pytest.raises(ConcurrencyConflict):
+            service.process_acquiring_bank_response(
+                ProcessAcquiringBankResponse(payment_request.id, AcquiringBankResponse.PAID)
+            )
+
+    # Then
+    assert mock_update.call_count == 3
+
+
+def test_forward_payment_requests_to_acquiring_bank_forwards_every_payment_request(
+    payment_requests_table, idempotency_keys_table, api_key_secret_in_secretsmanager, stand_in_bank
+):
+    # Given
+    repository = PaymentRequestsRepository()
+    payment_requests = [
+        PaymentRequest(
+            SubmitPaymentRequest(
+                str(uuid.uuid4()), "1234123412341234", "01-24", "15.75", "POUNDS", "321"
+            )
+        )
+        for _ in range(12)
+    ]
+    for payment_request in payment_requests:
+        repository.upsert(payment_request)
+    commands = [
+        ForwardPaymentRequestToAcquiringBank(payment_request.id, payment_request.merchant_id.value)
+        for payment_request in payment_requests
+    ]
+
+    # When
+    outcomes = PaymentRequestService().forward_payment_requests_to_acquiring_bank(commands)
+
+    # Then
+    assert outcomes == [None] * 12
+    assert stand_in_bank.request_count == 12
+    for payment_request in payment_requests:
+        item = payment_requests_table.get_item(Key={"id": payment_request.id})["Item"]
+        assert item["is_sent_to_acquiring_bank"] is True
+
+
+def test_forward_payment_requests_to_acquiring_bank_reuses_aws_resources_between_invocations(
+    payment_requests_table, idempotency_keys_table, api_key_secret_in_secretsmanager, stand_in_bank
+):
+    # Given
+    repository = PaymentRequestsRepository()
+    payment_requests = [
+        PaymentRequest(
+            SubmitPaymentRequest(
+                str(uuid.uuid4()), "1234123412341234", "01-24", "15.75", "POUNDS", "321"
+            )
+        )
+        for _ in range(24)
+    ]
+    for payment_request in payment_requests:
+        repository.upsert(payment_request)
+    commands = [
+        ForwardPaymentRequestToAcquiringBank(payment_request.id, payment_request.merchant_id.value)
+        for payment_request in payment_requests
+    ]
+    PaymentRequestService().forward_payment_requests_to_acquiring_bank(commands[:12])
+
+    # When
+    with patch(
+        "application.clients.AWSClient.boto3.resource", wraps=boto3.resource
+    ) as resource_spy:
+        outcomes = PaymentRequestService().forward_payment_requests_to_acquiring_bank(commands[12:])
+
+    # Then
+    assert outcomes == [None] * 12
+    assert resource_spy.call_count == 0
+
+
+def test_forward_payment_requests_to_acquiring_bank_returns_exception_for_each_failed_command(
+    payment_requests_table,
+):
+    # Given
+    missing_command = ForwardPaymentRequestToAcquiringBank(str(uuid.uuid4()), str(uuid.uuid4()))
+    forwarded_command = ForwardPaymentRequestToAcquiringBank(str(uuid.uuid4()), str(uuid.uuid4()))
+
+    def forward(command):
+        if command is missing_command:
+            raise NotFound("PaymentRequest not found.")
+
+    # When
+    with patch.object(
+        PaymentRequestService, "forward_payment_request_to_acquiring_bank", side_effect=forward
+    ):
+        outcomes = PaymentRequestService().forward_payment_requests_to_acquiring_bank(
+            [forwarded_command, missing_command]
+        )
+
+    # Then
+    assert outcomes[0] is None
+    assert isinstance(outcomes[1], NotFound)
+
+
+@patch("application.services.PaymentRequestService.MAX_FORWARDS_IN_FLIGHT_PER_MERCHANT", 2)
+@patch("application.services.PaymentRequestService.MAX_FORWARDS_IN_FLIGHT", 5)
+def test_forward_payment_requests_to_acquiring_bank_limits_requests_in_flight(
+    payment_requests_table,
+):
+    # Given
+    busy_merchant_id = str(uuid.uuid4())
+    commands = [
+        ForwardPaymentRequestToAcquiringBank(str(uuid.uuid4()), busy_merchant_id) for _ in range(10)
+    ] + [
+        ForwardPaymentRequestToAcquiringBank(str(uuid.uuid4()), str(uuid.uuid4()))
+        for _ in range(10)
+    ]
+    lock = threading.Lock()
+    in_flight = {"total": 0, "busy_merchant": 0}
+    most_in_flight = {"total": 0, "busy_merchant": 0}
+
+    def forward(command):
+        keys = ["total"] + (["busy_merchant"] if command.merchant_id == busy_merchant_id else [])
+        with lock:
+            for key in keys:
+                in_flight[key] += 1
+                most_in_flight[key] = max(most_in_flight[key], in_flight[key])
+        time.sleep(0.02)
+        with lock:
+            for key in keys:
+                in_flight[key] -= 1
+
+    # When
+    with patch.object(
+        PaymentRequestService, "forward_payment_request_to_acquiring_bank", side_effect=forward
+    ):
+        outcomes = PaymentRequestService().forward_payment_requests_to_acquiring_bank(commands)
+
+    # Then
+    assert outcomes == [None] * 20
+    assert most_in_flight["busy_merchant"] == 2
+    assert most_in_flight["total"] == 5
+
+
+def test_submit_payment_request_with_idempotency_key_creates_one_payment_request(
+    payment_requests_table, payment_requests_outbox_table, idempotency_keys_table
+):
+    # Given
+    service = PaymentRequestService()
+    command = SubmitPaymentRequest(
+        str(uuid.uuid4()), "1234123412341234", "01-24", "15.75", "POUNDS", "321"
+    )
+
+    # When
+    first_id = service.submit_payment_request(command, "idempotency key")
+    retried_id = service.submit_payment_request(command, "idempotency key")
+
+    # Then
+    assert retried_id == first_id
+    assert payment_requests_table.scan()["Count"] == 1
+    assert payment_requests_outbox_table.scan()["Count"] == 1
+
+
+def test_submit_payment_request_scopes_idempotency_keys_to_the_merchant(
+    payment_requests_table, payment_requests_outbox_table, idempotency_keys_table
+):
+    # Given
+    service = PaymentRequestService()
+    commands = [
+        SubmitPaymentRequest(
+            str(uuid.uuid4()), "1234123412341234", "01-24", "15.75", "POUNDS", "321"
+        )
+        for _ in range(2)
+    ]
+
+    # When
+    ids = [service.submit_payment_request(command, "idempotency key") for command in commands]
+
+    # Then
+    assert ids[0] != ids[1]
+    assert payment_requests_table.scan()["Count"] == 2
+
+
+def test_submit_payment_request_raises_IdempotencyKeyReused_for_a_different_request(
+    payment_requests_table, payment_requests_outbox_table, idempotency_keys_table
+):
+    # Given
+    service = PaymentRequestService()
+    merchant_id = str(uuid.uuid4())
+    service.submit_payment_request(
+        SubmitPaymentRequest(merchant_id, "1234123412341234", "01-24", "15.75", "POUNDS", "321"),
+        "idempotency key",
+    )
+
+    # When / Then
+    with pytest.raises(IdempotencyKeyReused):
+        service.submit_payment_request(
+            SubmitPaymentRequest(
+                merchant_id, "1234123412341234", "01-24", "20.00", "POUNDS", "321"
+            ),
+            "idempotency key",
+        )
+    assert payment_requests_table.scan()["Count"] == 1
+
+
+def test_submit_payment_request_releases_idempotency_key_if_submission_fails(
+    payment_requests_table, payment_requests_outbox_table, idempotency_keys_table
+):
+    # Given
+    service = PaymentRequestService()
+    command = SubmitPaymentRequest(
+        str(uuid.uuid4()), "1234123412341234", "01-24", "15.75", "POUNDS", "32"
+    )
+    with pytest.raises(DomainException):
+        service.submit_payment_request(command, "idempotency key")
+
+    # When / Then
+    with pytest.raises(DomainException):
+        service.submit_payment_request(command, "idempotency key")
+    assert idempotency_keys_table.scan()["Count"] == 0
+
+
+def test_submit_payment_request_creates_one_payment_request_for_concurrent_duplicates(
+    payment_requests_table, payment_requests_outbox_table, idempotency_keys_table
+):
+    # Given
+    command = SubmitPaymentRequest(
+        str(uuid.uuid4()), "1234123412341234", "01-24", "15.75", "POUNDS", "321"
+    )
+    start = threading.Barrier(8)
+
+    def submit(_):
+        start.wait()
+        try:
+            return PaymentRequestService().submit_payment_request(command, "idempotency key")
+        except IdempotencyKeyInUse as e:
+            return e
+
+    # When
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        outcomes = list(executor.map(submit, range(8)))
+
+    # Then
+    assert payment_requests_table.scan()["Count"] == 1
+    payment_request_id = payment_requests_table.scan()["Items"][0]["id"]
+    assert all(
+        outcome == payment_request_id or isinstance(outcome, IdempotencyKeyInUse)
+        for outcome in outcomes
+    )
+    assert PaymentRequestService().submit_payment_request(command, "idempotency key") == (
+        payment_request_id
+    )
+
+
+def test_forward_payment_request_to_acquiring_bank_does_not_load_aggregate_for_duplicates(
+    payment_requests_table,
+    payment_requests_outbox_table,
+    idempotency_keys_table,
+    api_key_secret_in_secretsmanager,
+    stand_in_bank,
+):
+    # Given
+    service = PaymentRequestService()
+    merchant_id = str(uuid.uuid4())
+    payment_request_id = service.submit_payment_request(
+        SubmitPaymentRequest(merchant_id, "1234123412341234", "01-24", "15.75", "POUNDS", "321")
+    )
+    command = ForwardPaymentRequestToAcquiringBank(payment_request_id, merchant_id)
+    service.forward_payment_request_to_acquiring_bank(command)
+
+    # When
+    with patch.object(
+        PaymentRequestsRepository,
+        "get_by_aggregate_root_id",
+        wraps=service.payment_requests_repo.get_by_aggregate_root_id,
+    ) as spy_get:
+        service.forward_payment_request_to_acquiring_bank(command)
+
+    # Then
+    spy_get.assert_not_called()
+    assert stand_in_bank.request_count == 1
+
+
+def test_forward_payment_requests_to_acquiring_bank_calls_bank_once_for_concurrent_duplicates(
+    payment_requests_table, idempotency_keys_table, api_key_secret_in_secretsmanager, stand_in_bank
+):
+    # Given
+    stand_in_bank.delay_seconds = 0.2
+    payment_request = PaymentRequest(
+        SubmitPaymentRequest(
+            str(uuid.uuid4()), "1234123412341234", "01-24", "15.75", "POUNDS", "321"
+        )
+    )
+    PaymentRequestsRepository().upsert(payment_request)
+    # No more than MAX_FORWARDS_IN_FLIGHT_PER_MERCHANT, so every duplicate is in flight at once.
+    commands = [
+        ForwardPaymentRequestToAcquiringBank(payment_request.id, payment_request.merchant_id.value)
+        for _ in range(4)
+    ]
+
+    # When
+    outcomes = PaymentRequestService().forward_payment_requests_to_acquiring_bank(commands)
+
+    # Then the duplicates in flight are dropped, not failed
+    assert stand_in_bank.request_count == 1
+    assert outcomes == [None] * 4
+    item = payment_requests_table.get_item(Key={"id": payment_request.id})["Item"]
+    assert item["is_sent_to_acquiring_bank"] is True
+
+    # When the duplicates are redelivered
+    outcomes = PaymentRequestService().forward_payment_requests_to_acquiring_bank(commands)
+
+    # Then
+    assert outcomes == [None] * 4
+    assert stand_in_bank.request_count == 1
+    item = payment_requests_table.get_item(Key={"id": payment_request.id})["Item"]
+    assert item["is_sent_to_acquiring_bank"] is True
+
+
+def test_submit_payment_request_flags_likely_duplicate_payment_requests(
+    payment_requests_table, payment_requests_outbox_table
+):
+    # Given
+    service = PaymentRequestService()
+    command = SubmitPaymentRequest(
+        str(uuid.uuid4()), "1234123412341234", "01-24", "15.75", "POUNDS", "321"
+    )
+    first_id = service.submit_payment_request(command)
+
+    # When
+    second_id = service.submit_payment_request(command)
+
+    # Then
+    first_item = payment_requests_table.get_item(Key={"id": first_id})["Item"]
+    second_item = payment_requests_table.get_item(Key={"id": second_id})["Item"]
+    assert first_item["possible_duplicate_of"] is None
+    assert second_item["possible_duplicate_of"] == first_id
+
+
+def test_submit_payment_requests_flags_duplicates_within_the_same_upload(
+    payment_requests_table, payment_requests_outbox_table
+):
+    # Given
+    command = SubmitPaymentRequest(
+        str(uuid.uuid4()), "1234123412341234", "01-24", "15.75", "POUNDS", "321"
+    )
+
+    # When
+    outcomes = PaymentRequestService().submit_payment_requests([command, command])
+
+    # Then
+    first_item = payment_requests_table.get_item(Key={"id": outcomes[0]})["Item"]
+    second_item = payment_requests_table.get_item(Key={"id": outcomes[1]})["Item"]
+    assert first_item["possible_duplicate_of"] is None
+    assert second_item["possible_duplicate_of"] == outcomes[0]
+
+
+def test_submit_payment_requests_only_remembers_payment_requests_that_were_saved(
+    payment_requests_table, payment_requests_outbox_table
+):
+    # Given
+    service = PaymentRequestService()
+    command = SubmitPaymentRequest(
+        str(uuid.uuid4()), "1234123412341234", "01-24", "15.75", "POUNDS", "321"
+    )
+    with patch.object(
+        PaymentRequestsRepository,
+        "insert_many_with_outbox_entries",
+        side_effect=lambda pairs: {pairs[0][0].id: "TransactionCanceledException"},
+    ):
+        service.submit_payment_requests([command])
+
+    # When
+    with patch.object(service.payment_requests_repo, "iter_by_merchant") as mock_iter_by_merchant:
+        outcomes = service.submit_payment_requests([command])
+
+    # Then
+    mock_iter_by_merchant.assert_not_called()
+    item = payment_requests_table.get_item(Key={"id": outcomes[0]})["Item"]
+    assert item["possible_duplicate_of"] is None
+
+
+def test_submit_payment_request_saves_payment_request_if_duplicate_check_fails(
+    payment_requests_table, payment_requests_outbox_table
+):
+    # Given
+    service = PaymentRequestService()
+    command = SubmitPaymentRequest(
+        str(uuid.uuid4()), "1234123412341234", "01-24", "15.75", "POUNDS", "321"
+    )
+
+    # When
+    with patch.object(
+        service.duplicate_detector, "find_duplicates_of", side_effect=Exception("Boom")
+    ):
+        payment_request_id = service.submit_payment_request(command)
+
+    # Then
+    item = payment_requests_table.get_item(Key={"id": payment_request_id})["Item"]
+    assert item["possible_duplicate_of"] is None
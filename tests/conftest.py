@@ -6,11 +6,24 @@ import boto3
 import pytest
 from moto import mock_dynamodb, mock_secretsmanager, mock_sqs
 
+from application.clients.AcquiringBankClient import AcquiringBankClient
+from application.clients.AWSClient import AWSClient
+from application.clients.CommandQueue import CommandQueue
+from application.clients.SecretsCache import SecretsCache
 from application.mapping.mapper import Mapper
+from application.repositories.IdempotencyKeysRepository import IdempotencyKeysRepository
+from application.services.DuplicatePaymentRequestDetector import (
+    DuplicatePaymentRequestDetector,
+)
+from application.services.PaymentRequestService import PaymentRequestService
 from core.commands.SubmitPaymentRequest import SubmitPaymentRequest
 from core.payment_request_aggregate.PaymentRequest import PaymentRequest
+from tests.stand_in_bank import StandInBank
 
 PAYMENT_REQUESTS_DYNAMODB_TABLE_NAME = "payment_requests"
+PAYMENT_REQUESTS_OUTBOX_DYNAMODB_TABLE_NAME = "payment_requests_outbox"
+PAYMENT_REQUEST_STATUSES_DYNAMODB_TABLE_NAME = "payment_request_statuses"
+IDEMPOTENCY_KEYS_DYNAMODB_TABLE_NAME = "idempotency_keys"
 PAYMENT_REQUESTS_TO_FORWARD_QUEUE_NAME = "payment_requests_to_forward"
 ACQUIRING_BANK_API_KEY_SECRET_NAME = "api_key_secret_id"
 ACQUIRING_BANK_POST_PAYMENT_REQUEST_URL = "acquiringbank.api.com/payments/requests"
@@ -24,11 +37,48 @@ def moto_credentials():
     os.environ["AWS_SESSION_TOKEN"] = "testing"
     os.environ["AWS_DEFAULT_REGION"] = "eu-west-2"
     os.environ["PAYMENT_REQUESTS_DYNAMODB_TABLE_NAME"] = PAYMENT_REQUESTS_DYNAMODB_TABLE_NAME
+    os.environ[
+        "PAYMENT_REQUESTS_OUTBOX_DYNAMODB_TABLE_NAME"
+    ] = PAYMENT_REQUESTS_OUTBOX_DYNAMODB_TABLE_NAME
+    os.environ[
+        "PAYMENT_REQUEST_STATUSES_DYNAMODB_TABLE_NAME"
+    ] = PAYMENT_REQUEST_STATUSES_DYNAMODB_TABLE_NAME
+    os.environ["IDEMPOTENCY_KEYS_DYNAMODB_TABLE_NAME"] = IDEMPOTENCY_KEYS_DYNAMODB_TABLE_NAME
     os.environ["PAYMENT_REQUESTS_TO_FORWARD_QUEUE_NAME"] = PAYMENT_REQUESTS_TO_FORWARD_QUEUE_NAME
     os.environ["ACQUIRING_BANK_API_KEY_SECRET_NAME"] = ACQUIRING_BANK_API_KEY_SECRET_NAME
     os.environ["ACQUIRING_BANK_POST_PAYMENT_REQUEST_URL"] = ACQUIRING_BANK_POST_PAYMENT_REQUEST_URL
 
 
+@pytest.fixture(autouse=True, scope="function")
+def clear_aws_client_cache():
+    AWSClient.clear_cache()
+    SecretsCache.clear()
+    CommandQueue.clear_cache()
+    IdempotencyKeysRepository.clear_cache()
+    DuplicatePaymentRequestDetector.clear_cache()
+    PaymentRequestService.clear_cache()
+    yield
+    AWSClient.clear_cache()
+    SecretsCache.clear()
+    CommandQueue.clear_cache()
+    IdempotencyKeysRepository.clear_cache()
+    DuplicatePaymentRequestDetector.clear_cache()
+    PaymentRequestService.clear_cache()
+
+
+@pytest.fixture(autouse=True, scope="function")
+def close_acquiring_bank_session():
+    yield
+    AcquiringBankClient.close_session()
+
+
+@pytest.fixture(scope="function")
+def stand_in_bank():
+    with StandInBank() as bank:
+        os.environ["ACQUIRING_BANK_POST_PAYMENT_REQUEST_URL"] = bank.url
+        yield bank
+
+
 @pytest.fixture(scope="function")
 def dynamodb():
     with mock_dynamodb():
@@ -44,12 +94,70 @@ def payment_requests_table(dynamodb):
         ],
         AttributeDefinitions=[
             {"AttributeName": "id", "AttributeType": "S"},
+            {"AttributeName": "merchant_key", "AttributeType": "S"},
+            {"AttributeName": "created_at", "AttributeType": "N"},
+        ],
+        GlobalSecondaryIndexes=[
+            {
+                "IndexName": "by_merchant_and_created_at",
+                "KeySchema": [
+                    {"AttributeName": "merchant_key", "KeyType": "HASH"},
+                    {"AttributeName": "created_at", "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "ALL"},
+                "ProvisionedThroughput": {"ReadCapacityUnits": 1, "WriteCapacityUnits": 1},
+            }
         ],
         ProvisionedThroughput={"ReadCapacityUnits": 1, "WriteCapacityUnits": 1},
     )
     yield dynamodb.Table(PAYMENT_REQUESTS_DYNAMODB_TABLE_NAME)
 
 
+@pytest.fixture(scope="function")
+def payment_request_statuses_table(dynamodb):
+    dynamodb.create_table(
+        TableName=PAYMENT_REQUEST_STATUSES_DYNAMODB_TABLE_NAME,
+        KeySchema=[
+            {"AttributeName": "id", "KeyType": "HASH"},
+        ],
+        AttributeDefinitions=[
+            {"AttributeName": "id", "AttributeType": "S"},
+        ],
+        ProvisionedThroughput={"ReadCapacityUnits": 1, "WriteCapacityUnits": 1},
+    )
+    yield dynamodb.Table(PAYMENT_REQUEST_STATUSES_DYNAMODB_TABLE_NAME)
+
+
+@pytest.fixture(scope="function")
+def idempotency_keys_table(dynamodb):
+    dynamodb.create_table(
+        TableName=IDEMPOTENCY_KEYS_DYNAMODB_TABLE_NAME,
+        KeySchema=[
+            {"AttributeName": "key", "KeyType": "HASH"},
+        ],
+        AttributeDefinitions=[
+            {"AttributeName": "key", "AttributeType": "S"},
+        ],
+        ProvisionedThroughput={"ReadCapacityUnits": 1, "WriteCapacityUnits": 1},
+    )
+    yield dynamodb.Table(IDEMPOTENCY_KEYS_DYNAMODB_TABLE_NAME)
+
+
+@pytest.fixture(scope="function")
+def payment_requests_outbox_table(dynamodb):
+    dynamodb.create_table(
+        TableName=PAYMENT_REQUESTS_OUTBOX_DYNAMODB_TABLE_NAME,
+        KeySchema=[
+            {"AttributeName": "id", "KeyType": "HASH"},
+        ],
+        AttributeDefinitions=[
+            {"AttributeName": "id", "AttributeType": "S"},
+        ],
+        ProvisionedThroughput={"ReadCapacityUnits": 1, "WriteCapacityUnits": 1},
+    )
+    yield dynamodb.Table(PAYMENT_REQUESTS_OUTBOX_DYNAMODB_TABLE_NAME)
+
+
 @pytest.fixture(scope="function")
 def localstack_environment_variable():
     os.environ["LOCALSTACK_HOSTNAME"] = "127.0.0.1"
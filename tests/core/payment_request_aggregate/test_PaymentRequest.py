@@ -26,6 +26,7 @@ def test_init_PaymentRequest_with_valid_arguments_creates_expected_object():
 
     payment_request = PaymentRequest(submit_command)
     assert is_valid_uuid(payment_request.id)
+    assert payment_request.version == 0
     assert payment_request.merchant_id.value == merchant_id
     assert payment_request.card_number.value == "12345671234567"
     assert payment_request.expiry_date.month == "08"
@@ -93,3 +94,26 @@ def test_process_acquiring_bank_response_sets_value_for_valid_statuses(
 
     # Then
     assert payment_request.acquiring_bank_response.value == valid_response_message_from_bank
+
+
+def test_PaymentRequest_and_its_value_objects_are_slotted():
+    payment_request = PaymentRequest(
+        SubmitPaymentRequest(str(uuid.uuid4()), "12345671234567", "08-32", 10, "POUNDS", "999")
+    )
+    payment_request.process_acquiring_bank_response(
+        AcquiringBankResponse(AcquiringBankResponse.PAID)
+    )
+
+    for obj in (
+        payment_request,
+        payment_request.merchant_id,
+        payment_request.card_number,
+        payment_request.expiry_date,
+        payment_request.cvv,
+        payment_request.amount,
+        payment_request.amount.currency,
+        payment_request.acquiring_bank_response,
+    ):
+        assert not hasattr(obj, "__dict__")
+    with pytest.raises(AttributeError):
+        payment_request.not_an_attribute = True
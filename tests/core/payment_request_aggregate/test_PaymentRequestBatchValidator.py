@@ -0,0 +1,130 @@
+import uuid
+from decimal import Decimal
+
+import pytest
+
+from core.commands.SubmitPaymentRequest import SubmitPaymentRequest
+from core.payment_request_aggregate.PaymentRequest import PaymentRequest
+from core.payment_request_aggregate.PaymentRequestBatchValidator import (
+    PaymentRequestBatchValidator,
+)
+from shared_kernel.exceptions.DomainException import DomainException
+
+MERCHANT_ID = str(uuid.uuid4())
+
+
+def messages_from_PaymentRequest(command: SubmitPaymentRequest):
+    try:
+        PaymentRequest(command)
+    except DomainException as e:
+        return e.messages
+    return None
+
+
+def make_commands():
+    valid = (MERCHANT_ID, "1234123412341234", "11-32", "15.75", "POUNDS", "019")
+    changes = [
+        {},
+        {"merchant_id": "not a uuid"},
+        {"card_number": "1234"},
+        {"card_number": "1234abcd1234"},
+        {"expiry_date": "13-32"},
+        {"expiry_date": "1132"},
+        {"cvv": "12"},
+        {"cvv": "abc"},
+        {"amount": "-1"},
+        {"amount": "ten"},
+        {"amount": 0},
+        {"amount": Decimal("99.99")},
+        {"currency": "YEN"},
+        {"currency": "EUROS", "amount": 12},
+        {"card_number": "1234", "expiry_date": "00-32", "cvv": "1234", "currency": "YEN"},
+    ]
+    commands = []
+    for change in changes:
+        command = SubmitPaymentRequest(*valid)
+        for name, value in change.items():
+            setattr(command, name, value)
+        commands.append(command)
+    # Repeated rows share the results of validating their values.
+    return commands + commands
+
+
+def test_validate_commands_fails_each_row_with_the_messages_PaymentRequest_raises():
+    # Given
+    commands = make_commands()
+
+    # When
+    errors = PaymentRequestBatchValidator.validate_commands(commands)
+
+    # Then
+    assert len(errors) == len(commands)
+    for command, error in zip(commands, errors):
+        expected_messages = messages_from_PaymentRequest(command)
+        if expected_messages is None:
+            assert error is None
+        else:
+            assert type(error) == DomainException
+            assert error.messages == expected_messages
+
+
+def test_validate_does_not_share_results_between_equal_values_of_different_types():
+    # Given
+    currencies = ["POUNDS", 1, True]
+
+    # When
+    errors = PaymentRequestBatchValidator.validate(
+        [MERCHANT_ID] * 3,
+        ["1234123412341234"] * 3,
+        ["11-32"] * 3,
+        ["1.00"] * 3,
+        currencies,
+        ["019"] * 3,
+    )
+
+    # Then
+    assert errors[0] is None
+    assert errors[1].messages == ["Currency type: 1 is not supported."]
+    assert errors[2].messages == ["Currency type: True is not supported."]
+
+
+def test_validate_validates_unhashable_values():
+    # Given
+    amounts = ["1.00", ["1.00"]]
+
+    # When
+    errors = PaymentRequestBatchValidator.validate(
+        [MERCHANT_ID] * 2,
+        ["1234123412341234"] * 2,
+        ["11-32"] * 2,
+        amounts,
+        ["POUNDS"] * 2,
+        ["019"] * 2,
+    )
+
+    # Then
+    assert errors[0] is None
+    assert errors[1].messages == ["Amount could not be parsed to a decimal type."]
+
+
+def test_validate_raises_value_error_for_columns_of_different_lengths():
+    with pytest.raises(ValueError):
+        PaymentRequestBatchValidator.validate(
+            [MERCHANT_ID] * 2, ["1234123412341234"], ["11-32"], ["1.00"], ["POUNDS"], ["019"]
+        )
+
+
+def test_validate_fails_amounts_that_are_not_a_number_as_PaymentRequest_does():
+    # Given
+    rows = [(Decimal("1.00"), "POUNDS"), (Decimal("NaN"), "YEN"), (Decimal("2.00"), "EUROS")]
+    amounts, currencies = [list(column) for column in zip(*rows)]
+
+    # When
+    errors = PaymentRequestBatchValidator.validate(
+        [MERCHANT_ID] * 3, ["1234123412341234"] * 3, ["11-32"] * 3, amounts, currencies, ["019"] * 3
+    )
+
+    # Then
+    assert errors[0] is None
+    assert errors[1].messages == ["Currency type: YEN is not supported."]
+    assert errors[2] is None
@@ -19,3 +19,11 @@ def test_unsupported_status_raises_domain_exception():
         AcquiringBankResponse(invalid_response)
 
     assert "Response message: Other response... is not supported." in e.value.messages[0]
+
+
+def test_responses_are_interned():
+    response = AcquiringBankResponse(AcquiringBankResponse.PAID)
+
+    assert response is AcquiringBankResponse(AcquiringBankResponse.PAID)
+    assert response is AcquiringBankResponse.INSTANCES[AcquiringBankResponse.PAID]
+    assert response is not AcquiringBankResponse(AcquiringBankResponse.PROCESSING)
@@ -17,3 +17,11 @@ def test_unsupported_currency_raises_domain_exception():
         Currency(invalid_currency)
 
     assert "Currency type: YEN is not supported." in e.value.messages[0]
+
+
+def test_currencies_are_interned():
+    currency = Currency(Currency.EUROS)
+
+    assert currency is Currency(Currency.EUROS)
+    assert currency is Currency.INSTANCES[Currency.EUROS]
+    assert currency is not Currency(Currency.POUNDS)
@@ -0,0 +1,58 @@
+import pytest
+
+from shared_kernel.bloom_filters.BloomFilter import BloomFilter
+
+
+@pytest.mark.parametrize("capacity, false_positive_rate", [(0, 0.01), (100, 0), (100, 1)])
+def test_BloomFilter_raises_ValueError_if_not_sized_sensibly(capacity, false_positive_rate):
+    with pytest.raises(ValueError):
+        BloomFilter(capacity, false_positive_rate)
+
+
+def test_BloomFilter_is_sized_for_its_capacity_and_false_positive_rate():
+    # When
+    bloom_filter = BloomFilter(capacity=1000, false_positive_rate=0.01)
+
+    # Then
+    assert bloom_filter.bit_count == 9586
+    assert bloom_filter.hash_count == 7
+
+
+def test_BloomFilter_add_reports_whether_key_was_added_already():
+    # Given
+    bloom_filter = BloomFilter(capacity=100, false_positive_rate=0.01)
+
+    # When
+    first_add = bloom_filter.add(b"key")
+    second_add = bloom_filter.add(b"key")
+
+    # Then
+    assert first_add is False
+    assert second_add is True
+    assert len(bloom_filter) == 1
+
+
+def test_BloomFilter_has_no_false_negatives():
+    # Given
+    bloom_filter = BloomFilter(capacity=1000, false_positive_rate=0.01)
+    keys = [f"key {index}".encode() for index in range(1000)]
+
+    # When
+    for key in keys:
+        bloom_filter.add(key)
+
+    # Then
+    assert all(key in bloom_filter for key in keys)
+
+
+def test_BloomFilter_false_positive_rate_is_close_to_target_at_capacity():
+    # Given
+    bloom_filter = BloomFilter(capacity=1000, false_positive_rate=0.01)
+    for index in range(1000):
+        bloom_filter.add(f"key {index}".encode())
+
+    # When
+    false_positives = sum(f"other key {index}".encode() in bloom_filter for index in range(20000))
+
+    # Then
+    assert false_positives / 20000 < 0.02
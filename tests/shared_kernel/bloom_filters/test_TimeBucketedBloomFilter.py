@@ -0,0 +1,71 @@
+from unittest.mock import patch
+
+import pytest
+
+from shared_kernel.bloom_filters.TimeBucketedBloomFilter import TimeBucketedBloomFilter
+
+MONOTONIC = "shared_kernel.bloom_filters.TimeBucketedBloomFilter.time.monotonic"
+
+
+@pytest.mark.parametrize("window_seconds, bucket_seconds", [(60, 0), (30, 60)])
+def test_TimeBucketedBloomFilter_raises_ValueError_if_buckets_do_not_fit_window(
+    window_seconds, bucket_seconds
+):
+    with pytest.raises(ValueError):
+        TimeBucketedBloomFilter(window_seconds, bucket_seconds)
+
+
+def test_TimeBucketedBloomFilter_add_reports_keys_added_within_the_window():
+    # Given
+    recent = TimeBucketedBloomFilter(window_seconds=600, bucket_seconds=60)
+    with patch(MONOTONIC, return_value=1000):
+        first_add = recent.add(b"key")
+
+    # When
+    with patch(MONOTONIC, return_value=1590):
+        second_add = recent.add(b"key")
+        other_add = recent.add(b"other key")
+
+    # Then
+    assert first_add is False
+    assert second_add is True
+    assert other_add is False
+
+
+def test_TimeBucketedBloomFilter_forgets_keys_once_their_bucket_leaves_the_window():
+    # Given
+    recent = TimeBucketedBloomFilter(window_seconds=600, bucket_seconds=60)
+    with patch(MONOTONIC, return_value=1000):
+        recent.add(b"key")
+
+    # When / Then
+    with patch(MONOTONIC, return_value=1000 + 600):
+        assert b"key" in recent
+    with patch(MONOTONIC, return_value=1000 + 660):
+        assert b"key" not in recent
+        assert recent.add(b"key") is False
+
+
+def test_TimeBucketedBloomFilter_keeps_one_filter_per_live_bucket():
+    # Given
+    recent = TimeBucketedBloomFilter(window_seconds=120, bucket_seconds=60)
+
+    # When
+    for now in range(0, 600, 30):
+        with patch(MONOTONIC, return_value=now):
+            recent.add(str(now).encode())
+
+    # Then
+    assert len(recent._filters) == 3
+
+
+def test_TimeBucketedBloomFilter_clear_forgets_every_key():
+    # Given
+    recent = TimeBucketedBloomFilter(window_seconds=600, bucket_seconds=60)
+    recent.add(b"key")
+
+    # When
+    recent.clear()
+
+    # Then
+    assert b"key" not in recent
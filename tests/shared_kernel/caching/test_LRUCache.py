@@ -0,0 +1,90 @@
+import time
+from unittest.mock import patch
+
+import pytest
+
+from shared_kernel.caching.LRUCache import LRUCache
+
+
+def test_LRUCache_raises_ValueError_if_max_size_is_less_than_1():
+    with pytest.raises(ValueError):
+        LRUCache(max_size=0)
+
+
+def test_LRUCache_get_returns_cached_value_and_counts_hits_and_misses():
+    # Given
+    cache = LRUCache(max_size=2)
+    cache.put("a", 1, ttl_seconds=60)
+
+    # When
+    values = [cache.get("a"), cache.get("b")]
+
+    # Then
+    assert values == [1, None]
+    assert cache.stats() == {"size": 1, "hits": 1, "misses": 1, "evictions": 0}
+
+
+def test_LRUCache_put_evicts_least_recently_used_value_when_full():
+    # Given
+    cache = LRUCache(max_size=2)
+    cache.put("a", 1, ttl_seconds=60)
+    cache.put("b", 2, ttl_seconds=60)
+    cache.get("a")
+
+    # When
+    cache.put("c", 3, ttl_seconds=60)
+
+    # Then
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+    assert len(cache) == 2
+
+
+def test_LRUCache_put_replaces_value_without_evicting():
+    # Given
+    cache = LRUCache(max_size=2)
+    cache.put("a", 1, ttl_seconds=60)
+    cache.put("b", 2, ttl_seconds=60)
+
+    # When
+    cache.put("a", 10, ttl_seconds=60)
+
+    # Then
+    assert cache.get("a") == 10
+    assert cache.get("b") == 2
+    assert cache.evictions == 0
+
+
+def test_LRUCache_get_returns_None_once_value_expires():
+    # Given
+    cache = LRUCache(max_size=2)
+    now = time.monotonic()
+    with patch("shared_kernel.caching.LRUCache.time.monotonic", return_value=now):
+        cache.put("short", 1, ttl_seconds=1)
+        cache.put("long", 2, ttl_seconds=60)
+
+    # When
+    with patch("shared_kernel.caching.LRUCache.time.monotonic", return_value=now + 1):
+        values = [cache.get("short"), cache.get("long")]
+
+    # Then
+    assert values == [None, 2]
+    assert len(cache) == 1
+    assert cache.misses == 1
+
+
+def test_LRUCache_clear_removes_entries_and_resets_counters():
+    # Given
+    cache = LRUCache(max_size=1)
+    cache.put("a", 1, ttl_seconds=60)
+    cache.put("b", 2, ttl_seconds=60)
+    cache.get("b")
+
+    # When
+    cache.clear()
+
+    # Then
+    assert cache.get("b") is None
+    assert cache.stats() == {"size": 0, "hits": 0, "misses": 1, "evictions": 0}
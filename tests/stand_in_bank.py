@@ -0,0 +1,79 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StandInBank:
+    """A local HTTP server that stands in for the Acquiring Bank's API.
+
+    Speaks HTTP/1.1, so clients can keep connections alive, and counts the TCP connections
+    and requests it receives. Responses can be delayed to emulate the bank's latency. If
+    accepted_api_key is set, requests with any other x-api-key are rejected with a 401.
+
+    Usage:
+        with StandInBank(delay_seconds=0.05) as bank:
+            requests.post(bank.url, json={})
+            assert bank.connection_count == 1
+    """
+
+    def __init__(self, delay_seconds: float = 0, status_code: int = 204):
+        self.delay_seconds = delay_seconds
+        self.status_code = status_code
+        self.accepted_api_key = None
+        self.connection_count = 0
+        self.request_count = 0
+        self.api_keys_received = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/payments/requests"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def _make_handler(self):
+        bank = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with bank._lock:
+                    bank.connection_count += 1
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                api_key = self.headers.get("x-api-key")
+                with bank._lock:
+                    bank.request_count += 1
+                    bank.api_keys_received.append(api_key)
+                if bank.delay_seconds:
+                    time.sleep(bank.delay_seconds)
+                if bank.accepted_api_key is not None and api_key != bank.accepted_api_key:
+                    self.send_response(401)
+                else:
+                    self.send_response(bank.status_code)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        return Handler